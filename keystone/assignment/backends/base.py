@@ -108,6 +108,20 @@ class AssignmentDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_role_assignments_for_actors(self, user_id=None, group_ids=None):
+        """Return the role assignments of a user and of a list of groups.
+
+        Drivers able to read the assignments of both kinds of actors at once
+        should override this.
+
+        """
+        refs = []
+        if user_id:
+            refs += self.list_role_assignments(user_id=user_id)
+        if group_ids:
+            refs += self.list_role_assignments(group_ids=group_ids)
+        return refs
+
     @abc.abstractmethod
     def delete_project_assignments(self, project_id):
         """Delete all assignments for a project.
@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sqlalchemy
+
 from keystone.assignment.backends import base
 from keystone.common import sql
 from keystone import exception
@@ -187,34 +189,34 @@ class Assignment(base.AssignmentDriverBase):
 
         return actor_types or target_types
 
+    def _denormalize_role(self, ref):
+        assignment = {}
+        if ref.type == AssignmentType.USER_PROJECT:
+            assignment['user_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.USER_DOMAIN:
+            assignment['user_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_PROJECT:
+            assignment['group_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_DOMAIN:
+            assignment['group_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        else:
+            raise exception.Error(message=_(
+                'Unexpected assignment type encountered, %s') %
+                ref.type)
+        assignment['role_id'] = ref.role_id
+        if ref.inherited:
+            assignment['inherited_to_projects'] = 'projects'
+        return assignment
+
     def list_role_assignments(self, role_id=None,
                               user_id=None, group_ids=None,
                               domain_id=None, project_ids=None,
                               inherited_to_projects=None):
 
-        def denormalize_role(ref):
-            assignment = {}
-            if ref.type == AssignmentType.USER_PROJECT:
-                assignment['user_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.USER_DOMAIN:
-                assignment['user_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_PROJECT:
-                assignment['group_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_DOMAIN:
-                assignment['group_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            else:
-                raise exception.Error(message=_(
-                    'Unexpected assignment type encountered, %s') %
-                    ref.type)
-            assignment['role_id'] = ref.role_id
-            if ref.inherited:
-                assignment['inherited_to_projects'] = 'projects'
-            return assignment
-
         with sql.session_for_read() as session:
             assignment_types = self._get_assignment_types(
                 user_id, group_ids, project_ids, domain_id)
@@ -244,7 +246,24 @@ class Assignment(base.AssignmentDriverBase):
             if inherited_to_projects is not None:
                 query = query.filter_by(inherited=inherited_to_projects)
 
-            return [denormalize_role(ref) for ref in query.all()]
+            return [self._denormalize_role(ref) for ref in query.all()]
+
+    def list_role_assignments_for_actors(self, user_id=None, group_ids=None):
+        actor_filters = []
+        if user_id:
+            actor_filters.append(sqlalchemy.and_(
+                RoleAssignment.actor_id == user_id,
+                RoleAssignment.type.in_(self._get_user_assignment_types())))
+        if group_ids:
+            actor_filters.append(sqlalchemy.and_(
+                RoleAssignment.actor_id.in_(group_ids),
+                RoleAssignment.type.in_(self._get_group_assignment_types())))
+        if not actor_filters:
+            return []
+        with sql.session_for_read() as session:
+            query = session.query(RoleAssignment).filter(
+                sqlalchemy.or_(*actor_filters))
+            return [self._denormalize_role(ref) for ref in query.all()]
 
     def delete_project_assignments(self, project_id):
         with sql.session_for_write() as session:
@@ -14,8 +14,10 @@
 
 """Main entry point into the Assignment service."""
 
+import collections
 import copy
 import functools
+import threading
 
 from oslo_log import log
 
@@ -44,6 +46,10 @@ MEMOIZE_COMPUTED_ASSIGNMENTS = cache.get_memoization_decorator(
     group='role',
     region=COMPUTED_ASSIGNMENTS_REGION)
 
+# The most users, groups and projects remembered by the in-memory assignment
+# index before it is started over.
+INDEX_ENTRIES_LIMIT = 100000
+
 
 @notifications.listener
 @dependency.provider('assignment_api')
@@ -67,6 +73,10 @@ class Manager(manager.Manager):
         assignment_driver = CONF.assignment.driver
         super(Manager, self).__init__(assignment_driver)
 
+        self._index = {}
+        self._index_revision = None
+        self._index_lock = threading.Lock()
+
         self.event_callbacks = {
             notifications.ACTIONS.deleted: {
                 'domain': [self._delete_domain_assignments],
@@ -255,6 +265,88 @@ class Manager(manager.Manager):
                                if x.get('project_id')]))
         return self.resource_api.list_projects_from_ids(project_ids)
 
+    def list_projects_for_actors(self, user_id=None, group_ids=None):
+        """List the projects a user, or a list of groups, has a role on.
+
+        This is what a token for the user, or for a federated user in the
+        groups, can be scoped to. See `list_target_ids_for_actors`.
+
+        """
+        target_ids = self.list_target_ids_for_actors(user_id, group_ids)
+        return self.resource_api.list_projects_from_ids(
+            target_ids['project_ids'])
+
+    def list_domains_for_actors(self, user_id=None, group_ids=None):
+        """List the domains a user, or a list of groups, has a role on.
+
+        This is what a token for the user, or for a federated user in the
+        groups, can be scoped to. See `list_target_ids_for_actors`.
+
+        """
+        target_ids = self.list_target_ids_for_actors(user_id, group_ids)
+        return self.resource_api.list_domains_from_ids(
+            target_ids['domain_ids'])
+
+    def list_target_ids_for_actors(self, user_id=None, group_ids=None):
+        """List the IDs of the projects and domains actors have a role on.
+
+        The targets are those of the effective role assignments of the user
+        and of the groups together, so the groups the user is a member of
+        count as well. A user that does not exist, such as a federated user,
+        only gets the targets of the groups.
+
+        :param user_id: the ID of a user, if any
+        :param group_ids: a list of group IDs, if any
+
+        :returns: a dict with a list of `project_ids` and a list of
+                  `domain_ids`
+
+        """
+        return self._list_target_ids_for_actors(
+            user_id, sorted(set(group_ids or [])))
+
+    @MEMOIZE_COMPUTED_ASSIGNMENTS
+    def _list_target_ids_for_actors(self, user_id, group_ids):
+        # Rather than expanding every assignment into an assignment of each
+        # role on each project, as listing effective role assignments does,
+        # only the targets are collected, reading the assignments of all the
+        # actors at once and the projects inheriting them in bulk.
+        group_ids = set(group_ids)
+        if user_id:
+            try:
+                group_ids.update(self._get_group_ids_for_user_id(user_id))
+            except exception.UserNotFound:  # nosec
+                # federated users have an id but they don't link to anything
+                user_id = None
+        refs = self.driver.list_role_assignments_for_actors(
+            user_id=user_id, group_ids=list(group_ids))
+        refs = self._strip_domain_roles(self.add_implied_roles(refs))
+
+        project_ids = set()
+        domain_ids = set()
+        inherited_from_project_ids = set()
+        inherited_from_domain_ids = set()
+        for ref in refs:
+            if ref.get('inherited_to_projects'):
+                if ref.get('project_id'):
+                    inherited_from_project_ids.add(ref['project_id'])
+                else:
+                    inherited_from_domain_ids.add(ref['domain_id'])
+            elif ref.get('project_id'):
+                project_ids.add(ref['project_id'])
+            else:
+                domain_ids.add(ref['domain_id'])
+        if inherited_from_domain_ids:
+            project_ids.update(
+                self.resource_api.list_project_ids_from_domain_ids(
+                    list(inherited_from_domain_ids)))
+        if inherited_from_project_ids:
+            project_ids.update(
+                self.resource_api.list_project_ids_in_subtrees(
+                    list(inherited_from_project_ids)))
+        return {'project_ids': sorted(project_ids),
+                'domain_ids': sorted(domain_ids)}
+
     @notifications.role_assignment('deleted')
     def _remove_role_from_user_and_project_adapter(self, role_id, user_id=None,
                                                    group_id=None,
@@ -620,47 +712,43 @@ class Manager(manager.Manager):
         caller can determine where the assignment came from.
 
         """
-        def _make_implied_ref_copy(prior_ref, implied_role_id):
+        def _make_implied_ref_copy(prior_ref, prior_role_id, implied_role_id):
             # Create a ref for an implied role from the ref of a prior role,
             # setting the new role_id to be the implied role and the indirect
-            # role_id to be the prior role
+            # role_id to be the role it was directly implied by
             implied_ref = copy.deepcopy(prior_ref)
             implied_ref['role_id'] = implied_role_id
             indirect = implied_ref.setdefault('indirect', {})
-            indirect['role_id'] = prior_ref['role_id']
+            indirect['role_id'] = prior_role_id
             return implied_ref
 
         if not CONF.token.infer_roles:
             return role_refs
         try:
-            implied_roles_cache = {}
-            role_refs_to_check = list(role_refs)
-            ref_results = list(role_refs)
-            checked_role_refs = list()
-            while(role_refs_to_check):
-                next_ref = role_refs_to_check.pop()
-                checked_role_refs.append(next_ref)
-                next_role_id = next_ref['role_id']
-                if next_role_id in implied_roles_cache:
-                    implied_roles = implied_roles_cache[next_role_id]
-                else:
-                    implied_roles = (
-                        self.role_api.list_implied_roles(next_role_id))
-                    implied_roles_cache[next_role_id] = implied_roles
-                for implied_role in implied_roles:
-                    implied_ref = (
-                        _make_implied_ref_copy(
-                            next_ref, implied_role['implied_role_id']))
-                    if implied_ref in checked_role_refs:
-                        msg = ('Circular reference found '
-                               'role inference rules - %(prior_role_id)s.')
-                        LOG.error(msg, {'prior_role_id': next_ref['role_id']})
-                    else:
-                        ref_results.append(implied_ref)
-                        role_refs_to_check.append(implied_ref)
+            closure = self.role_api.get_role_inference_closure()
         except exception.NotImplemented:
             LOG.error('Role driver does not support implied roles.')
-
+            return list(role_refs)
+
+        def _ref_key(ref):
+            return tuple(sorted(
+                (key, tuple(sorted(value.items()))
+                 if isinstance(value, dict) else value)
+                for key, value in ref.items()))
+
+        ref_results = list(role_refs)
+        # A role implied by two prior roles that are both assigned is only
+        # listed once for each role it is directly implied by.
+        implied_ref_keys = set()
+        for ref in role_refs:
+            for prior_role_id, implied_role_id in closure.get(ref['role_id'],
+                                                              []):
+                implied_ref = _make_implied_ref_copy(
+                    ref, prior_role_id, implied_role_id)
+                implied_ref_key = _ref_key(implied_ref)
+                if implied_ref_key not in implied_ref_keys:
+                    implied_ref_keys.add(implied_ref_key)
+                    ref_results.append(implied_ref)
         return ref_results
 
     def _filter_by_role_id(self, role_id, ref_results):
@@ -679,9 +767,14 @@ class Manager(manager.Manager):
         remove any assignments that include a domain role.
 
         """
+        # Look each role up once, however many assignments it appears in.
+        global_role_ids = {}
+
         def _role_is_global(role_id):
-            ref = self.role_api.get_role(role_id)
-            return (ref['domain_id'] is None)
+            if role_id not in global_role_ids:
+                ref = self.role_api.get_role(role_id)
+                global_role_ids[role_id] = (ref['domain_id'] is None)
+            return global_role_ids[role_id]
 
         filter_results = []
         for ref in role_refs:
@@ -689,6 +782,128 @@ class Manager(manager.Manager):
                 filter_results.append(ref)
         return filter_results
 
+    def _get_from_index(self, revision, keys, load):
+        """Return entries of the in-memory assignment index.
+
+        Every change to role assignments, group membership or projects
+        invalidates the computed assignments region, in this process or in
+        another one, which replaces the ID of the region. The index is emptied
+        whenever that ID is no longer `revision`, and entries loaded after the
+        ID changed are returned without being kept.
+
+        :param revision: the ID of the computed assignments region, read
+                         before anything is loaded for the lookup.
+        :param keys: the keys of the entries.
+        :param load: a function that loads the entries for a list of keys
+                     missing from the index, returning a dict by key.
+        :returns: a list of the entries, in the order of `keys`.
+
+        """
+        with self._index_lock:
+            if revision != self._index_revision:
+                self._index = {}
+                self._index_revision = revision
+            entries = {key: self._index[key]
+                       for key in keys if key in self._index}
+        missing = [key for key in keys if key not in entries]
+        if missing:
+            loaded = load(missing)
+            with self._index_lock:
+                if revision == self._index_revision:
+                    if len(self._index) + len(loaded) > INDEX_ENTRIES_LIMIT:
+                        self._index = {}
+                    self._index.update(loaded)
+            entries.update(loaded)
+        return [entries[key] for key in keys]
+
+    def _load_actor_assignments(self, keys):
+        """Load the index entries of users and groups.
+
+        Each entry maps a target, as a tuple of the target attribute, the
+        target ID and whether the assignment is inherited, to the direct
+        assignments of the actor on that target.
+
+        """
+        refs = []
+        group_ids = []
+        for actor, actor_id in keys:
+            if actor == 'user':
+                refs += self.driver.list_role_assignments(user_id=actor_id)
+            else:
+                group_ids.append(actor_id)
+        if group_ids:
+            refs += self.driver.list_role_assignments(group_ids=group_ids)
+
+        entries = {key: collections.defaultdict(list) for key in keys}
+        for ref in refs:
+            if 'user_id' in ref:
+                actor = ('user', ref['user_id'])
+            else:
+                actor = ('group', ref['group_id'])
+            if 'project_id' in ref:
+                target = ('project_id', ref['project_id'])
+            else:
+                target = ('domain_id', ref['domain_id'])
+            inherited = 'inherited_to_projects' in ref
+            entries[actor][target + (inherited,)].append(ref)
+        return {key: dict(entry) for key, entry in entries.items()}
+
+    def _list_indexed_role_assignments(self, user_id, project_id, domain_id,
+                                       inherited):
+        """List the assignments of a user and its groups on a target.
+
+        This returns the same direct and group assignments that
+        `_list_effective_role_assignments` asks the driver for when listing
+        the assignments of a user on a single project or domain, but from the
+        in-memory assignment index, which loads the assignments of each user
+        and group, the groups of each user and the parents of each project
+        once per revision of the computed assignments region.
+
+        :returns: a tuple of the assignments of the user and the assignments
+                  of its groups.
+
+        """
+        revision = cache.get_region_id(COMPUTED_ASSIGNMENTS_REGION)
+
+        targets = []
+        if project_id:
+            def load_project(keys):
+                project = self.resource_api.get_project(project_id)
+                parents = self.resource_api.list_project_parents(project_id)
+                return {keys[0]: (project['domain_id'],
+                                  [parent['id'] for parent in parents])}
+
+            project_domain_id, parent_ids = self._get_from_index(
+                revision, [('project', project_id)], load_project)[0]
+            if inherited is not True:
+                targets.append(('project_id', project_id, False))
+            if inherited is not False:
+                # Inherited assignments can only come from the domain of the
+                # project or from its parents.
+                targets.append(('domain_id', project_domain_id, True))
+                targets += [('project_id', parent_id, True)
+                            for parent_id in parent_ids]
+        else:
+            targets.append(('domain_id', domain_id, False))
+
+        def load_groups(keys):
+            return {keys[0]: self._get_group_ids_for_user_id(user_id)}
+
+        group_ids = self._get_from_index(
+            revision, [('groups', user_id)], load_groups)[0]
+        entries = self._get_from_index(
+            revision,
+            [('user', user_id)] + [('group', group_id)
+                                   for group_id in group_ids],
+            self._load_actor_assignments)
+
+        # Copy the assignments, so that callers cannot modify the index.
+        direct_refs = [dict(ref) for target in targets
+                       for ref in entries[0].get(target, [])]
+        group_refs = [dict(ref) for target in targets for entry in entries[1:]
+                      for ref in entry.get(target, [])]
+        return direct_refs, group_refs
+
     def _list_effective_role_assignments(self, role_id, user_id, group_id,
                                          domain_id, project_id, subtree_ids,
                                          inherited, source_from_group_ids,
@@ -820,26 +1035,34 @@ class Manager(manager.Manager):
         # relevant, since domains don't inherit assignments
         inherited = False if domain_id else inherited
 
-        # List user or explicit group assignments.
-        # Due to the need to expand implied roles, this call will skip
-        # filtering by role_id and instead return the whole set of roles.
-        # Matching on the specified role is performed at the end.
-        direct_refs = list_role_assignments_for_actor(
-            role_id=None, user_id=user_id, group_ids=source_from_group_ids,
-            project_id=project_id, subtree_ids=subtree_ids,
-            domain_id=domain_id, inherited=inherited)
-
-        # And those from the user's groups, so long as we are not restricting
-        # to a set of source groups (in which case we already got those
-        # assignments in the direct listing above).
-        group_refs = []
-        if not source_from_group_ids and user_id:
-            group_ids = self._get_group_ids_for_user_id(user_id)
-            if group_ids:
-                group_refs = list_role_assignments_for_actor(
-                    role_id=None, project_id=project_id,
-                    subtree_ids=subtree_ids, group_ids=group_ids,
-                    domain_id=domain_id, inherited=inherited)
+        if (CONF.assignment.in_memory_index and user_id and not subtree_ids
+                and bool(project_id) != bool(domain_id)):
+            # The assignments of a user on a single target, as needed to
+            # issue and validate tokens, are served by the index.
+            direct_refs, group_refs = self._list_indexed_role_assignments(
+                user_id, project_id, domain_id, inherited)
+        else:
+            # List user or explicit group assignments.
+            # Due to the need to expand implied roles, this call will skip
+            # filtering by role_id and instead return the whole set of
+            # roles. Matching on the specified role is performed at the end.
+            direct_refs = list_role_assignments_for_actor(
+                role_id=None, user_id=user_id,
+                group_ids=source_from_group_ids, project_id=project_id,
+                subtree_ids=subtree_ids, domain_id=domain_id,
+                inherited=inherited)
+
+            # And those from the user's groups, so long as we are not
+            # restricting to a set of source groups (in which case we
+            # already got those assignments in the direct listing above).
+            group_refs = []
+            if not source_from_group_ids and user_id:
+                group_ids = self._get_group_ids_for_user_id(user_id)
+                if group_ids:
+                    group_refs = list_role_assignments_for_actor(
+                        role_id=None, project_id=project_id,
+                        subtree_ids=subtree_ids, group_ids=group_ids,
+                        domain_id=domain_id, inherited=inherited)
 
         # Expand grouping and inheritance on retrieved role assignments
         refs = []
@@ -943,69 +1166,124 @@ class Manager(manager.Manager):
         return role_assignments
 
     def _get_names_from_role_assignments(self, role_assignments):
-        role_assign_list = []
+        """Add the names of the actors, targets and roles to assignments.
+
+        The entities are read in bulk, one query per entity type, rather
+        than one lookup per attribute of each assignment.
+
+        """
+        refs = self._list_role_assignment_refs(role_assignments)
+        return [self._add_names_to_role_assignment(role_asgmt, refs)
+                for role_asgmt in role_assignments]
+
+    def _list_role_assignment_refs(self, role_assignments):
+        """Read the entities referenced by role assignments in bulk.
 
+        :returns: a dict mapping each of 'user', 'group', 'project', 'role'
+                  and 'domain' to a dict of the entities of that type, by ID,
+                  including the domains of the other entities.
+
+        """
+        def _by_id(refs):
+            return {ref['id']: ref for ref in refs}
+
+        ids = {'user': set(), 'group': set(), 'project': set(),
+               'domain': set(), 'role': set()}
         for role_asgmt in role_assignments:
-            new_assign = copy.deepcopy(role_asgmt)
-            for key, value in role_asgmt.items():
-                if key == 'domain_id':
-                    _domain = self.resource_api.get_domain(value)
-                    new_assign['domain_name'] = _domain['name']
-                elif key == 'user_id':
-                    try:
-                        # Note(knikolla): Try to get the user, otherwise
-                        # if the user wasn't found in the backend
-                        # use empty values.
-                        _user = self.identity_api.get_user(value)
-                    except exception.UserNotFound:
-                        msg = ('User %(user)s not found in the'
-                               ' backend but still has role assignments.')
-                        LOG.warning(msg, {'user': value})
-                        new_assign['user_name'] = ''
-                        new_assign['user_domain_id'] = ''
-                        new_assign['user_domain_name'] = ''
-                    else:
-                        new_assign['user_name'] = _user['name']
-                        new_assign['user_domain_id'] = _user['domain_id']
-                        new_assign['user_domain_name'] = (
-                            self.resource_api.get_domain(_user['domain_id'])
-                            ['name'])
-                elif key == 'group_id':
-                    try:
-                        # Note(knikolla): Try to get the group, otherwise
-                        # if the group wasn't found in the backend
-                        # use empty values.
-                        _group = self.identity_api.get_group(value)
-                    except exception.GroupNotFound:
-                        msg = ('Group %(group)s not found in the'
-                               ' backend but still has role assignments.')
-                        LOG.warning(msg, {'group': value})
-                        new_assign['group_name'] = ''
-                        new_assign['group_domain_id'] = ''
-                        new_assign['group_domain_name'] = ''
-                    else:
-                        new_assign['group_name'] = _group['name']
-                        new_assign['group_domain_id'] = _group['domain_id']
-                        new_assign['group_domain_name'] = (
-                            self.resource_api.get_domain(_group['domain_id'])
-                            ['name'])
-                elif key == 'project_id':
-                    _project = self.resource_api.get_project(value)
-                    new_assign['project_name'] = _project['name']
-                    new_assign['project_domain_id'] = _project['domain_id']
-                    new_assign['project_domain_name'] = (
-                        self.resource_api.get_domain(_project['domain_id'])
-                        ['name'])
-                elif key == 'role_id':
-                    _role = self.role_api.get_role(value)
-                    new_assign['role_name'] = _role['name']
-                    if _role['domain_id'] is not None:
-                        new_assign['role_domain_id'] = _role['domain_id']
-                        new_assign['role_domain_name'] = (
-                            self.resource_api.get_domain(_role['domain_id'])
-                            ['name'])
-            role_assign_list.append(new_assign)
-        return role_assign_list
+            for entity_type, entity_ids in ids.items():
+                if '%s_id' % entity_type in role_asgmt:
+                    entity_ids.add(role_asgmt['%s_id' % entity_type])
+
+        refs = {
+            'user': _by_id(self.identity_api.list_users_from_ids(
+                ids['user'])),
+            'group': _by_id(self.identity_api.list_groups_from_ids(
+                ids['group'])),
+            'project': _by_id(self.resource_api.list_projects_from_ids(
+                list(ids['project']))),
+            'role': _by_id(self.role_api.list_roles_from_ids(
+                list(ids['role']))),
+        }
+        for entities in refs.values():
+            for ref in entities.values():
+                if ref.get('domain_id') is not None:
+                    ids['domain'].add(ref['domain_id'])
+        refs['domain'] = _by_id(
+            self.resource_api.list_domains_from_ids(list(ids['domain'])))
+        return refs
+
+    def _add_names_to_role_assignment(self, role_asgmt, refs):
+        """Return a role assignment with the names of its entities added.
+
+        :param refs: the entities referenced by the assignment, as returned
+                     by `_list_role_assignment_refs`.
+
+        """
+        def _get_domain(domain_id):
+            try:
+                return refs['domain'][domain_id]
+            except KeyError:
+                raise exception.DomainNotFound(domain_id=domain_id)
+
+        new_assign = dict(role_asgmt)
+        for key, value in role_asgmt.items():
+            if key == 'domain_id':
+                _domain = _get_domain(value)
+                new_assign['domain_name'] = _domain['name']
+            elif key == 'user_id':
+                # Note(knikolla): Try to get the user, otherwise
+                # if the user wasn't found in the backend
+                # use empty values.
+                _user = refs['user'].get(value)
+                if _user is None:
+                    msg = ('User %(user)s not found in the'
+                           ' backend but still has role assignments.')
+                    LOG.warning(msg, {'user': value})
+                    new_assign['user_name'] = ''
+                    new_assign['user_domain_id'] = ''
+                    new_assign['user_domain_name'] = ''
+                else:
+                    new_assign['user_name'] = _user['name']
+                    new_assign['user_domain_id'] = _user['domain_id']
+                    new_assign['user_domain_name'] = (
+                        _get_domain(_user['domain_id'])['name'])
+            elif key == 'group_id':
+                # Note(knikolla): Try to get the group, otherwise
+                # if the group wasn't found in the backend
+                # use empty values.
+                _group = refs['group'].get(value)
+                if _group is None:
+                    msg = ('Group %(group)s not found in the'
+                           ' backend but still has role assignments.')
+                    LOG.warning(msg, {'group': value})
+                    new_assign['group_name'] = ''
+                    new_assign['group_domain_id'] = ''
+                    new_assign['group_domain_name'] = ''
+                else:
+                    new_assign['group_name'] = _group['name']
+                    new_assign['group_domain_id'] = _group['domain_id']
+                    new_assign['group_domain_name'] = (
+                        _get_domain(_group['domain_id'])['name'])
+            elif key == 'project_id':
+                try:
+                    _project = refs['project'][value]
+                except KeyError:
+                    raise exception.ProjectNotFound(project_id=value)
+                new_assign['project_name'] = _project['name']
+                new_assign['project_domain_id'] = _project['domain_id']
+                new_assign['project_domain_name'] = (
+                    _get_domain(_project['domain_id'])['name'])
+            elif key == 'role_id':
+                try:
+                    _role = refs['role'][value]
+                except KeyError:
+                    raise exception.RoleNotFound(role_id=value)
+                new_assign['role_name'] = _role['name']
+                if _role['domain_id'] is not None:
+                    new_assign['role_domain_id'] = _role['domain_id']
+                    new_assign['role_domain_name'] = (
+                        _get_domain(_role['domain_id'])['name'])
+        return new_assign
 
     def delete_tokens_for_role_assignments(self, role_id):
         assignments = self.list_role_assignments(role_id=role_id)
@@ -1152,8 +1430,51 @@ class RoleManager(manager.Manager):
         self.driver.delete_role(role_id)
         notifications.Audit.deleted(self._ROLE, role_id, initiator)
         self.get_role.invalidate(self, role_id)
+        # The rules of the role are deleted with it.
+        self.get_role_inference_closure.invalidate(self)
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
 
+    @MEMOIZE
+    def get_role_inference_closure(self):
+        """Return the roles implied, directly or not, by each prior role.
+
+        The closure is computed from all the role inference rules at once,
+        following them as an assignment of each prior role is expanded.
+        Since a cycle of rules is followed around once, a role implied by
+        a cycle can appear more than once, each time with a different role
+        it is directly implied by.
+
+        :returns: a dict mapping the ID of each prior role to a list of
+                  `[prior_role_id, implied_role_id]` pairs, one for each
+                  rule followed, in the order they were followed.
+
+        """
+        implied_role_ids = collections.defaultdict(list)
+        for rule in self.driver.list_role_inference_rules():
+            implied_role_ids[rule['prior_role_id']].append(
+                rule['implied_role_id'])
+
+        closure = {}
+        for role_id in implied_role_ids:
+            # A role is checked once for each role it is directly implied by.
+            checked = set([(role_id, None)])
+            role_ids_to_check = [role_id]
+            rules = []
+            while role_ids_to_check:
+                prior_role_id = role_ids_to_check.pop()
+                for implied_role_id in implied_role_ids.get(prior_role_id,
+                                                            []):
+                    if (implied_role_id, prior_role_id) in checked:
+                        LOG.error('Circular reference found role inference '
+                                  'rules - %(prior_role_id)s.',
+                                  {'prior_role_id': prior_role_id})
+                        continue
+                    checked.add((implied_role_id, prior_role_id))
+                    role_ids_to_check.append(implied_role_id)
+                    rules.append([prior_role_id, implied_role_id])
+            closure[role_id] = rules
+        return closure
+
     # TODO(ayoung): Add notification
     def create_implied_role(self, prior_role_id, implied_role_id):
         implied_role = self.driver.get_role(implied_role_id)
@@ -1166,9 +1487,11 @@ class RoleManager(manager.Manager):
                                                role_id=implied_role_id)
         response = self.driver.create_implied_role(
             prior_role_id, implied_role_id)
+        self.get_role_inference_closure.invalidate(self)
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
         return response
 
     def delete_implied_role(self, prior_role_id, implied_role_id):
         self.driver.delete_implied_role(prior_role_id, implied_role_id)
+        self.get_role_inference_closure.invalidate(self)
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
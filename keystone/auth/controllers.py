@@ -300,7 +300,7 @@ class Auth(controller.V3Controller):
     def check_token(self, request):
         token_id = request.context_dict.get('subject_token_id')
         window_seconds = authorization.token_validation_window(request)
-        token_data = self.token_provider_api.validate_token(
+        token_data = self.token_provider_api.check_token(
             token_id, window_seconds=window_seconds)
         # NOTE(morganfainberg): The code in
         # ``keystone.common.wsgi.render_response`` will remove the content
@@ -323,6 +323,41 @@ class Auth(controller.V3Controller):
             del token_data['token']['catalog']
         return render_token_data_response(token_id, token_data)
 
+    @controller.protected()
+    def validate_tokens(self, request, token_ids=None):
+        """Validate several tokens in a single request.
+
+        POST /v3/auth/tokens/validate
+
+        """
+        if token_ids is None:
+            raise exception.ValidationError(attribute='token_ids',
+                                            target='request body')
+        validation.lazy_validate(schema.token_validate_bulk, token_ids)
+        if len(token_ids) > CONF.token.max_bulk_validation:
+            msg = _('At most %d tokens may be validated in a single '
+                    'request.') % CONF.token.max_bulk_validation
+            raise exception.ValidationError(msg)
+
+        window_seconds = authorization.token_validation_window(request)
+        include_catalog = 'nocatalog' not in request.params
+        results = self.token_provider_api.validate_tokens(
+            token_ids, window_seconds=window_seconds)
+
+        tokens = []
+        for token_id in token_ids:
+            token_data = results[token_id]
+            if token_data is None:
+                tokens.append({'token_id': token_id, 'valid': False})
+                continue
+            token = token_data['token']
+            if not include_catalog and 'catalog' in token:
+                token = dict(token)
+                del token['catalog']
+            tokens.append({'token_id': token_id, 'valid': True,
+                           'token': token})
+        return {'tokens': tokens}
+
     @controller.protected()
     def revocation_list(self, request):
         if not CONF.token.revoke_by_id:
@@ -351,53 +386,19 @@ class Auth(controller.V3Controller):
 
         return {'signed': signed_text}
 
-    def _combine_lists_uniquely(self, a, b):
-        # it's most likely that only one of these will be filled so avoid
-        # the combination if possible.
-        if a and b:
-            return {x['id']: x for x in a + b}.values()
-        else:
-            return a or b
-
     @controller.protected()
     def get_auth_projects(self, request):
-        user_id = request.auth_context.get('user_id')
-        group_ids = request.auth_context.get('group_ids')
-
-        user_refs = []
-        if user_id:
-            try:
-                user_refs = self.assignment_api.list_projects_for_user(user_id)
-            except exception.UserNotFound:  # nosec
-                # federated users have an id but they don't link to anything
-                pass
-
-        grp_refs = []
-        if group_ids:
-            grp_refs = self.assignment_api.list_projects_for_groups(group_ids)
-
-        refs = self._combine_lists_uniquely(user_refs, grp_refs)
+        refs = self.assignment_api.list_projects_for_actors(
+            user_id=request.auth_context.get('user_id'),
+            group_ids=request.auth_context.get('group_ids'))
         return resource_controllers.ProjectV3.wrap_collection(
             request.context_dict, refs)
 
     @controller.protected()
     def get_auth_domains(self, request):
-        user_id = request.auth_context.get('user_id')
-        group_ids = request.auth_context.get('group_ids')
-
-        user_refs = []
-        if user_id:
-            try:
-                user_refs = self.assignment_api.list_domains_for_user(user_id)
-            except exception.UserNotFound:  # nosec
-                # federated users have an id but they don't link to anything
-                pass
-
-        grp_refs = []
-        if group_ids:
-            grp_refs = self.assignment_api.list_domains_for_groups(group_ids)
-
-        refs = self._combine_lists_uniquely(user_refs, grp_refs)
+        refs = self.assignment_api.list_domains_for_actors(
+            user_id=request.auth_context.get('user_id'),
+            group_ids=request.auth_context.get('group_ids'))
         return resource_controllers.DomainV3.wrap_collection(
             request.context_dict, refs)
 
@@ -87,3 +87,10 @@ token_issue = {
     },
     'required': ['identity', ],
 }
+
+
+token_validate_bulk = {
+    'type': 'array',
+    'items': {'type': 'string', },
+    'minItems': 1,
+}
@@ -14,6 +14,7 @@
 # under the License.
 
 import itertools
+import re
 
 import sqlalchemy
 from sqlalchemy.sql import true
@@ -30,6 +31,13 @@ from keystone.i18n import _
 
 CONF = keystone.conf.CONF
 
+# The substitutions in endpoint URLs that depend on the user and project a
+# catalog is built for. Every other substitution is made when the catalog is
+# compiled.
+_DYNAMIC_SUBSTITUTIONS = ['tenant_id', 'project_id', 'user_id']
+_PLACEHOLDER = '\x00%s\x00'
+_PLACEHOLDER_RE = re.compile('\x00(%s)\x00' % '|'.join(_DYNAMIC_SUBSTITUTIONS))
+
 
 class Region(sql.ModelBase, sql.ModelDictMixinWithExtras):
     __tablename__ = 'region'
@@ -90,8 +98,267 @@ class Endpoint(sql.ModelBase, sql.ModelDictMixinWithExtras):
         return super(Endpoint, cls).from_dict(new_dict)
 
 
+def _compile_url(url, substitutions):
+    """Make every substitution into an endpoint URL but the dynamic ones.
+
+    :param substitutions: the substitutions, with a placeholder from
+                          `_PLACEHOLDER` for each of the dynamic ones.
+    :returns: a list alternating between literal parts of the URL and the
+              names of the dynamic substitutions between them, the URL itself
+              if its dynamic substitutions are not plain strings and it must
+              be formatted for each catalog, or None if the URL is malformed.
+
+    """
+    try:
+        compiled = utils.format_url(url, substitutions)
+    except exception.MalformedEndpoint:  # nosec(tkelsey)
+        return None  # this failure is already logged in format_url()
+    for name in _DYNAMIC_SUBSTITUTIONS:
+        if url.count('$(%s)' % name) != url.count('$(%s)s' % name):
+            return url
+    return _PLACEHOLDER_RE.split(compiled)
+
+
+class CompiledCatalog(object):
+    """The enabled services and endpoints, ready to be formatted.
+
+    Endpoint URLs are compiled with `_compile_url`, so that building the
+    catalog for a user and project only fills in their IDs.
+
+    """
+
+    def __init__(self, services):
+        self.substitutions = dict(
+            itertools.chain(CONF.items(), CONF.eventlet_server.items()))
+        placeholders = dict(self.substitutions)
+        placeholders.update(
+            (name, _PLACEHOLDER % name) for name in _DYNAMIC_SUBSTITUTIONS)
+        self.v2_endpoints = []
+        self.v3_services = []
+        for svc in services:
+            v3_endpoints = []
+            for ep in svc.endpoints:
+                if not ep.enabled:
+                    continue
+                url = _compile_url(ep.url, placeholders)
+                if url is None:
+                    continue
+                self.v2_endpoints.append((ep.id, ep.region_id, ep.interface,
+                                          svc.type, svc.extra.get('name', ''),
+                                          url))
+                endpoint = ep.to_dict()
+                del endpoint['service_id']
+                del endpoint['legacy_endpoint_id']
+                del endpoint['enabled']
+                endpoint['region'] = endpoint['region_id']
+                v3_endpoints.append((endpoint, url))
+            service = {'id': svc.id, 'type': svc.type,
+                       'name': svc.extra.get('name', '')}
+            self.v3_services.append((service, v3_endpoints))
+
+    def _format_url(self, url, user_id, project_id):
+        """Format a compiled URL, returning None if it should be skipped."""
+        values = {'user_id': user_id}
+        if project_id:
+            values['tenant_id'] = values['project_id'] = project_id
+        if not isinstance(url, list):
+            values.update(self.substitutions)
+            silent_keyerror_failures = []
+            if not project_id:
+                silent_keyerror_failures = ['tenant_id', 'project_id']
+            try:
+                return utils.format_url(
+                    url, values,
+                    silent_keyerror_failures=silent_keyerror_failures)
+            except exception.MalformedEndpoint:  # nosec(tkelsey)
+                return None  # this failure is already logged in format_url()
+        parts = list(url)
+        for i in range(1, len(parts), 2):
+            if parts[i] not in values:
+                return None
+            parts[i] = '%s' % values[parts[i]]
+        return ''.join(parts)
+
+    def get_catalog(self, user_id, project_id):
+        """Format the V2 catalog for a user and project."""
+        catalog = {}
+        for (endpoint_id, region, interface, service_type, service_name,
+             url) in self.v2_endpoints:
+            url = self._format_url(url, user_id, project_id)
+            if url is None:
+                continue
+            default_service = {
+                'id': endpoint_id,
+                'name': service_name,
+                'publicURL': ''
+            }
+            catalog.setdefault(region, {})
+            catalog[region].setdefault(service_type, default_service)
+            catalog[region][service_type]['%sURL' % interface] = url
+        return catalog
+
+    def get_v3_catalog(self, user_id, project_id, endpoint_ids=None):
+        """Format the V3 catalog for a user and project.
+
+        :param endpoint_ids: if not None, only these endpoints are included,
+                             and services without any of them are left out.
+
+        """
+        catalog = []
+        for service, endpoints in self.v3_services:
+            eps = []
+            for endpoint, url in endpoints:
+                if endpoint_ids is not None and (
+                        endpoint['id'] not in endpoint_ids):
+                    continue
+                url = self._format_url(url, user_id, project_id)
+                if url:
+                    eps.append(dict(endpoint, url=url))
+            if endpoint_ids is not None and not eps:
+                continue
+            catalog.append(dict(service, endpoints=eps))
+        return catalog
+
+
 @dependency.requires('catalog_api')
 class Catalog(base.CatalogDriverBase):
+
+    def __init__(self):
+        super(Catalog, self).__init__()
+        # The compiled catalog and the catalog revision it was compiled at.
+        self._compiled_catalog = (None, None)
+
+    def _get_compiled_catalog(self):
+        """Return the catalog compiled at the current catalog revision.
+
+        Returns None if the catalog is not cached, as the catalog revision
+        then changes on every call and compiling the catalog for a single
+        call costs more than building it directly.
+
+        """
+        if not (CONF.cache.enabled and CONF.catalog.caching):
+            return None
+        revision = self.catalog_api.get_catalog_revision()
+        compiled_revision, compiled = self._compiled_catalog
+        if compiled is None or compiled_revision != revision:
+            with sql.session_for_read() as session:
+                services = (session.query(Service).filter(
+                    Service.enabled == true()).options(
+                        sql.joinedload(Service.endpoints)).all())
+                compiled = CompiledCatalog(services)
+            self._compiled_catalog = (revision, compiled)
+        return compiled
+
+    def _reset_compiled_catalog(self):
+        self._compiled_catalog = (None, None)
+
+    def _build_catalog(self, user_id, project_id):
+        """Build the V2 catalog straight from the database."""
+        substitutions = dict(
+            itertools.chain(CONF.items(), CONF.eventlet_server.items()))
+        substitutions.update({'user_id': user_id})
+        silent_keyerror_failures = []
+        if project_id:
+            substitutions.update({
+                'tenant_id': project_id,
+                'project_id': project_id
+            })
+        else:
+            silent_keyerror_failures = ['tenant_id', 'project_id']
+
+        with sql.session_for_read() as session:
+            endpoints = (session.query(Endpoint).
+                         options(sql.joinedload(Endpoint.service)).
+                         filter(Endpoint.enabled == true()).all())
+
+            catalog = {}
+
+            for endpoint in endpoints:
+                if not endpoint.service['enabled']:
+                    continue
+                try:
+                    formatted_url = utils.format_url(
+                        endpoint['url'], substitutions,
+                        silent_keyerror_failures=silent_keyerror_failures)
+                    if formatted_url is not None:
+                        url = formatted_url
+                    else:
+                        continue
+                except exception.MalformedEndpoint:  # nosec(tkelsey)
+                    continue  # this failure is already logged in format_url()
+
+                region = endpoint['region_id']
+                service_type = endpoint.service['type']
+                default_service = {
+                    'id': endpoint['id'],
+                    'name': endpoint.service.extra.get('name', ''),
+                    'publicURL': ''
+                }
+                catalog.setdefault(region, {})
+                catalog[region].setdefault(service_type, default_service)
+                interface_url = '%sURL' % endpoint['interface']
+                catalog[region][service_type][interface_url] = url
+
+            return catalog
+
+    def _build_v3_catalog(self, user_id, project_id, endpoint_ids=None):
+        """Build the V3 catalog straight from the database.
+
+        :param endpoint_ids: if not None, only these endpoints are included,
+                             and services without any of them are left out.
+
+        """
+        d = dict(
+            itertools.chain(CONF.items(), CONF.eventlet_server.items()))
+        d.update({'user_id': user_id})
+        silent_keyerror_failures = []
+        if project_id:
+            d.update({
+                'tenant_id': project_id,
+                'project_id': project_id,
+            })
+        else:
+            silent_keyerror_failures = ['tenant_id', 'project_id']
+
+        with sql.session_for_read() as session:
+            services = (session.query(Service).filter(
+                Service.enabled == true()).options(
+                    sql.joinedload(Service.endpoints)).all())
+
+            def make_v3_endpoints(endpoints):
+                for endpoint in (ep.to_dict()
+                                 for ep in endpoints if ep.enabled):
+                    if endpoint_ids is not None and (
+                            endpoint['id'] not in endpoint_ids):
+                        continue
+                    del endpoint['service_id']
+                    del endpoint['legacy_endpoint_id']
+                    del endpoint['enabled']
+                    endpoint['region'] = endpoint['region_id']
+                    try:
+                        formatted_url = utils.format_url(
+                            endpoint['url'], d,
+                            silent_keyerror_failures=silent_keyerror_failures)
+                        if formatted_url:
+                            endpoint['url'] = formatted_url
+                        else:
+                            continue
+                    except exception.MalformedEndpoint:  # nosec(tkelsey)
+                        # this failure is already logged in format_url()
+                        continue
+
+                    yield endpoint
+
+            catalog = []
+            for svc in services:
+                eps = list(make_v3_endpoints(svc.endpoints))
+                if endpoint_ids is not None and not eps:
+                    continue
+                service = {'endpoints': eps, 'id': svc.id, 'type': svc.type}
+                service['name'] = svc.extra.get('name', '')
+                catalog.append(service)
+            return catalog
+
     # Regions
     def list_regions(self, hints):
         with sql.session_for_read() as session:
@@ -197,18 +464,21 @@ class Catalog(base.CatalogDriverBase):
             return self._get_service(session, service_id).to_dict()
 
     def delete_service(self, service_id):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             ref = self._get_service(session, service_id)
             session.query(Endpoint).filter_by(service_id=service_id).delete()
             session.delete(ref)
 
     def create_service(self, service_id, service_ref):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             service = Service.from_dict(service_ref)
             session.add(service)
             return service.to_dict()
 
     def update_service(self, service_id, service_ref):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             ref = self._get_service(session, service_id)
             old_dict = ref.to_dict()
@@ -222,12 +492,14 @@ class Catalog(base.CatalogDriverBase):
 
     # Endpoints
     def create_endpoint(self, endpoint_id, endpoint):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             endpoint_ref = Endpoint.from_dict(endpoint)
             session.add(endpoint_ref)
             return endpoint_ref.to_dict()
 
     def delete_endpoint(self, endpoint_id):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             ref = self._get_endpoint(session, endpoint_id)
             session.delete(ref)
@@ -250,6 +522,7 @@ class Catalog(base.CatalogDriverBase):
             return [e.to_dict() for e in list(endpoints)]
 
     def update_endpoint(self, endpoint_id, endpoint_ref):
+        self._reset_compiled_catalog()
         with sql.session_for_write() as session:
             ref = self._get_endpoint(session, endpoint_id)
             old_dict = ref.to_dict()
@@ -276,52 +549,10 @@ class Catalog(base.CatalogDriverBase):
                   empty dict.
 
         """
-        substitutions = dict(
-            itertools.chain(CONF.items(), CONF.eventlet_server.items()))
-        substitutions.update({'user_id': user_id})
-        silent_keyerror_failures = []
-        if project_id:
-            substitutions.update({
-                'tenant_id': project_id,
-                'project_id': project_id
-            })
-        else:
-            silent_keyerror_failures = ['tenant_id', 'project_id']
-
-        with sql.session_for_read() as session:
-            endpoints = (session.query(Endpoint).
-                         options(sql.joinedload(Endpoint.service)).
-                         filter(Endpoint.enabled == true()).all())
-
-            catalog = {}
-
-            for endpoint in endpoints:
-                if not endpoint.service['enabled']:
-                    continue
-                try:
-                    formatted_url = utils.format_url(
-                        endpoint['url'], substitutions,
-                        silent_keyerror_failures=silent_keyerror_failures)
-                    if formatted_url is not None:
-                        url = formatted_url
-                    else:
-                        continue
-                except exception.MalformedEndpoint:  # nosec(tkelsey)
-                    continue  # this failure is already logged in format_url()
-
-                region = endpoint['region_id']
-                service_type = endpoint.service['type']
-                default_service = {
-                    'id': endpoint['id'],
-                    'name': endpoint.service.extra.get('name', ''),
-                    'publicURL': ''
-                }
-                catalog.setdefault(region, {})
-                catalog[region].setdefault(service_type, default_service)
-                interface_url = '%sURL' % endpoint['interface']
-                catalog[region][service_type][interface_url] = url
-
-            return catalog
+        compiled = self._get_compiled_catalog()
+        if compiled is None:
+            return self._build_catalog(user_id, project_id)
+        return compiled.get_catalog(user_id, project_id)
 
     def get_v3_catalog(self, user_id, project_id):
         """Retrieve and format the current V3 service catalog.
@@ -336,99 +567,40 @@ class Catalog(base.CatalogDriverBase):
         :returns: A list representing the service catalog or an empty list
 
         """
-        d = dict(
-            itertools.chain(CONF.items(), CONF.eventlet_server.items()))
-        d.update({'user_id': user_id})
-        silent_keyerror_failures = []
+        # Filter the catalog by any project-endpoint association configured
+        # by endpoint filter.
+        endpoint_ids = None
         if project_id:
-            d.update({
-                'tenant_id': project_id,
-                'project_id': project_id,
-            })
-        else:
-            silent_keyerror_failures = ['tenant_id', 'project_id']
-
-        with sql.session_for_read() as session:
-            services = (session.query(Service).filter(
-                Service.enabled == true()).options(
-                    sql.joinedload(Service.endpoints)).all())
-
-            def make_v3_endpoints(endpoints):
-                for endpoint in (ep.to_dict()
-                                 for ep in endpoints if ep.enabled):
-                    del endpoint['service_id']
-                    del endpoint['legacy_endpoint_id']
-                    del endpoint['enabled']
-                    endpoint['region'] = endpoint['region_id']
-                    try:
-                        formatted_url = utils.format_url(
-                            endpoint['url'], d,
-                            silent_keyerror_failures=silent_keyerror_failures)
-                        if formatted_url:
-                            endpoint['url'] = formatted_url
-                        else:
-                            continue
-                    except exception.MalformedEndpoint:  # nosec(tkelsey)
-                        # this failure is already logged in format_url()
-                        continue
-
-                    yield endpoint
-
-            # TODO(davechen): If there is service with no endpoints, we should
-            # skip the service instead of keeping it in the catalog,
-            # see bug #1436704.
-            def make_v3_service(svc):
-                eps = list(make_v3_endpoints(svc.endpoints))
-                service = {'endpoints': eps, 'id': svc.id, 'type': svc.type}
-                service['name'] = svc.extra.get('name', '')
-                return service
-
-            # Build the unfiltered catalog, this is the catalog that is
-            # returned if endpoint filtering is not performed and the
-            # option of `return_all_endpoints_if_no_filter` is set to true.
-            catalog_ref = [make_v3_service(svc) for svc in services]
-
-            # Filter the `catalog_ref` above by any project-endpoint
-            # association configured by endpoint filter.
-            filtered_endpoints = {}
-            if project_id:
-                filtered_endpoints = (
-                    self.catalog_api.list_endpoints_for_project(project_id))
-            # endpoint filter is enabled, only return the filtered endpoints.
-            if filtered_endpoints:
-                filtered_ids = list(filtered_endpoints.keys())
-                # This is actually working on the copy of `catalog_ref` since
-                # the index will be shifted if remove/add any entry for the
-                # original one.
-                for service in catalog_ref[:]:
-                    endpoints = service['endpoints']
-                    for endpoint in endpoints[:]:
-                        endpoint_id = endpoint['id']
-                        # remove the endpoint that is not associated with
-                        # the project.
-                        if endpoint_id not in filtered_ids:
-                            service['endpoints'].remove(endpoint)
-                            continue
-                        # remove the disabled endpoint from the list.
-                        if not filtered_endpoints[endpoint_id]['enabled']:
-                            service['endpoints'].remove(endpoint)
-                    # NOTE(davechen): The service will not be included in the
-                    # catalog if the service doesn't have any endpoint when
-                    # endpoint filter is enabled, this is inconsistent with
-                    # full catalog that is returned when endpoint filter is
-                    # disabled.
-                    if not service.get('endpoints'):
-                        catalog_ref.remove(service)
-            # When it arrives here it means it's domain scoped token (
-            # `project_id` is not set) or it's a project scoped token
-            # but the endpoint filtering is not performed.
-            # Both of them tell us the endpoint filtering is not enabled, so
-            # check the option of `return_all_endpoints_if_no_filter`, it will
-            # judge whether a full unfiltered catalog or a empty service
-            # catalog will be returned.
-            elif not CONF.endpoint_filter.return_all_endpoints_if_no_filter:
-                return []
-            return catalog_ref
+            endpoint_ids = (
+                self.catalog_api.list_endpoint_ids_for_project(project_id))
+        # endpoint filter is enabled, only return the filtered endpoints,
+        # the compiled catalog only has those that are enabled. The service
+        # will not be included in the catalog if the service doesn't have
+        # any endpoint when endpoint filter is enabled, this is inconsistent
+        # with full catalog that is returned when endpoint filter is
+        # disabled.
+        compiled = self._get_compiled_catalog()
+        if endpoint_ids:
+            if compiled is None:
+                return self._build_v3_catalog(user_id, project_id,
+                                              endpoint_ids=endpoint_ids)
+            return compiled.get_v3_catalog(user_id, project_id,
+                                           endpoint_ids=endpoint_ids)
+        # When it arrives here it means it's domain scoped token (
+        # `project_id` is not set) or it's a project scoped token
+        # but the endpoint filtering is not performed.
+        # Both of them tell us the endpoint filtering is not enabled, so
+        # check the option of `return_all_endpoints_if_no_filter`, it will
+        # judge whether a full unfiltered catalog or a empty service
+        # catalog will be returned.
+        elif not CONF.endpoint_filter.return_all_endpoints_if_no_filter:
+            return []
+        # TODO(davechen): If there is service with no endpoints, we should
+        # skip the service instead of keeping it in the catalog,
+        # see bug #1436704.
+        if compiled is None:
+            return self._build_v3_catalog(user_id, project_id)
+        return compiled.get_v3_catalog(user_id, project_id)
 
     @sql.handle_conflicts(conflict_type='project_endpoint')
     def add_endpoint_to_project(self, endpoint_id, project_id):
@@ -215,6 +215,16 @@ class Manager(manager.Manager):
     def list_endpoints(self, hints=None):
         return self.driver.list_endpoints(hints or driver_hints.Hints())
 
+    def get_catalog_revision(self):
+        """Return an ID that changes whenever the catalog is modified.
+
+        The ID is shared by every process using the same cache backend. It
+        may also change when the catalog has not, for example on every call
+        if caching is disabled.
+
+        """
+        return cache.get_region_id(COMPUTED_CATALOG_REGION)
+
     @MEMOIZE_COMPUTED_CATALOG
     def get_catalog(self, user_id, project_id):
         try:
@@ -245,6 +255,16 @@ class Manager(manager.Manager):
             endpoint_group_id, project_id)
         COMPUTED_CATALOG_REGION.invalidate()
 
+    def update_endpoint_group(self, endpoint_group_id, endpoint_group):
+        ref = self.driver.update_endpoint_group(endpoint_group_id,
+                                                endpoint_group)
+        COMPUTED_CATALOG_REGION.invalidate()
+        return ref
+
+    def delete_endpoint_group(self, endpoint_group_id):
+        self.driver.delete_endpoint_group(endpoint_group_id)
+        COMPUTED_CATALOG_REGION.invalidate()
+
     def delete_endpoint_group_association_by_project(self, project_id):
         try:
             self.driver.delete_endpoint_group_association_by_project(
@@ -252,6 +272,7 @@ class Manager(manager.Manager):
         except exception.NotImplemented:
             # Some catalog drivers don't support this
             pass
+        self.list_endpoint_ids_for_project.invalidate(self, project_id)
 
     def get_endpoint_groups_for_project(self, project_id):
         # recover the project endpoint group memberships and for each
@@ -265,53 +286,69 @@ class Manager(manager.Manager):
         except exception.EndpointGroupNotFound:
             return []
 
+    def _filter_endpoints_by_endpoint_group(self, endpoints, endpoint_group):
+        filters = endpoint_group['filters']
+        return [endpoint for endpoint in endpoints
+                if all(endpoint[key] == value
+                       for key, value in filters.items())]
+
     def get_endpoints_filtered_by_endpoint_group(self, endpoint_group_id):
-        endpoints = self.list_endpoints()
-        filters = self.get_endpoint_group(endpoint_group_id)['filters']
-        filtered_endpoints = []
-
-        for endpoint in endpoints:
-            is_candidate = True
-            for key, value in filters.items():
-                if endpoint[key] != value:
-                    is_candidate = False
-                    break
-            if is_candidate:
-                filtered_endpoints.append(endpoint)
-        return filtered_endpoints
+        return self._filter_endpoints_by_endpoint_group(
+            self.list_endpoints(), self.get_endpoint_group(endpoint_group_id))
 
-    def list_endpoints_for_project(self, project_id):
-        """List all endpoints associated with a project.
+    @MEMOIZE_COMPUTED_CATALOG
+    def list_endpoint_ids_for_project(self, project_id):
+        """List the IDs of all endpoints associated with a project.
+
+        This includes the endpoints associated with the project directly and
+        those matched by the endpoint groups associated with it. The result
+        is cached with the computed catalogs, which are invalidated by any
+        change to endpoints, endpoint groups or their associations.
 
         :param project_id: project identifier to check
         :type project_id: string
-        :returns: a list of endpoint ids or an empty list.
+        :returns: a frozenset of endpoint ids, empty if endpoint filtering
+                  is not configured for the project.
 
         """
         refs = self.driver.list_endpoints_for_project(project_id)
-        filtered_endpoints = {}
-        for ref in refs:
-            try:
-                endpoint = self.get_endpoint(ref['endpoint_id'])
-                filtered_endpoints.update({ref['endpoint_id']: endpoint})
-            except exception.EndpointNotFound:
-                # remove bad reference from association
-                self.remove_endpoint_from_project(ref['endpoint_id'],
-                                                  project_id)
-
         # need to recover endpoint_groups associated with project
         # then for each endpoint group return the endpoints.
         endpoint_groups = self.get_endpoint_groups_for_project(project_id)
+        if not refs and not endpoint_groups:
+            return frozenset()
+
+        endpoints = self.list_endpoints()
+        existing_ids = set(endpoint['id'] for endpoint in endpoints)
+        endpoint_ids = set()
+        for ref in refs:
+            if ref['endpoint_id'] in existing_ids:
+                endpoint_ids.add(ref['endpoint_id'])
+            else:
+                # remove bad reference from association
+                self.driver.remove_endpoint_from_project(ref['endpoint_id'],
+                                                         project_id)
         for endpoint_group in endpoint_groups:
-            endpoint_refs = self.get_endpoints_filtered_by_endpoint_group(
-                endpoint_group['id'])
-            # now check if any endpoints for current endpoint group are not
-            # contained in the list of filtered endpoints
-            for endpoint_ref in endpoint_refs:
-                if endpoint_ref['id'] not in filtered_endpoints:
-                    filtered_endpoints[endpoint_ref['id']] = endpoint_ref
+            endpoint_ids.update(
+                endpoint['id'] for endpoint in
+                self._filter_endpoints_by_endpoint_group(endpoints,
+                                                         endpoint_group))
+        return frozenset(endpoint_ids)
 
-        return filtered_endpoints
+    def list_endpoints_for_project(self, project_id):
+        """List all endpoints associated with a project.
+
+        :param project_id: project identifier to check
+        :type project_id: string
+        :returns: a dict of endpoints keyed by id, or an empty dict.
+
+        """
+        endpoint_ids = self.list_endpoint_ids_for_project(project_id)
+        if not endpoint_ids:
+            return {}
+        return dict((endpoint['id'], endpoint)
+                    for endpoint in self.list_endpoints()
+                    if endpoint['id'] in endpoint_ids)
 
     def delete_association_by_endpoint(self, endpoint_id):
         try:
@@ -326,3 +363,4 @@ class Manager(manager.Manager):
         except exception.NotImplemented:
             # Some catalog drivers don't support this
             pass
+        self.list_endpoint_ids_for_project.invalidate(self, project_id)
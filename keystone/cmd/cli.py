@@ -30,6 +30,7 @@ import pbr.version
 from keystone.cmd import doctor
 from keystone.common import driver_hints
 from keystone.common import fernet_utils
+from keystone.common import password_hashing
 from keystone.common import sql
 from keystone.common.sql import upgrades
 from keystone.common import utils
@@ -39,6 +40,7 @@ from keystone import exception
 from keystone.federation import idp
 from keystone.federation import utils as mapping_engine
 from keystone.i18n import _
+from keystone.identity.backends import sql_model as identity_sql
 from keystone.server import backends
 from keystone import token
 
@@ -1289,6 +1291,52 @@ class MappingPopulate(BaseApp):
         cls.identity_api.list_users(domain_scope=domain_id)
 
 
+class PasswordHashReport(BaseApp):
+    """Report the password hash algorithms and costs of users.
+
+    The current password of each user of the SQL identity backend is counted
+    by the algorithm and the cost it was hashed with. Rows marked as
+    outdated are not hashed the way new passwords are, given the
+    `[identity]` options; with `[identity] password_rehash_on_login`, they
+    are rehashed as their users authenticate.
+    """
+
+    name = 'password_hash_report'
+
+    @staticmethod
+    def _count_password_hashes():
+        counts = {}
+        with sql.session_for_read() as session:
+            for local_user in session.query(identity_sql.LocalUser):
+                if not local_user.passwords:
+                    continue
+                password_ref = local_user.passwords[-1]
+                hashed = password_ref.password_hash or password_ref.password
+                if hashed is None:
+                    continue
+                try:
+                    algorithm, cost = password_hashing.describe_hash(hashed)
+                except ValueError:
+                    algorithm, cost = 'unknown', {}
+                key = (algorithm, ','.join(
+                    '%s=%s' % item for item in sorted(cost.items())))
+                count, outdated = counts.get(key, (0, None))
+                if outdated is None:
+                    outdated = password_hashing.needs_rehash(hashed)
+                counts[key] = (count + 1, outdated)
+        return counts
+
+    @classmethod
+    def main(cls):
+        counts = cls._count_password_hashes()
+        row = '%-16s %-36s %8s %s'
+        print(row % ('algorithm', 'cost', 'users', 'outdated'))
+        for (algorithm, cost), (count, outdated) in sorted(counts.items()):
+            print(row % (algorithm, cost, count, 'yes' if outdated else 'no'))
+        print(row % ('total', '',
+                     sum(count for count, outdated in counts.values()), ''))
+
+
 CMDS = [
     BootStrap,
     CredentialMigrate,
@@ -1303,6 +1351,7 @@ CMDS = [
     MappingPopulate,
     MappingPurge,
     MappingEngineTester,
+    PasswordHashReport,
     SamlIdentityProviderMetadata,
     TokenFlush,
 ]
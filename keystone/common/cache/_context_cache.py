@@ -11,10 +11,14 @@
 # under the License.
 
 """A dogpile.cache proxy that caches objects in the request local cache."""
+import datetime
+import marshal
+
 from dogpile.cache import api
 from dogpile.cache import proxy
 from oslo_context import context as oslo_context
 from oslo_serialization import msgpackutils
+import six
 
 
 # Register our new handler.
@@ -28,6 +32,39 @@ def _register_model_handler(handler_class):
     _registry.frozen = True
 
 
+# Values of these types cannot be modified by the caller, so they are kept in
+# the request local cache as they are.
+_IMMUTABLE_TYPES = (type(None), bool, float, six.text_type, six.binary_type,
+                    datetime.datetime, datetime.date) + six.integer_types
+
+
+def _is_immutable(value):
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(v) for v in value)
+    return False
+
+
+class _MarshaledValue(object):
+    """A cached value that is copied with marshal on every read.
+
+    marshal only handles builtin types, but copies trees of them, such as
+    token data and catalogs, several times faster than msgpack. The data
+    never leaves this process.
+
+    """
+
+    __slots__ = ['data']
+
+    def __init__(self, value):
+        self.data = marshal.dumps((value.payload, value.metadata))
+
+    def load(self):
+        payload, metadata = marshal.loads(self.data)  # nosec
+        return api.CachedValue(payload=payload, metadata=metadata)
+
+
 class _ResponseCacheProxy(proxy.ProxyBackend):
 
     __key_pfx = '_request_cache_%s'
@@ -41,8 +78,21 @@ class _ResponseCacheProxy(proxy.ProxyBackend):
 
     def _set_local_cache(self, key, value):
         # Set a serialized version of the returned value in local cache for
-        # subsequent calls to the memoized method.
+        # subsequent calls to the memoized method. Immutable values are kept
+        # as they are, since nothing can change them; only mutable ones need
+        # to be copied for every caller, with marshal if they are made of
+        # builtin types only.
         ctx = self._get_request_context()
+        if _is_immutable(value.payload):
+            setattr(ctx, self._get_request_key(key), value)
+            return
+        try:
+            setattr(ctx, self._get_request_key(key), _MarshaledValue(value))
+            return
+        except ValueError:  # nosec
+            # NOTE: Part of the value is not of a builtin type, such as a
+            # datetime, which only msgpack can serialize.
+            pass
         serialize = {'payload': value.payload, 'metadata': value.metadata}
         setattr(ctx, self._get_request_key(key), msgpackutils.dumps(serialize))
 
@@ -54,6 +104,10 @@ class _ResponseCacheProxy(proxy.ProxyBackend):
         except AttributeError:
             return api.NO_VALUE
 
+        if isinstance(value, api.CachedValue):
+            return value
+        if isinstance(value, _MarshaledValue):
+            return value.load()
         value = msgpackutils.loads(value)
         return api.CachedValue(payload=value['payload'],
                                metadata=value['metadata'])
@@ -15,6 +15,7 @@
 """Keystone Caching Layer Implementation."""
 
 import os
+import time
 
 import dogpile.cache
 from dogpile.cache import region
@@ -22,6 +23,7 @@ from dogpile.cache import util
 from oslo_cache import core as cache
 
 from keystone.common.cache import _context_cache
+from keystone.common.cache import _local_cache
 import keystone.conf
 
 
@@ -32,21 +34,36 @@ class RegionInvalidationManager(object):
 
     REGION_KEY_PREFIX = '<<<region>>>:'
 
-    def __init__(self, invalidation_region, region_name):
+    def __init__(self, invalidation_region, region_name, local_ttl=0):
         self._invalidation_region = invalidation_region
         self._region_key = self.REGION_KEY_PREFIX + region_name
+        # When set, the region ID is kept in process for this many seconds,
+        # so invalidations by other processes are seen that much later.
+        self._local_ttl = local_ttl
+        self._local_region_id = None
 
     def _generate_new_id(self):
         return os.urandom(10)
 
+    def _set_local_region_id(self, region_id):
+        if self._local_ttl:
+            self._local_region_id = (region_id,
+                                     time.time() + self._local_ttl)
+
     @property
     def region_id(self):
-        return self._invalidation_region.get_or_create(
+        local_region_id = self._local_region_id
+        if local_region_id is not None and local_region_id[1] > time.time():
+            return local_region_id[0]
+        region_id = self._invalidation_region.get_or_create(
             self._region_key, self._generate_new_id, expiration_time=-1)
+        self._set_local_region_id(region_id)
+        return region_id
 
     def invalidate_region(self):
         new_region_id = self._generate_new_id()
         self._invalidation_region.set(self._region_key, new_region_id)
+        self._set_local_region_id(new_region_id)
         return new_region_id
 
     def is_region_key(self, key):
@@ -58,6 +75,10 @@ class DistributedInvalidationStrategy(region.RegionInvalidationStrategy):
     def __init__(self, region_manager):
         self._region_manager = region_manager
 
+    @property
+    def region_id(self):
+        return self._region_manager.region_id
+
     def invalidate(self, hard=None):
         self._region_manager.invalidate_region()
 
@@ -113,8 +134,20 @@ CACHE_INVALIDATION_REGION = create_region(name='invalidation region')
 
 register_model_handler = _context_cache._register_model_handler
 
+# The process local cache tiers, by region name.
+_LOCAL_CACHES = {}
+
 
-def configure_cache(region=None):
+def configure_cache(region=None, group=None):
+    """Configure a cache region.
+
+    :param region: the region to configure, the shared default region if
+                   None.
+    :param group: the configuration group whose `local_cache_size` and
+                  `local_cache_time` options set up a process local tier
+                  between the request cache and the cache backend.
+
+    """
     if region is None:
         region = CACHE_REGION
     # NOTE(morganfainberg): running cache.configure_cache_region()
@@ -125,16 +158,46 @@ def configure_cache(region=None):
     # Only wrap the region if it was not configured. This should be pushed
     # to oslo_cache lib somehow.
     if not configured:
+        local_ttl = 0
+        if group is not None and getattr(CONF, group).local_cache_size:
+            local_ttl = getattr(CONF, group).local_cache_time
+            local_cache = _local_cache._LocalCacheProxy(
+                getattr(CONF, group).local_cache_size, local_ttl)
+            # Wrapped first so that it sits behind the request cache.
+            region.wrap(local_cache)
+            _LOCAL_CACHES[region.name] = local_cache
         region.wrap(_context_cache._ResponseCacheProxy)
 
         region_manager = RegionInvalidationManager(
-            CACHE_INVALIDATION_REGION, region.name)
+            CACHE_INVALIDATION_REGION, region.name, local_ttl=local_ttl)
         region.key_mangler = key_mangler_factory(
             region_manager, region.key_mangler)
         region.region_invalidator = DistributedInvalidationStrategy(
             region_manager)
 
 
+def get_region_id(region):
+    """Return the current ID of a region set up by `configure_cache`.
+
+    The ID is replaced whenever the region is invalidated, by any process
+    sharing the cache backend, so it tells whether something derived from
+    the data the region caches is still current.
+
+    """
+    return region.region_invalidator.region_id
+
+
+def get_local_cache_stats():
+    """Return the hit and miss counters of the process local cache tiers.
+
+    :returns: a dict mapping the name of each region with a local tier to a
+              dict of its `hits`, `misses` and current `size`.
+
+    """
+    return {name: local_cache.stats()
+            for name, local_cache in _LOCAL_CACHES.items()}
+
+
 def _sha1_mangle_key(key):
     """Wrapper for dogpile's sha1_mangle_key.
 
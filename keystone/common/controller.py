@@ -18,6 +18,7 @@ import uuid
 from oslo_log import log
 from oslo_log import versionutils
 import six
+from six.moves.urllib import parse
 
 from keystone.common import authorization
 from keystone.common import dependency
@@ -399,6 +400,10 @@ class V3Controller(wsgi.Application):
         - Adds 'self' links in every member
         - Adds 'next', 'self' and 'prev' links for the whole collection.
 
+        Collections of at least `stream_list_threshold` members are
+        returned as a `wsgi.StreamedList`, which adds the links of each
+        member while the response is rendered.
+
         :param context: the current context, containing the original url path
                         and query string
         :param refs: the list of members of the collection
@@ -413,15 +418,27 @@ class V3Controller(wsgi.Application):
 
         if hints is not None:
             refs = cls.filter_by_attributes(refs, hints)
+            refs = cls.skip_to_marker(refs, hints)
 
         list_limited, refs = cls.limit(refs, hints)
 
-        for ref in refs:
-            cls.wrap_member(context, ref)
+        # The next page starts after the last entity of this one. Paging
+        # backwards is not supported, so there is never a previous link.
+        next_url = None
+        if list_limited and refs and 'id' in refs[-1]:
+            next_url = cls.next_url(context, refs[-1]['id'])
+
+        if (CONF.stream_list_threshold and
+                len(refs) >= CONF.stream_list_threshold):
+            refs = wsgi.StreamedList(
+                refs, functools.partial(cls.wrap_member, context))
+        else:
+            for ref in refs:
+                cls.wrap_member(context, ref)
 
         container = {cls.collection_name: refs}
         container['links'] = {
-            'next': None,
+            'next': next_url,
             'self': cls.full_url(context, path=context['path']),
             'previous': None}
 
@@ -458,11 +475,46 @@ class V3Controller(wsgi.Application):
 
         if len(refs) > hints.limit['limit']:
             # The driver layer wasn't able to truncate it for us, so we must
-            # do it here
+            # do it here, in order of ID, as the driver would have, so that
+            # the next page can start after the last entity of this one.
+            if all('id' in ref for ref in refs):
+                refs = sorted(refs, key=lambda ref: ref['id'])
             return LIMITED, refs[:hints.limit['limit']]
 
         return NOT_LIMITED, refs
 
+    @classmethod
+    def skip_to_marker(cls, refs, hints):
+        """Skip the entities up to a pagination marker.
+
+        The driver layer may have already done this for us, in which case
+        it will have cleared the marker from the hints.
+
+        :param refs: the list of members of the collection
+        :param hints: hints, containing, among other things, the marker
+                      requested
+
+        :returns: the entities with an ID greater than the marker, in order
+                  of ID.
+
+        """
+        if hints.marker is None or not all('id' in ref for ref in refs):
+            return refs
+        marker = hints.marker
+        hints.marker = None
+        return sorted((ref for ref in refs if ref['id'] > marker),
+                      key=lambda ref: ref['id'])
+
+    @classmethod
+    def next_url(cls, context, marker):
+        """Return the URL of the page of a collection after `marker`."""
+        query = [(key, value) for key, value in parse.parse_qsl(
+            context['environment'].get('QUERY_STRING', ''),
+            keep_blank_values=True) if key != 'marker']
+        query.append(('marker', marker))
+        return '%s?%s' % (cls.base_url(context, path=context['path']),
+                          parse.urlencode(query))
+
     @classmethod
     def filter_by_attributes(cls, refs, hints):
         """Filter a list of references by filter values."""
@@ -540,6 +592,21 @@ class V3Controller(wsgi.Application):
             return hints
 
         for key, value in request.params.items():
+            # Check if this is a pagination directive
+            if key == 'marker':
+                hints.marker = value
+                continue
+            if key == 'limit':
+                try:
+                    limit = int(value)
+                except ValueError:
+                    limit = 0
+                if limit < 1:
+                    raise exception.ValidationError(
+                        message=_('The limit must be a positive integer.'))
+                hints.set_limit(limit)
+                continue
+
             # Check if this is an exact filter
             if supported_filters is None or key in supported_filters:
                 hints.add_filter(key, value)
@@ -575,9 +642,6 @@ class V3Controller(wsgi.Application):
                                  comparator=comparator,
                                  case_sensitive=case_sensitive)
 
-        # NOTE(henry-nash): If we were to support pagination, we would pull any
-        # pagination directives out of the query_dict here, and add them into
-        # the hints list.
         return hints
 
     def _require_matching_id(self, value, ref):
@@ -46,6 +46,13 @@ def truncated(f):
         hints.set_limit(list_limit + 1)
         ref_list = f(self, hints, *args, **kwargs)
 
+        # If the driver could not satisfy a pagination marker, the caller
+        # has to skip the entities before the marker before truncating, so
+        # leave the whole list to it.
+        if hints.marker is not None:
+            hints.set_limit(list_limit)
+            return ref_list
+
         # If we got more than the original limit then trim back the list and
         # mark it truncated.  In both cases, make sure we set the limit back
         # to its original value.
@@ -74,6 +81,11 @@ class Hints(object):
     accessed publicly. Also it contains a dict called limit, which will
     indicate the amount of data we want to limit our listing to.
 
+    The marker, if set, is the ID of the last entity of the previous page of
+    a paginated listing, so only entities with a greater ID are wanted, in
+    order of their ID. A driver that satisfies the marker must set it back to
+    None, like it removes the filters it satisfies.
+
     If the filter is discovered to never match, then `cannot_match` can be set
     to indicate that there will not be any matches and the backend work can be
     short-circuited.
@@ -91,6 +103,7 @@ class Hints(object):
 
     def __init__(self):
         self.limit = None
+        self.marker = None
         self.filters = list()
         self.cannot_match = False
 
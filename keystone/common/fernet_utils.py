@@ -13,6 +13,8 @@
 import base64
 import os
 import stat
+import threading
+import time
 
 from cryptography import fernet
 from oslo_log import log
@@ -32,6 +34,43 @@ CONF = keystone.conf.CONF
 # upgrades.
 NULL_KEY = base64.urlsafe_b64encode(b'\x00' * 32)
 
+# Keys loaded from each key repository, along with the MultiFernet instance
+# built from them, so that they are only read from disk again once the
+# repository changes. See FernetUtils.load_multi_fernet().
+_KEY_REPOSITORY_CACHE = {}
+_KEY_REPOSITORY_CACHE_LOCK = threading.Lock()
+
+# Directory timestamps may only be accurate to the second, so a key repository
+# modified within this many seconds of being loaded could be modified again
+# without its timestamp changing. Such a repository is reloaded on every call
+# until its timestamp is old enough to be trusted.
+_KEY_REPOSITORY_SETTLE_TIME = 2
+
+
+class _KeyRepositoryCacheEntry(object):
+    def __init__(self, signature, loaded_at, crypto, keys):
+        self.signature = signature
+        self.loaded_at = loaded_at
+        self.crypto = crypto
+        self.keys = keys
+
+    def is_current(self, signature):
+        if signature is None or signature != self.signature:
+            return False
+        mtime = signature[2]
+        return mtime < self.loaded_at - _KEY_REPOSITORY_SETTLE_TIME
+
+
+def _key_repository_signature(key_repository):
+    try:
+        stat_info = os.stat(key_repository)
+    except OSError:
+        return None
+    # Rotating keys, or replacing them with rsync or keystone-manage, creates
+    # and renames files in the repository, which updates its mtime.
+    return (stat_info.st_dev, stat_info.st_ino, stat_info.st_mtime,
+            stat_info.st_mode, stat_info.st_uid, stat_info.st_gid)
+
 
 class FernetUtils(object):
 
@@ -312,3 +351,35 @@ class FernetUtils(object):
             key_list.append(NULL_KEY)
 
         return key_list
+
+    def load_multi_fernet(self, use_null_key=False):
+        """Return a MultiFernet instance for the keys in the repository.
+
+        The keys and the instance built from them are cached per process, and
+        are only loaded from disk again when the key repository changes. Key
+        files must therefore be replaced by creating or renaming files in the
+        repository, as `keystone-manage` does, rather than rewritten in place.
+
+        :param use_null_key: If true, a known key containing null bytes will be
+                             appended to the list of keys.
+        :returns: a tuple of the MultiFernet instance, or None if there are no
+                  keys, and the list of keys as returned by `load_keys()`.
+
+        """
+        cache_key = (self.key_repository, self.max_active_keys, use_null_key)
+        signature = _key_repository_signature(self.key_repository)
+        with _KEY_REPOSITORY_CACHE_LOCK:
+            entry = _KEY_REPOSITORY_CACHE.get(cache_key)
+            if entry is not None and entry.is_current(signature):
+                return entry.crypto, list(entry.keys)
+
+        loaded_at = time.time()
+        keys = self.load_keys(use_null_key=use_null_key)
+        if not keys:
+            return None, keys
+
+        crypto = fernet.MultiFernet([fernet.Fernet(key) for key in keys])
+        with _KEY_REPOSITORY_CACHE_LOCK:
+            _KEY_REPOSITORY_CACHE[cache_key] = _KeyRepositoryCacheEntry(
+                signature, loaded_at, crypto, list(keys))
+        return crypto, keys
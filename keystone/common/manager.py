@@ -56,9 +56,12 @@ def response_truncated(f):
         if kwargs.get('hints') is None:
             return f(self, *args, **kwargs)
 
+        hints = kwargs['hints']
         list_limit = self.driver._get_list_limit()
-        if list_limit:
-            kwargs['hints'].set_limit(list_limit)
+        # A smaller limit may have been requested by the caller.
+        if list_limit and (hints.limit is None or
+                           hints.limit['limit'] > list_limit):
+            hints.set_limit(list_limit)
         return f(self, *args, **kwargs)
     return wrapper
 
@@ -13,7 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import hashlib
+import hmac
 import itertools
+import multiprocessing
+import os
+import threading
+import time
 
 from oslo_log import log
 import passlib.hash
@@ -33,6 +40,10 @@ SUPPORTED_HASHERS = frozenset([passlib.hash.bcrypt,
 
 _HASHER_NAME_MAP = {hasher.name: hasher for hasher in SUPPORTED_HASHERS}
 
+# The least number of seconds between two logs of the counters of a hashing
+# pool.
+POOL_STATS_LOG_INTERVAL = 600
+
 
 # NOTE(notmorgan): Build the list of prefixes. This comprehension builds
 # a dictionary where the keys are the prefix (all hashedpasswords are
@@ -73,6 +84,164 @@ def verify_length_and_trunc_password(password):
         raise exception.ValidationError(attribute='string', target='password')
 
 
+class _HashingPool(object):
+    """Hash and verify passwords in a pool of worker processes.
+
+    At most `workers` passwords are hashed at once, and at most `queue_size`
+    more wait for a worker. Callers beyond that wait for a place in the
+    queue, so that a burst of password authentications is held back in the
+    threads that issued it rather than piling up in the pool. A password
+    that the pool does not hash within `[identity] password_hash_timeout`,
+    for example because the worker hashing it died, is hashed in the calling
+    thread instead.
+
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._pool = multiprocessing.Pool(workers)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._waiting = 0
+        self._throttled = 0
+        self._timed_out = 0
+        self._completed = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+        self._logged_at = time.time()
+
+    def stats(self):
+        """Return the queue depth and latency counters of the pool."""
+        with self._lock:
+            return {'workers': self.workers,
+                    'queue_size': self.queue_size,
+                    'pending': self._pending,
+                    'waiting': self._waiting,
+                    'throttled': self._throttled,
+                    'timed_out': self._timed_out,
+                    'completed': self._completed,
+                    'total_time': self._total_time,
+                    'max_time': self._max_time}
+
+    def run(self, func, *args):
+        start = time.time()
+        if not self._slots.acquire(False):
+            with self._lock:
+                self._waiting += 1
+                self._throttled += 1
+            self._slots.acquire()
+            with self._lock:
+                self._waiting -= 1
+        try:
+            with self._lock:
+                self._pending += 1
+            timeout = CONF.identity.password_hash_timeout
+            try:
+                return self._pool.apply_async(func, args).get(timeout)
+            except multiprocessing.TimeoutError:
+                LOG.warning('No password hashing worker returned a hash '
+                            'within %d seconds, hashing the password in the '
+                            'thread handling the request instead.', timeout)
+                with self._lock:
+                    self._timed_out += 1
+                return func(*args)
+        finally:
+            self._slots.release()
+            elapsed = time.time() - start
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_time += elapsed
+                self._max_time = max(self._max_time, elapsed)
+            self._log_stats()
+
+    def _log_stats(self):
+        """Log the counters of the pool, at most once per interval."""
+        now = time.time()
+        with self._lock:
+            if now - self._logged_at < POOL_STATS_LOG_INTERVAL:
+                return
+            self._logged_at = now
+        LOG.info('Password hashing pool: %(completed)d passwords hashed in '
+                 '%(total_time).1f seconds, at most %(max_time).1f seconds '
+                 'each, %(pending)d pending, %(waiting)d waiting for the '
+                 'queue, throttled %(throttled)d times, %(timed_out)d timed '
+                 'out.', self.stats())
+
+    def terminate(self):
+        self._pool.terminate()
+
+
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    """Return the hashing pool of this process, or None if it has none."""
+    global _POOL, _POOL_PID
+
+    workers = CONF.identity.password_hash_workers
+    queue_size = CONF.identity.password_hash_queue_size
+
+    def current(pool):
+        # NOTE: The workers of a pool belong to the process that started
+        # them, so a process forked from it, such as a WSGI worker, starts
+        # its own.
+        return (pool is not None and _POOL_PID == os.getpid() and
+                (pool.workers, pool.queue_size) == (workers, queue_size))
+
+    pool = _POOL
+    if current(pool) or (pool is None and not workers):
+        return pool
+    with _POOL_LOCK:
+        if current(_POOL):
+            return _POOL
+        if _POOL is not None and _POOL_PID == os.getpid():
+            _POOL.terminate()
+        _POOL = _POOL_PID = None
+        if workers:
+            _POOL = _HashingPool(workers, queue_size)
+            _POOL_PID = os.getpid()
+        return _POOL
+
+
+def get_hashing_pool_stats():
+    """Return the queue depth and latency counters of the hashing pool.
+
+    :returns: None if `[identity] password_hash_workers` is not set,
+              otherwise a dict of the number of `workers`, the
+              `queue_size`, the number of passwords `pending` in the pool
+              and of callers `waiting` for a place in its queue, the number
+              of times a caller had to wait (`throttled`), the number of
+              passwords hashed in the calling thread because the pool did
+              not return them in time (`timed_out`), and the number of
+              passwords `completed`, with the `total_time` and `max_time`,
+              in seconds, it took to get them back. The counters are also
+              logged every `POOL_STATS_LOG_INTERVAL` seconds at most.
+
+    """
+    pool = _get_pool()
+    return pool.stats() if pool is not None else None
+
+
+def _run(func, *args):
+    pool = _get_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def _verify(hasher_name, password_utf8, hashed):
+    return _HASHER_NAME_MAP[hasher_name].verify(password_utf8, hashed)
+
+
+def _hash(hasher_name, params, password_utf8):
+    return _HASHER_NAME_MAP[hasher_name].using(**params).hash(password_utf8)
+
+
 def check_password(password, hashed):
     """Check that a plaintext password matches hashed.
 
@@ -84,7 +253,66 @@ def check_password(password, hashed):
         return False
     password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
     hasher = _get_hasher_from_ident(hashed)
-    return hasher.verify(password_utf8, hashed)
+    return _run(_verify, hasher.name, password_utf8, hashed)
+
+
+# The most users whose verified password is remembered at once.
+VERIFIED_PASSWORDS_LIMIT = 10000
+
+# NOTE: Only an HMAC of a verified password is remembered, never the password,
+# keyed with random bytes drawn when the process starts. Someone able to read
+# the memory of the process could still test guesses against it much faster
+# than against the password hash, which is why remembering passwords is off
+# by default and only for a short time.
+_VERIFIED_PASSWORDS_KEY = os.urandom(32)
+_VERIFIED_PASSWORDS = collections.OrderedDict()
+_VERIFIED_PASSWORDS_LOCK = threading.Lock()
+
+
+def _verified_password_digest(user_id, hashed, password_utf8):
+    message = b'\0'.join([user_id.encode('utf-8'), hashed.encode('utf-8'),
+                          password_utf8])
+    return hmac.new(_VERIFIED_PASSWORDS_KEY, message,
+                    hashlib.sha256).digest()
+
+
+def check_user_password(user_id, password, hashed):
+    """Check that the plaintext password of a user matches hashed.
+
+    If `[identity] password_verification_cache_ttl` is set, a password that
+    matches is remembered for that many seconds, so that checking it again
+    for the same user, against the same hash, skips the password hashing.
+    A user remembers only the last password that matched.
+
+    """
+    ttl = CONF.identity.password_verification_cache_ttl
+    if not ttl or password is None or hashed is None:
+        return check_password(password, hashed)
+
+    password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
+    digest = _verified_password_digest(user_id, hashed, password_utf8)
+    now = time.time()
+    with _VERIFIED_PASSWORDS_LOCK:
+        entry = _VERIFIED_PASSWORDS.get(user_id)
+    if (entry is not None and entry[0] > now and
+            hmac.compare_digest(entry[1], digest)):
+        return True
+
+    hasher = _get_hasher_from_ident(hashed)
+    if not _run(_verify, hasher.name, password_utf8, hashed):
+        return False
+    with _VERIFIED_PASSWORDS_LOCK:
+        _VERIFIED_PASSWORDS.pop(user_id, None)
+        _VERIFIED_PASSWORDS[user_id] = (now + ttl, digest)
+        while len(_VERIFIED_PASSWORDS) > VERIFIED_PASSWORDS_LIMIT:
+            _VERIFIED_PASSWORDS.popitem(last=False)
+    return True
+
+
+def forget_user_password(user_id):
+    """Forget the password of a user remembered by `check_user_password`."""
+    with _VERIFIED_PASSWORDS_LOCK:
+        _VERIFIED_PASSWORDS.pop(user_id, None)
 
 
 def hash_user_password(user):
@@ -98,14 +326,13 @@ def hash_user_password(user):
 
 def hash_password_compat(password):
     password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
-    return passlib.hash.sha512_crypt.using(rounds=CONF.crypt_strength).hash(
-        password_utf8)
+    return _run(_hash, passlib.hash.sha512_crypt.name,
+                {'rounds': CONF.crypt_strength}, password_utf8)
 
 
-def hash_password(password):
-    """Hash a password. Harder."""
+def _get_configured_hasher():
+    """Return the configured hasher and the parameters to hash with."""
     params = {}
-    password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
     conf_hasher = CONF.identity.password_hash_algorithm
     hasher = _HASHER_NAME_MAP.get(conf_hasher)
 
@@ -127,4 +354,50 @@ def hash_password(password):
         if CONF.identity.salt_bytesize:
             params['salt_size'] = CONF.identity.salt_bytesize
 
-    return hasher.using(**params).hash(password_utf8)
+    return hasher, params
+
+
+def hash_password(password):
+    """Hash a password. Harder."""
+    password_utf8 = verify_length_and_trunc_password(password).encode('utf-8')
+    hasher, params = _get_configured_hasher()
+    return _run(_hash, hasher.name, params, password_utf8)
+
+
+def needs_rehash(hashed):
+    """Check whether hashed is not hashed the way passwords are hashed now.
+
+    That is, with another algorithm than `[identity] password_hash_algorithm`
+    or, as passlib's `needs_update` tells, with another cost than
+    `[identity] password_hash_rounds` (or the default rounds of the
+    algorithm) and, for scrypt, the configured block size and parallelism.
+
+    """
+    if hashed is None:
+        return False
+    hasher, params = _get_configured_hasher()
+    try:
+        if _get_hasher_from_ident(hashed) is not hasher:
+            return True
+    except ValueError:
+        return False
+    params.pop('salt_size', None)
+    rounds = params.pop('rounds', hasher.default_rounds)
+    return hasher.using(min_desired_rounds=rounds, max_desired_rounds=rounds,
+                        **params).needs_update(hashed)
+
+
+def describe_hash(hashed):
+    """Return the algorithm and the cost of hashed.
+
+    :returns: a tuple of the name of the algorithm and a dict of its cost
+              parameters, such as `rounds`.
+
+    """
+    hasher = _get_hasher_from_ident(hashed)
+    parsed = hasher.from_string(hashed)
+    cost = {'rounds': parsed.rounds}
+    if hasher is passlib.hash.scrypt:
+        cost['block_size'] = parsed.block_size
+        cost['parallelism'] = parsed.parallelism
+    return hasher.name, cost
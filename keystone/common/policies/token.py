@@ -29,6 +29,12 @@ token_policies = [
                      'method': 'GET'},
                     {'path': '/v2.0/tokens/{token_id}',
                      'method': 'GET'}]),
+    policy.DocumentedRuleDefault(
+        name=base.IDENTITY % 'validate_tokens',
+        check_str=base.RULE_SERVICE_OR_ADMIN,
+        description='Validate several tokens at once.',
+        operations=[{'path': '/v3/auth/tokens/validate',
+                     'method': 'POST'}]),
     policy.DocumentedRuleDefault(
         name=base.IDENTITY % 'validate_token_head',
         check_str=base.RULE_SERVICE_OR_ADMIN,
@@ -0,0 +1,81 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy as sql
+
+
+# The number of rows inserted per statement.
+BATCH_SIZE = 1000
+
+
+def _list_ancestors(project_id, parents, ancestors):
+    """Return the ancestor IDs of a project, nearest first.
+
+    :param parents: the parent ID of every project.
+    :param ancestors: the ancestor IDs of the projects already visited, which
+                      is updated with those of the projects visited now.
+
+    """
+    # Walk up to the nearest project whose ancestors are known, then record
+    # the ancestors of every project on the way back down.
+    path = []
+    current_id = project_id
+    while current_id not in ancestors:
+        path.append(current_id)
+        parent_id = parents.get(current_id)
+        if parent_id is None or parent_id in path:
+            ancestors[current_id] = []
+            break
+        current_id = parent_id
+    for current_id in reversed(path):
+        if current_id not in ancestors:
+            parent_id = parents[current_id]
+            ancestors[current_id] = [parent_id] + ancestors[parent_id]
+    return ancestors[project_id]
+
+
+def upgrade(migrate_engine):
+    # NOTE: Nodes still running the previous release keep creating projects
+    # after the data migration, without indexing them. Now that every node
+    # runs this release, index them, as the data migration did the others.
+    meta = sql.MetaData()
+    meta.bind = migrate_engine
+
+    project = sql.Table('project', meta, autoload=True)
+    project_hierarchy = sql.Table('project_hierarchy', meta, autoload=True)
+
+    with migrate_engine.begin() as conn:
+        indexed = set(row.descendant_id for row in conn.execute(
+            sql.select([project_hierarchy.c.descendant_id]).where(
+                project_hierarchy.c.depth == 0)))
+        parents = dict(
+            (row.id, row.parent_id) for row in conn.execute(
+                sql.select([project.c.id, project.c.parent_id])))
+
+        ancestors = {}
+        rows = []
+        for project_id in parents:
+            if project_id in indexed:
+                continue
+            rows.append({'ancestor_id': project_id,
+                         'descendant_id': project_id,
+                         'depth': 0})
+            for depth, ancestor_id in enumerate(
+                    _list_ancestors(project_id, parents, ancestors), 1):
+                rows.append({'ancestor_id': ancestor_id,
+                             'descendant_id': project_id,
+                             'depth': depth})
+            if len(rows) >= BATCH_SIZE:
+                conn.execute(project_hierarchy.insert(), rows)
+                rows = []
+        if rows:
+            conn.execute(project_hierarchy.insert(), rows)
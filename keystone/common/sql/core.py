@@ -19,6 +19,8 @@ CONF() because it sets up configuration options.
 
 """
 import functools
+import re
+import weakref
 
 from oslo_db import exception as db_exception
 from oslo_db import options as db_options
@@ -30,6 +32,7 @@ from osprofiler import opts as profiler
 import osprofiler.sqlalchemy
 import six
 import sqlalchemy as sql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext import declarative
 from sqlalchemy.orm.attributes import flag_modified, InstrumentedAttribute
 from sqlalchemy import types as sql_types
@@ -291,6 +294,134 @@ class _WontMatch(Exception):
         # Otherwise the value could match a value in the column.
 
 
+# The character escaping the wildcards of LIKE patterns built from filters.
+_LIKE_ESCAPE = '!'
+
+# The names of the attributes of `extra` that can be filtered in SQL.
+_EXTRA_ATTRIBUTE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _like_pattern(comparator, value, escape=_LIKE_ESCAPE):
+    """Return the LIKE pattern matching an inexact filter value.
+
+    Wildcards in the value are escaped, so that they only match themselves,
+    as they do when filtering in the controller.
+
+    """
+    for char in (escape, '%', '_'):
+        value = value.replace(char, escape + char)
+    if comparator == 'contains':
+        return '%%%s%%' % value
+    elif comparator == 'startswith':
+        return '%s%%' % value
+    return '%%%s' % value
+
+
+def _glob_pattern(comparator, value):
+    """Return the SQLite GLOB pattern matching an inexact filter value."""
+    value = re.sub(r'([*?[])', r'[\1]', value)
+    if comparator == 'contains':
+        return '*%s*' % value
+    elif comparator == 'startswith':
+        return '%s*' % value
+    return '*%s' % value
+
+
+def _inexact_term(dialect, expression, filter_):
+    """Translate an inexact filter on a string expression to SQL.
+
+    Case insensitive filters are translated with ILIKE. Case sensitive ones
+    need an operator that is case sensitive whatever the collation of the
+    column, which only the dialects below are known to have.
+
+    :returns: the query term, or None if the filter can't be translated
+    """
+    comparator = filter_['comparator']
+    if comparator not in ('contains', 'startswith', 'endswith'):
+        return None
+    value = filter_['value']
+
+    if not filter_['case_sensitive']:
+        return expression.ilike(_like_pattern(comparator, value),
+                                escape=_LIKE_ESCAPE)
+    elif dialect.name == 'postgresql':
+        return expression.like(_like_pattern(comparator, value),
+                               escape=_LIKE_ESCAPE)
+    elif dialect.name == 'mysql':
+        # MySQL escapes LIKE wildcards with a backslash by default.
+        return expression.op('LIKE BINARY')(
+            _like_pattern(comparator, value, escape='\\'))
+    elif dialect.name == 'sqlite':
+        return expression.op('GLOB')(_glob_pattern(comparator, value))
+    return None
+
+
+# The statement run to find out whether SQLite has the JSON1 functions, and
+# the answer for each engine.
+_SQLITE_JSON_PROBE = "SELECT json_type('{}')"
+_SQLITE_JSON = weakref.WeakKeyDictionary()
+
+
+def _sqlite_has_json(session):
+    """Return whether the SQLite database of a session has JSON functions.
+
+    They come from the JSON1 extension, which SQLite only builds in by
+    default from 3.38, so they are probed for once per engine.
+
+    """
+    engine = session.get_bind()
+    try:
+        return _SQLITE_JSON[engine]
+    except KeyError:
+        pass
+    try:
+        session.execute(sql.text(_SQLITE_JSON_PROBE))
+        has_json = True
+    except (sql.exc.OperationalError, db_exception.DBError):
+        has_json = False
+    _SQLITE_JSON[engine] = has_json
+    return has_json
+
+
+def _extra_attribute(session, model, name):
+    """Return SQL expressions reading an attribute stored in `extra`.
+
+    `extra` is a JSON document stored as text, so reading it relies on the
+    JSON functions of the database, which only the dialects and versions
+    below are known to have.
+
+    :returns: a tuple of the text of the attribute and of the conditions for
+              it to be a string, true and false, or None if the dialect
+              can't read it
+    """
+    dialect = session.get_bind().dialect
+    version = dialect.server_version_info or ()
+    if (dialect.name == 'sqlite' and version >= (3, 9) and
+            _sqlite_has_json(session)):
+        path = '$."%s"' % name
+        json_type = sql.func.json_type(model.extra, path)
+        return (sql.func.json_extract(model.extra, path),
+                json_type == 'text', json_type == 'true',
+                json_type == 'false')
+    elif (dialect.name == 'mysql' and 'MariaDB' not in version and
+            version >= (5, 7, 8)):
+        value = sql.func.json_extract(model.extra, '$."%s"' % name)
+        json_type = sql.func.json_type(value)
+        text = sql.func.json_unquote(value)
+        return (text, json_type == 'STRING',
+                sql.and_(json_type == 'BOOLEAN', text == 'true'),
+                sql.and_(json_type == 'BOOLEAN', text == 'false'))
+    elif dialect.name == 'postgresql' and version >= (9, 4):
+        document = sql.cast(model.extra, postgresql.JSON)
+        json_type = sql.func.json_typeof(
+            sql.func.json_extract_path(document, name))
+        text = sql.func.json_extract_path_text(document, name)
+        return (text, json_type == 'string',
+                sql.and_(json_type == 'boolean', text == 'true'),
+                sql.and_(json_type == 'boolean', text == 'false'))
+    return None
+
+
 def _filter(model, query, hints):
     """Apply filtering to a query.
 
@@ -316,30 +447,13 @@ def _filter(model, query, hints):
 
         """
         column_attr = getattr(model, filter_['name'])
-
-        # TODO(henry-nash): Sqlalchemy 0.7 defaults to case insensitivity
-        # so once we find a way of changing that (maybe on a call-by-call
-        # basis), we can add support for the case sensitive versions of
-        # the filters below.  For now, these case sensitive versions will
-        # be handled at the controller level.
-
-        if filter_['case_sensitive']:
-            return query
-
-        if filter_['comparator'] == 'contains':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%%%s%%' % filter_['value'])
-        elif filter_['comparator'] == 'startswith':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%s%%' % filter_['value'])
-        elif filter_['comparator'] == 'endswith':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%%%s' % filter_['value'])
-        else:
-            # It's a filter we don't understand, so let the caller
+        query_term = _inexact_term(dialect, column_attr, filter_)
+        if query_term is None:
+            # It's a filter we can't translate, so let the caller
             # work out if they need to do something with it.
             return query
 
+        _WontMatch.check(filter_['value'], column_attr)
         satisfied_filters.append(filter_)
         return query.filter(query_term)
 
@@ -365,10 +479,50 @@ def _filter(model, query, hints):
         satisfied_filters.append(filter_)
         return query.filter(col == filter_val)
 
+    def extra_filter(model, query, filter_, satisfied_filters):
+        """Apply a filter on an attribute stored in `extra` to a query.
+
+        The attribute matches as it would in the controller: an exact filter
+        matches a string equal to the value, or a boolean equal to the value
+        read as a boolean string, and an inexact filter only matches strings.
+
+        :param model: the table model in question
+        :param query: query to apply filters to
+        :param dict filter_: describes this filter
+        :param list satisfied_filters: filter_ will be added if it is
+                                       satisfied.
+        :returns: query updated to add the filter if it is satisfied
+        """
+        value = filter_['value']
+        if (not isinstance(value, six.string_types) or
+                not _EXTRA_ATTRIBUTE.match(filter_['name'])):
+            return query
+        attribute = _extra_attribute(query.session, model, filter_['name'])
+        if attribute is None:
+            return query
+        text, is_string, is_true, is_false = attribute
+
+        if filter_['comparator'] == 'equals':
+            is_boolean = is_true if utils.attr_as_boolean(value) else is_false
+            query_term = sql.or_(sql.and_(is_string, text == value),
+                                 is_boolean)
+        else:
+            query_term = _inexact_term(dialect, text, filter_)
+            if query_term is None:
+                return query
+            query_term = sql.and_(is_string, query_term)
+
+        satisfied_filters.append(filter_)
+        return query.filter(query_term)
+
     try:
+        dialect = query.session.get_bind().dialect
         satisfied_filters = []
         for filter_ in hints.filters:
             if filter_['name'] not in model.attributes:
+                if issubclass(model, ModelDictMixinWithExtras):
+                    query = extra_filter(model, query, filter_,
+                                         satisfied_filters)
                 continue
             if filter_['comparator'] == 'equals':
                 query = exact_filter(model, query, filter_,
@@ -387,25 +541,64 @@ def _filter(model, query, hints):
         return
 
 
-def _limit(query, hints):
-    """Apply a limit to a query.
+# The number of rows read at a time by unlimited listings.
+LIST_BATCH_SIZE = 1000
+
 
+def _iterate_in_batches(query, id_column):
+    """Yield the rows of a query ordered by ID, reading them in batches.
+
+    Each batch is read by a query of its own, starting after the last ID of
+    the previous batch, so only a batch of rows is loaded at a time and the
+    rows already yielded can be released by the caller. Unlike `yield_per`,
+    this works with the eager loading of relationships.
+
+    """
+    query = query.order_by(id_column)
+    batch = query.limit(LIST_BATCH_SIZE).all()
+    while batch:
+        for row in batch:
+            yield row
+        if len(batch) < LIST_BATCH_SIZE:
+            return
+        last_id = getattr(batch[-1], id_column.key)
+        batch = None
+        batch = query.filter(id_column > last_id).limit(LIST_BATCH_SIZE).all()
+
+
+def _limit(model, query, hints):
+    """Apply a limit and a pagination marker to a query.
+
+    When a limit is set, one more row than the limit is fetched to tell
+    whether the list was truncated, instead of counting the rows. Limited
+    and paginated queries are ordered by ID, so that the ID of the last row
+    can be used as the marker of the next page. Otherwise, the rows of
+    models with an ID are read in batches.
+
+    :param model: the table model in question
     :param query: query to apply filters to
     :param hints: contains the list of filters and limit details.
 
-    :returns: query updated with any limits satisfied
+    :returns: query updated with the marker satisfied, or an iterable of the
+              rows
 
     """
-    # NOTE(henry-nash): If we were to implement pagination, then we
-    # we would expand this method to support pagination and limiting.
+    id_column = getattr(model, 'id', None)
+    if id_column is not None and hints.marker is not None:
+        query = query.filter(id_column > hints.marker)
+        hints.marker = None
 
-    # If we satisfied all the filters, set an upper limit if supplied
     if hints.limit:
-        original_len = query.count()
-        limit_query = query.limit(hints.limit['limit'])
-        if limit_query.count() < original_len:
+        if id_column is not None:
+            query = query.order_by(id_column)
+        limit = hints.limit['limit']
+        refs = query.limit(limit + 1).all()
+        if len(refs) > limit:
             hints.limit['truncated'] = True
-            query = limit_query
+            refs = refs[:limit]
+        return refs
+    if id_column is not None:
+        return _iterate_in_batches(query, id_column)
     return query
 
 
@@ -441,7 +634,7 @@ def filter_limit_query(model, query, hints):
     # as well.
 
     if not hints.filters:
-        return _limit(query, hints)
+        return _limit(model, query, hints)
     else:
         return query
 
@@ -687,6 +687,81 @@ class V3ExtensionRouter(ExtensionRouter, RoutersBase):
         return response
 
 
+class StreamedList(object):
+    """A list in a response body that is rendered one item at a time.
+
+    A JSON response body holding a StreamedList as the value of one of its
+    keys is streamed by `render_response`. `transform` is called on each
+    item, which it may modify, only when the item is encoded, and the list
+    drops the item as soon as it is encoded, so that neither the whole
+    encoded body nor every transformed item have to be held in memory at
+    once.
+
+    The list can only be iterated over once.
+
+    """
+
+    def __init__(self, items, transform=None):
+        self._items = list(items)
+        self._transform = transform
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        items = self._items
+        for i in range(len(items)):
+            item, items[i] = items[i], None
+            if self._transform is not None:
+                self._transform(item)
+            yield item
+
+
+# Approximate size of the chunks of a streamed response body, in characters.
+STREAM_CHUNK_SIZE = 65536
+
+
+def _is_streamed(body):
+    return isinstance(body, dict) and any(
+        isinstance(value, StreamedList) for value in body.values())
+
+
+def _iter_json_chunks(body):
+    """Yield the JSON encoding of a body holding a StreamedList, in chunks.
+
+    The chunks join up to the same bytes as `jsonutils.dump_as_bytes`
+    would return for the equivalent body.
+
+    """
+    def dumps(value):
+        return jsonutils.dumps(value, cls=utils.SmarterEncoder)
+
+    def encode(body):
+        yield '{'
+        for i, (key, value) in enumerate(body.items()):
+            yield ', ' if i else ''
+            yield dumps(key) + ': '
+            if isinstance(value, StreamedList):
+                yield '['
+                for j, item in enumerate(value):
+                    yield ', ' + dumps(item) if j else dumps(item)
+                yield ']'
+            else:
+                yield dumps(value)
+        yield '}'
+
+    chunk = []
+    size = 0
+    for part in encode(body):
+        chunk.append(part)
+        size += len(part)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+            size = 0
+    yield ''.join(chunk).encode('utf-8')
+
+
 def render_response(body=None, status=None, headers=None, method=None):
     """Form a WSGI response."""
     if headers is None:
@@ -694,6 +769,7 @@ def render_response(body=None, status=None, headers=None, method=None):
     else:
         headers = list(headers)
     headers.append(('Vary', 'X-Auth-Token'))
+    app_iter = None
 
     if body is None:
         body = b''
@@ -707,7 +783,11 @@ def render_response(body=None, status=None, headers=None, method=None):
             content_type = None
 
         if content_type is None or content_type in JSON_ENCODE_CONTENT_TYPES:
-            body = jsonutils.dump_as_bytes(body, cls=utils.SmarterEncoder)
+            if _is_streamed(body):
+                app_iter = _iter_json_chunks(body)
+                body = None
+            else:
+                body = jsonutils.dump_as_bytes(body, cls=utils.SmarterEncoder)
             if content_type is None:
                 headers.append(('Content-Type', 'application/json'))
         status = status or (http_client.OK,
@@ -744,6 +824,7 @@ def render_response(body=None, status=None, headers=None, method=None):
     headers = _convert_to_str(headers)
 
     resp = webob.Response(body=body,
+                          app_iter=app_iter,
                           status='%d %s' % status,
                           headerlist=headers,
                           charset='utf-8')
@@ -761,6 +842,9 @@ def render_response(body=None, status=None, headers=None, method=None):
         resp.body = b''
         for header, value in stored_headers.items():
             resp.headers[header] = value
+        # A streamed body has no content-length, so neither does its HEAD.
+        if 'Content-Length' not in stored_headers:
+            del resp.headers['Content-Length']
 
     return resp
 
@@ -32,11 +32,25 @@ prohibited_implied_role = cfg.ListOpt(
 A list of role names which are prohibited from being an implied role.
 """))
 
+in_memory_index = cfg.BoolOpt(
+    'in_memory_index',
+    default=False,
+    help=utils.fmt("""
+Toggle for computing the effective role assignments of a user on a project or
+domain, as done to issue and validate tokens, from a per-process, in-memory
+index of the assignments of each user and group, the groups of each user and
+the parents of each project, instead of querying the backend for them on every
+call. The index is emptied whenever role assignments, group membership or
+projects change, in any keystone process sharing the cache backend, so this
+needs global caching to be enabled to have any effect.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
     driver,
-    prohibited_implied_role
+    prohibited_implied_role,
+    in_memory_index,
 ]
 
 
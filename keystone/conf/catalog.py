@@ -51,6 +51,28 @@ typically does not change frequently, and so a longer duration than the global
 default may be desirable.
 """))
 
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of computed service catalogs (one for each user and project
+combination) to keep in a cache local to each keystone process, between the
+per-request cache and the global cache backend. This has no effect unless
+global and catalog caching are enabled. Set to 0 to disable the process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=5,
+    min=1,
+    help=utils.fmt("""
+Time to keep computed service catalogs in the process cache enabled by
+`[catalog] local_cache_size`, in seconds. Catalog changes made through another
+keystone process can take this long to appear in tokens issued by this
+process.
+"""))
+
 list_limit = cfg.IntOpt(
     'list_limit',
     help=utils.fmt("""
@@ -66,6 +88,8 @@ ALL_OPTS = [
     driver,
     caching,
     cache_time,
+    local_cache_size,
+    local_cache_time,
     list_limit,
 ]
 
@@ -149,6 +149,19 @@ to a reasonable number to prevent operations like listing all users and
 projects from placing an unnecessary load on the system.
 """))
 
+stream_list_threshold = cfg.IntOpt(
+    'stream_list_threshold',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+The number of entities in a collection from which the response is streamed.
+The entities of a streamed collection are encoded to JSON one at a time and
+sent in chunks, without a `Content-Length` header, rather than building the
+whole response body in memory first. This lowers the peak memory used to list
+large collections, such as users or role assignments. Set to 0, the default,
+to never stream responses.
+"""))
+
 strict_password_check = cfg.BoolOpt(
     'strict_password_check',
     default=False,
@@ -231,6 +244,7 @@ ALL_OPTS = [
     member_role_name,
     crypt_strength,
     list_limit,
+    stream_list_threshold,
     strict_password_check,
     secure_proxy_ssl_header,
     insecure_debug,
@@ -167,6 +167,70 @@ This option is only used when the `password_hash_algorithm` option is set
 to `scrypt`. Defaults to 1.
 """))
 
+password_hash_workers = cfg.IntOpt(
+    'password_hash_workers',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of worker processes each keystone process starts to hash and verify
+passwords, instead of doing it in the thread handling the request. This caps
+the CPU that a burst of password authentications can take from other requests
+to the number of workers. Set this to 0 to hash passwords in the thread
+handling the request.
+"""))
+
+password_hash_queue_size = cfg.IntOpt(
+    'password_hash_queue_size',
+    default=32,
+    min=1,
+    help=utils.fmt("""
+Maximum number of passwords waiting for a worker process to hash or verify
+them, beyond which requests wait before queuing theirs. This has no effect
+unless `[identity] password_hash_workers` is set.
+"""))
+
+password_hash_timeout = cfg.IntOpt(
+    'password_hash_timeout',
+    default=60,
+    min=1,
+    help=utils.fmt("""
+Number of seconds to wait for a worker process to hash or verify a password,
+including the time spent in the queue, before doing it in the thread handling
+the request instead. This keeps a request from hanging if the worker process
+hashing its password dies. This has no effect unless `[identity]
+password_hash_workers` is set.
+"""))
+
+password_verification_cache_ttl = cfg.IntOpt(
+    'password_verification_cache_ttl',
+    default=0,
+    min=0,
+    max=3600,
+    help=utils.fmt("""
+Time (in seconds) each keystone process remembers that a user authenticated
+with a password, so that authenticating again with the same password skips
+hashing it, until the password of the user changes. This makes repeated
+password authentications, such as those of automation accounts, cheaper.
+Only a keyed HMAC of the password is kept in memory, but someone able to read
+the memory of a keystone process could test guesses against it faster than
+against the password hash, so keep this short. Account lockout and password
+expiry are enforced as usual. Set this to 0 to hash every password.
+"""))
+
+password_rehash_on_login = cfg.BoolOpt(
+    'password_rehash_on_login',
+    default=False,
+    help=utils.fmt("""
+If set to true, a successful password authentication of a user whose password
+was not hashed with the current `[identity] password_hash_algorithm`,
+`[identity] password_hash_rounds` and scrypt parameters hashes the password
+again with them and stores the new hash, so that changing these options
+upgrades existing passwords as their users authenticate. The new hash is
+computed and written by a background thread of the keystone process, after
+the authentication returns. Only the SQL identity driver supports this. Use
+`keystone-manage password_hash_report` to follow the progress.
+"""))
+
 # TODO(notmorgan): remove this option in Q release.
 rolling_upgrade_password_hash_compat = cfg.BoolOpt(
     'rolling_upgrade_password_hash_compat',
@@ -201,6 +265,11 @@ ALL_OPTS = [
     scrypt_block_size,
     scrypt_paralellism,
     salt_bytesize,
+    password_hash_workers,
+    password_hash_queue_size,
+    password_hash_timeout,
+    password_verification_cache_ttl,
+    password_rehash_on_login,
     rolling_upgrade_password_hash_compat,
 ]
 
@@ -57,12 +57,35 @@ value to false is when configuring a fresh installation, although that is the
 recommended value.
 """))
 
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of ID mappings to keep in a cache local to each keystone
+process, between the per-request cache and the global cache backend. This has
+no effect unless global and `[identity] caching` are enabled. Set to 0 to
+disable the process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=5,
+    min=1,
+    help=utils.fmt("""
+Time to keep ID mappings in the process cache enabled by `[identity_mapping]
+local_cache_size`, in seconds. Mappings purged through another keystone
+process can take this long to be dropped by this process.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
     driver,
     generator,
     backward_compatible_ids,
+    local_cache_size,
+    local_cache_time,
 ]
 
 
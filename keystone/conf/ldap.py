@@ -308,6 +308,17 @@ IDs rather than LDAP DNs. This is the case when using `posixGroup` as the group
 object class in Open Directory.
 """))
 
+group_members_batch_size = cfg.IntOpt(
+    'group_members_batch_size',
+    default=100,
+    min=1,
+    help=utils.fmt("""
+Maximum number of users fetched with each LDAP search when listing the users
+in a group. The members of a group are looked up in batches of this size, each
+with a single search that matches any of their IDs, rather than with one
+search per member. Lower this if the LDAP server rejects long search filters.
+"""))
+
 group_desc_attribute = cfg.StrOpt(
     'group_desc_attribute',
     default='description',
@@ -510,6 +521,7 @@ ALL_OPTS = [
     group_name_attribute,
     group_member_attribute,
     group_members_are_ids,
+    group_members_batch_size,
     group_desc_attribute,
     group_attribute_ignore,
     group_additional_attribute_mapping,
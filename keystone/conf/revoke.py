@@ -51,6 +51,71 @@ Time to cache the revocation list and the revocation events (in seconds). This
 has no effect unless global and `[revoke] caching` are both enabled.
 """))
 
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of revocation event lists to keep in a cache local to each
+keystone process, between the per-request cache and the global cache backend.
+This has no effect unless global and `[revoke] caching` are enabled. Set to 0
+to disable the process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=5,
+    min=1,
+    help=utils.fmt("""
+Time to keep revocation event lists in the process cache enabled by `[revoke]
+local_cache_size`, in seconds. Revocation events recorded by another keystone
+process can take this long to be listed by this process.
+"""))
+
+in_memory_index = cfg.BoolOpt(
+    'in_memory_index',
+    default=False,
+    help=utils.fmt("""
+Toggle for checking tokens against a per-process, in-memory index of
+revocation events instead of querying the backend for matching events on
+every token validation. The index is loaded once and then refreshed
+incrementally with the events revoked since a few seconds before the latest
+event it holds. An event stamped earlier than that, because the clock of the
+keystone node that recorded it lags or because it was committed late, is only
+enforced by this node after the next full reload of the index, up to `[revoke]
+index_reload_interval` seconds later. The events listed by the revocation API
+are also served from the index, instead of from a cached copy of every event
+that each revocation invalidates.
+"""))
+
+index_refresh_interval = cfg.IntOpt(
+    'index_refresh_interval',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+The number of seconds between incremental refreshes of the in-memory
+revocation event index. A value of 0 checks the backend for new events on
+every token validation, which is a single indexed query. Larger values reduce
+database load further, at the cost of revocations made on other keystone nodes
+taking up to this many seconds to be enforced by this node. Between refreshes,
+validating a token already found not revoked is a dictionary lookup, so
+repeated validations of the same token only avoid the backend with a value
+above 0. This has no effect unless `[revoke] in_memory_index` is enabled.
+"""))
+
+index_reload_interval = cfg.IntOpt(
+    'index_reload_interval',
+    default=300,
+    min=0,
+    help=utils.fmt("""
+The number of seconds between full reloads of the in-memory revocation event
+index, which pick up the events that incremental refreshes missed because they
+were stamped by a keystone node whose clock lags or committed late. This bounds
+how long such a revocation can take to be enforced by this node. Set to 0 to
+never reload the index. This has no effect unless `[revoke] in_memory_index` is
+enabled.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
@@ -58,6 +123,11 @@ ALL_OPTS = [
     expiration_buffer,
     caching,
     cache_time,
+    local_cache_size,
+    local_cache_time,
+    in_memory_index,
+    index_refresh_interval,
+    index_reload_interval,
 ]
 
 
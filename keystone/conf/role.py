@@ -40,6 +40,28 @@ Time to cache role data, in seconds. This has no effect unless both global
 caching and `[role] caching` are enabled.
 """))
 
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of computed role assignments, such as the effective roles of a
+user on a project, to keep in a cache local to each keystone process. The
+process cache sits between the per-request cache and the global cache backend.
+This has no effect unless global and `[role] caching` are enabled. Set to 0 to
+disable the process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=5,
+    min=1,
+    help=utils.fmt("""
+Time to keep computed role assignments in the process cache enabled by `[role]
+local_cache_size`, in seconds. Role assignments changed through another
+keystone process can take this long to be seen by this process.
+"""))
+
 list_limit = cfg.IntOpt(
     'list_limit',
     help=utils.fmt("""
@@ -54,6 +76,8 @@ ALL_OPTS = [
     driver,
     caching,
     cache_time,
+    local_cache_size,
+    local_cache_time,
     list_limit,
 ]
 
@@ -103,6 +103,29 @@ The number of seconds to cache token creation and validation data. This has no
 effect unless both global and `[token] caching` are enabled.
 """))
 
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of validated tokens to keep in a cache local to each keystone
+process, between the per-request cache and the global cache backend. Tokens
+that are validated often are then served without a round trip to the cache
+backend, at the cost of memory in every process. This has no effect unless
+global and token caching are enabled. Set to 0 to disable the process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=5,
+    min=1,
+    help=utils.fmt("""
+Time to keep validated tokens in the process cache enabled by `[token]
+local_cache_size`, in seconds. A token revoked through another keystone
+process, or an invalidation of the whole token cache, can take this long to be
+noticed by this process.
+"""))
+
 revoke_by_id = cfg.BoolOpt(
     'revoke_by_id',
     default=True,
@@ -153,6 +176,29 @@ the built-in expiry time. This allows long running operations to succeed.
 Defaults to two days.
 """))
 
+max_bulk_validation = cfg.IntOpt(
+    'max_bulk_validation',
+    default=100,
+    min=1,
+    help=utils.fmt("""
+The maximum number of tokens that may be validated in a single request to
+`POST /v3/auth/tokens/validate`. Larger batches share more of the work of
+rebuilding tokens with the same user, scope and trust, but make each request
+take longer.
+"""))
+
+lightweight_check = cfg.BoolOpt(
+    'lightweight_check',
+    default=False,
+    help=utils.fmt("""
+Check tokens for `HEAD /v3/auth/tokens` without rebuilding their roles and
+catalog. The token is only checked for expiry and revocation, and for its
+user, project, trust and OAuth access token still existing. A token whose
+user no longer has a role on its project is therefore reported as valid until
+it expires or is revoked. Only the `fernet` provider supports this;
+other providers always validate tokens in full.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
@@ -163,11 +209,15 @@ ALL_OPTS = [
     driver,
     caching,
     cache_time,
+    local_cache_size,
+    local_cache_time,
     revoke_by_id,
     allow_rescope_scoped_token,
     infer_roles,
     cache_on_issue,
     allow_expired_window,
+    max_bulk_validation,
+    lightweight_check,
 ]
 
 
@@ -45,12 +45,7 @@ def get_multi_fernet_keys():
     key_utils = fernet_utils.FernetUtils(
         CONF.credential.key_repository, MAX_ACTIVE_KEYS,
         'credential')
-    keys = key_utils.load_keys(use_null_key=True)
-
-    fernet_keys = [fernet.Fernet(key) for key in keys]
-    crypto = fernet.MultiFernet(fernet_keys)
-
-    return crypto, keys
+    return key_utils.load_multi_fernet(use_null_key=True)
 
 
 def primary_key_hash(keys):
@@ -91,11 +86,7 @@ class Provider(core.Provider):
         :param credential: an encrypted credential string
         :returns: a decrypted credential
         """
-        key_utils = fernet_utils.FernetUtils(
-            CONF.credential.key_repository, MAX_ACTIVE_KEYS)
-        keys = key_utils.load_keys(use_null_key=True)
-        fernet_keys = [fernet.Fernet(key) for key in keys]
-        crypto = fernet.MultiFernet(fernet_keys)
+        crypto, keys = get_multi_fernet_keys()
 
         try:
             if isinstance(credential, six.text_type):
@@ -262,6 +262,21 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_users_from_ids(self, user_ids):
+        """List the users with the given IDs.
+
+        Drivers that cannot read several users at once need not implement
+        this; the identity manager then gets each user in turn.
+
+        :param list user_ids: User IDs.
+
+        :returns: a list of users, skipping IDs that don't exist. See user
+            schema in :class:`~.IdentityDriverBase`.
+        :rtype: list of dicts
+
+        """
+        raise exception.NotImplemented()
+
     @abc.abstractmethod
     def update_user(self, user_id, user):
         """Update an existing user.
@@ -415,6 +430,21 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_groups_from_ids(self, group_ids):
+        """List the groups with the given IDs.
+
+        Drivers that cannot read several groups at once need not implement
+        this; the identity manager then gets each group in turn.
+
+        :param list group_ids: Group IDs.
+
+        :returns: a list of groups, skipping IDs that don't exist. See group
+            schema in :class:`~.IdentityDriverBase`.
+        :rtype: list of dicts
+
+        """
+        raise exception.NotImplemented()
+
     @abc.abstractmethod
     def get_group_by_name(self, group_name, domain_id):
         """Get a group by name.
@@ -1435,6 +1435,41 @@ class BaseLdap(object):
         except IndexError:
             return None
 
+    def _ldap_get_many(self, object_ids, batch_size, ldap_filter=None):
+        """Return the LDAP entries of the objects with the given IDs.
+
+        Rather than searching for each object, the objects are searched for
+        `batch_size` at a time, with a filter matching any of their IDs.
+
+        """
+        object_ids = list(object_ids)
+        attrs = list(set(([self.id_attr] +
+                          list(self.attribute_mapping.values()) +
+                          list(self.extra_attr_mapping.keys()))))
+        res = []
+        with self.get_connection() as conn:
+            try:
+                for i in range(0, len(object_ids), batch_size):
+                    ids_filter = u''.join(
+                        u'(%s=%s)' % (self.id_attr,
+                                      ldap.filter.escape_filter_chars(
+                                          six.text_type(object_id)))
+                        for object_id in object_ids[i:i + batch_size])
+                    query = (u'(&(|%(ids)s)'
+                             u'%(filter)s'
+                             u'(objectClass=%(object_class)s))'
+                             % {'ids': ids_filter,
+                                'filter': (ldap_filter or self.ldap_filter or
+                                           ''),
+                                'object_class': self.object_class})
+                    res.extend(conn.search_s(self.tree_dn,
+                                             self.LDAP_SCOPE,
+                                             query,
+                                             attrs))
+            except ldap.NO_SUCH_OBJECT:
+                return []
+        return self._filter_ldap_result_by_attr(res, 'name')
+
     def _ldap_get_limited(self, base, scope, filterstr, attrlist, sizelimit):
         with self.get_connection() as conn:
             try:
@@ -1521,6 +1556,12 @@ class BaseLdap(object):
         return [self._ldap_res_to_model(x)
                 for x in self._ldap_get_all(hints, ldap_filter)]
 
+    def get_many(self, object_ids, batch_size, ldap_filter=None):
+        """Return the objects with the given IDs that exist."""
+        return [self._ldap_res_to_model(x)
+                for x in self._ldap_get_many(object_ids, batch_size,
+                                             ldap_filter)]
+
     def update(self, object_id, values, old_obj=None):
         if old_obj is None:
             old_obj = self.get(object_id)
@@ -1819,6 +1860,16 @@ class EnabledEmuMixIn(BaseLdap):
         else:
             return super(EnabledEmuMixIn, self).get_all(ldap_filter, hints)
 
+    def get_many(self, object_ids, batch_size, ldap_filter=None):
+        obj_list = super(EnabledEmuMixIn, self).get_many(
+            object_ids, batch_size, ldap_filter)
+        if 'enabled' not in self.attribute_ignore and self.enabled_emulation:
+            with self.get_connection() as conn:
+                for obj_ref in obj_list:
+                    obj_ref['enabled'] = self._get_enabled(
+                        obj_ref['id'], conn)
+        return obj_list
+
     def update(self, object_id, values, old_obj=None):
         if 'enabled' not in self.attribute_ignore and self.enabled_emulation:
             data = values.copy()
@@ -126,10 +126,17 @@ class Identity(base.IdentityDriverBase):
     def list_users_in_group(self, group_id, hints):
         users = []
         group_members = self.group.list_group_users(group_id)
-        for user_id in self._transform_group_member_ids(group_members):
+        user_ids = list(self._transform_group_member_ids(group_members))
+        # NOTE: LDAP servers usually match IDs regardless of case, so map the
+        # users found back to the members of the group the same way.
+        users_by_id = {}
+        for user in self.user.get_many_filtered(
+                user_ids, self.conf.ldap.group_members_batch_size):
+            users_by_id[six.text_type(user['id']).lower()] = user
+        for user_id in user_ids:
             try:
-                users.append(self.user.get_filtered(user_id))
-            except exception.UserNotFound:
+                users.append(users_by_id[six.text_type(user_id).lower()])
+            except KeyError:
                 msg = ('Group member `%(user_id)s` for group `%(group_id)s`'
                        ' not found in the directory. The user should be'
                        ' removed from the group. The user will be ignored.')
@@ -326,6 +333,17 @@ class UserApi(common_ldap.EnabledEmuMixIn, common_ldap.BaseLdap):
         return [self.filter_attributes(user)
                 for user in self.get_all(query, hints)]
 
+    def get_many(self, user_ids, batch_size, ldap_filter=None):
+        objs = super(UserApi, self).get_many(user_ids, batch_size,
+                                             ldap_filter=ldap_filter)
+        for obj in objs:
+            obj['options'] = {}  # options always empty
+        return objs
+
+    def get_many_filtered(self, user_ids, batch_size):
+        return [self.filter_attributes(user)
+                for user in self.get_many(user_ids, batch_size)]
+
     def filter_attributes(self, user):
         return base.filter_user(common_ldap.filter_entity(user))
 
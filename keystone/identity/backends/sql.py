@@ -13,8 +13,12 @@
 # under the License.
 
 import datetime
+import os
+import threading
 
 from oslo_db import api as oslo_db_api
+from oslo_log import log
+from six.moves import queue
 import sqlalchemy
 
 from keystone.common import driver_hints
@@ -30,6 +34,62 @@ from keystone.identity.backends import sql_model as model
 
 
 CONF = keystone.conf.CONF
+LOG = log.getLogger(__name__)
+
+# The most passwords waiting to be rehashed at once. Beyond that, passwords
+# are left as they are, to be rehashed when their users next authenticate.
+REHASH_QUEUE_SIZE = 1000
+
+
+class _PasswordRehasher(object):
+    """Rehash the passwords of users in a background thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue(REHASH_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run,
+                                        name='keystone-password-rehash')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, func, *args):
+        try:
+            self._queue.put_nowait((func, args))
+        except queue.Full:
+            LOG.debug('Too many passwords waiting to be rehashed, leaving '
+                      'the password of user %s as it is.', args[0])
+
+    def join(self):
+        """Wait until the passwords submitted so far are rehashed."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception:
+                LOG.exception('Failed to rehash the password of user %s.',
+                              args[0])
+            finally:
+                self._queue.task_done()
+
+
+_REHASHER = None
+_REHASHER_PID = None
+_REHASHER_LOCK = threading.Lock()
+
+
+def _get_rehasher():
+    """Return the password rehasher of this process, starting it if needed."""
+    global _REHASHER, _REHASHER_PID
+
+    # NOTE: Threads do not survive a fork, so a process forked from the one
+    # that started the rehasher, such as a WSGI worker, starts its own.
+    with _REHASHER_LOCK:
+        if _REHASHER is None or _REHASHER_PID != os.getpid():
+            _REHASHER = _PasswordRehasher()
+            _REHASHER_PID = os.getpid()
+        return _REHASHER
 
 
 class Identity(base.IdentityDriverBase):
@@ -52,7 +112,8 @@ class Identity(base.IdentityDriverBase):
         https://blueprints.launchpad.net/keystone/+spec/sql-identiy-pam
 
         """
-        return password_hashing.check_password(password, user_ref.password)
+        return password_hashing.check_user_password(
+            user_ref.id, password, user_ref.password)
 
     # Identity interface
     def authenticate(self, user_id, password):
@@ -74,8 +135,29 @@ class Identity(base.IdentityDriverBase):
         # successful auth, reset failed count if present
         if user_ref.local_user.failed_auth_count:
             self._reset_failed_auth(user_id)
+        if (CONF.identity.password_rehash_on_login and
+                password_hashing.needs_rehash(user_ref.password)):
+            _get_rehasher().submit(self._rehash_password, user_id, password,
+                                   user_ref.password)
         return user_dict
 
+    def _rehash_password(self, user_id, password, hashed):
+        """Replace the hash of the current password of a user.
+
+        The password keeps its creation and expiry dates. Nothing is written
+        if the password changed since it was checked against hashed.
+
+        """
+        new_hashed = password_hashing.hash_password(password)
+        with sql.session_for_write() as session:
+            try:
+                user_ref = self._get_user(session, user_id)
+            except exception.UserNotFound:
+                return
+            if user_ref.password != hashed:
+                return
+            user_ref.password_ref.password_hash = new_hashed
+
     def _is_account_locked(self, user_id, user_ref):
         """Check if the user account is locked.
 
@@ -188,6 +270,14 @@ class Identity(base.IdentityDriverBase):
             return base.filter_user(
                 self._get_user(session, user_id).to_dict())
 
+    def list_users_from_ids(self, user_ids):
+        if not user_ids:
+            return []
+        with sql.session_for_read() as session:
+            query = session.query(model.User)
+            query = query.filter(model.User.id.in_(user_ids))
+            return [base.filter_user(ref.to_dict()) for ref in query.all()]
+
     def get_user_by_name(self, user_name, domain_id):
         with sql.session_for_read() as session:
             query = session.query(model.User).join(model.LocalUser)
@@ -366,6 +456,14 @@ class Identity(base.IdentityDriverBase):
         with sql.session_for_read() as session:
             return self._get_group(session, group_id).to_dict()
 
+    def list_groups_from_ids(self, group_ids):
+        if not group_ids:
+            return []
+        with sql.session_for_read() as session:
+            query = session.query(model.Group)
+            query = query.filter(model.Group.id.in_(group_ids))
+            return [ref.to_dict() for ref in query.all()]
+
     def get_group_by_name(self, group_name, domain_id):
         with sql.session_for_read() as session:
             query = session.query(model.Group)
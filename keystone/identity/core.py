@@ -30,6 +30,7 @@ from keystone.common import clean
 from keystone.common import dependency
 from keystone.common import driver_hints
 from keystone.common import manager
+from keystone.common import password_hashing
 from keystone.common.validation import validators
 import keystone.conf
 from keystone import exception
@@ -490,9 +491,23 @@ class Manager(manager.Manager):
             notifications.ACTIONS.deleted: {
                 'domain': [self._domain_deleted],
                 'project': [self._unset_default_project],
+                'user': [self._forget_user_password],
+            },
+            notifications.ACTIONS.updated: {
+                'user': [self._forget_user_password],
+            },
+            notifications.ACTIONS.internal: {
+                notifications.INVALIDATE_USER_TOKEN_PERSISTENCE: [
+                    self._forget_user_password],
             },
         }
 
+    def _forget_user_password(self, service, resource_type, operation,
+                              payload):
+        # The password of the user may have changed, so it must be hashed
+        # again next time it is checked.
+        password_hashing.forget_user_password(payload['resource_info'])
+
     def _domain_deleted(self, service, resource_type, operation,
                         payload):
         domain_id = payload['resource_info']
@@ -636,40 +651,34 @@ class Manager(manager.Manager):
         if not self._is_mapping_needed(driver):
             return ref_list
 
-        # build a map of refs for fast look-up
-        refs_map = {}
-        for r in ref_list:
-            refs_map[(r['id'], entity_type, r['domain_id'])] = r
-
         # NOTE(breton): there are cases when the driver is not domain aware and
         # no domain_id was explicitely provided for list operation. domain_id
-        # gets inserted into refs, but not passed into this method. Lets use
-        # domain_id from one of the refs.
-        if not domain_id:
-            domain_id = ref_list[0]['domain_id']
-
-        # fetch all mappings for the domain, lookup the user at the map built
-        # at previous step and replace his id.
-        domain_mappings = self.id_mapping_api.get_domain_mapping_list(
-            domain_id)
-        for _mapping in domain_mappings:
-            idx = (_mapping.local_id, _mapping.entity_type, _mapping.domain_id)
-            try:
-                ref = refs_map.pop(idx)
-                # due to python specifics, `ref` still points to an item in
-                # `ref_list`. That's why when we change it here, it gets
-                # changed in `ref_list`.
-                ref['id'] = _mapping.public_id
-            except KeyError:
-                pass  # some old entry, skip it
-
-        # at this point, all known refs were granted a public_id. For the refs
-        # left, there are no mappings. They need to be created.
-        for ref in refs_map.values():
-            local_entity = {'domain_id': ref['domain_id'],
-                            'local_id': ref['id'],
-                            'entity_type': entity_type}
-            self._insert_new_public_id(local_entity, ref, driver)
+        # gets inserted into refs, but not passed into this method, so group
+        # the refs by the domain_id inserted into them.
+        refs_by_domain = {}
+        for r in ref_list:
+            refs_by_domain.setdefault(r['domain_id'], []).append(r)
+
+        # Only look up the mappings of the refs on the list, rather than every
+        # mapping of the domain, and create the missing ones all at once.
+        for ref_domain_id, refs in refs_by_domain.items():
+            local_ids = [r['id'] for r in refs]
+            public_ids = self.id_mapping_api.get_public_ids(
+                ref_domain_id, entity_type, local_ids)
+            missing = {}
+            for local_id in local_ids:
+                if local_id not in public_ids:
+                    # If the driver generates UUIDs then pass the local UUID
+                    # in as the public ID to use.
+                    missing[local_id] = (
+                        local_id if driver.generates_uuids() else None)
+            if missing:
+                public_ids.update(self.id_mapping_api.create_id_mappings(
+                    ref_domain_id, entity_type, missing))
+                LOG.debug('Created %d new mappings to public IDs',
+                          len(missing))
+            for r in refs:
+                r['id'] = public_ids[r['id']]
         return ref_list
 
     def _insert_domain_id_if_needed(self, ref, driver, domain_id, conf):
@@ -876,7 +885,9 @@ class Manager(manager.Manager):
             return
 
         list_limit = driver._get_list_limit()
-        if list_limit:
+        # A smaller limit may have been requested by the caller.
+        if list_limit and (hints.limit is None or
+                           hints.limit['limit'] > list_limit):
             hints.set_limit(list_limit)
 
     # The actual driver calls - these are pre/post processed here as
@@ -952,6 +963,45 @@ class Manager(manager.Manager):
         return self._set_domain_id_and_mapping(
             ref, domain_id, driver, mapping.EntityType.USER)
 
+    def _list_entities_from_ids(self, entity_ids, list_from_ids, get,
+                                not_found):
+        """List the users or groups with the given IDs.
+
+        A single driver that needs no ID mapping is asked for all of them at
+        once, if it can be, and any other configuration gets each entity in
+        turn. IDs that don't exist are skipped.
+
+        """
+        if (not CONF.identity.domain_specific_drivers_enabled and
+                not self._needs_post_processing(self.driver)):
+            try:
+                return list_from_ids(list(entity_ids))
+            except exception.NotImplemented:  # nosec
+                # The driver cannot read entities in bulk, get them one by
+                # one instead.
+                pass
+
+        refs = []
+        for entity_id in entity_ids:
+            try:
+                refs.append(get(entity_id))
+            except not_found:  # nosec
+                # Skip IDs that don't exist, as the bulk read does.
+                pass
+        return refs
+
+    @domains_configured
+    def list_users_from_ids(self, user_ids):
+        """List the users with the given IDs, skipping those not found.
+
+        This method is used internally by the assignment manager to bulk read
+        a set of users given their ids.
+
+        """
+        return self._list_entities_from_ids(
+            user_ids, self.driver.list_users_from_ids, self.get_user,
+            exception.UserNotFound)
+
     def assert_user_enabled(self, user_id, user=None):
         """Assert the user and the user's domain are enabled.
 
@@ -1149,6 +1199,18 @@ class Manager(manager.Manager):
         return self._set_domain_id_and_mapping(
             ref, domain_id, driver, mapping.EntityType.GROUP)
 
+    @domains_configured
+    def list_groups_from_ids(self, group_ids):
+        """List the groups with the given IDs, skipping those not found.
+
+        This method is used internally by the assignment manager to bulk read
+        a set of groups given their ids.
+
+        """
+        return self._list_entities_from_ids(
+            group_ids, self.driver.list_groups_from_ids, self.get_group,
+            exception.GroupNotFound)
+
     @domains_configured
     @exception_translated('group')
     def get_group_by_name(self, group_name, domain_id):
@@ -1434,16 +1496,53 @@ class MappingManager(manager.Manager):
     def get_id_mapping(self, public_id):
         return self.driver.get_id_mapping(public_id)
 
-    def create_id_mapping(self, local_entity, public_id=None):
-        public_id = self.driver.create_id_mapping(local_entity, public_id)
+    def _cache_id_mapping(self, local_entity, public_id):
         if MEMOIZE_ID_MAPPING.should_cache(public_id):
             self._get_public_id.set(public_id, self,
                                     local_entity['domain_id'],
                                     local_entity['local_id'],
                                     local_entity['entity_type'])
             self.get_id_mapping.set(local_entity, self, public_id)
+
+    def _cache_id_mappings(self, domain_id, entity_type, public_ids):
+        for local_id, public_id in public_ids.items():
+            self._cache_id_mapping({'domain_id': domain_id,
+                                    'local_id': local_id,
+                                    'entity_type': entity_type}, public_id)
+
+    def get_public_ids(self, domain_id, entity_type, local_ids):
+        """Return the public IDs of many local entities of a domain at once.
+
+        The mappings found are cached both ways, as if each had been read
+        with `get_public_id` and `get_id_mapping`.
+
+        :returns dict: Mapping each local ID that has a mapping to its public
+                       ID.
+
+        """
+        public_ids = self.driver.get_public_ids(domain_id, entity_type,
+                                                local_ids)
+        self._cache_id_mappings(domain_id, entity_type, public_ids)
+        return public_ids
+
+    def create_id_mapping(self, local_entity, public_id=None):
+        public_id = self.driver.create_id_mapping(local_entity, public_id)
+        self._cache_id_mapping(local_entity, public_id)
         return public_id
 
+    def create_id_mappings(self, domain_id, entity_type, public_ids):
+        """Create mappings for many local entities of a domain at once.
+
+        :param dict public_ids: Mapping the local ID of each entity to the
+                                public ID to use, or to None to generate one.
+        :returns dict: Mapping each local ID to its public ID.
+
+        """
+        public_ids = self.driver.create_id_mappings(domain_id, entity_type,
+                                                    public_ids)
+        self._cache_id_mappings(domain_id, entity_type, public_ids)
+        return public_ids
+
     def delete_id_mapping(self, public_id):
         local_entity = self.get_id_mapping.get(self, public_id)
         self.driver.delete_id_mapping(public_id)
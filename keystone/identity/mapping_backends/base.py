@@ -34,6 +34,27 @@ class MappingDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def get_public_ids(self, domain_id, entity_type, local_ids):
+        """Return the public IDs of many local entities of a domain.
+
+        Drivers able to look up many mappings at once should override this.
+
+        :param domain_id: Domain ID of the local entities.
+        :param entity_type: Type of the local entities ('user' or 'group').
+        :param local_ids: Local IDs of the entities.
+        :returns dict: Mapping each local ID that has a mapping to its public
+                       ID.
+
+        """
+        public_ids = {}
+        for local_id in set(local_ids):
+            public_id = self.get_public_id({'domain_id': domain_id,
+                                            'local_id': local_id,
+                                            'entity_type': entity_type})
+            if public_id:
+                public_ids[local_id] = public_id
+        return public_ids
+
     @abc.abstractmethod
     def get_domain_mapping_list(self, domain_id):
         """Return mappings for the domain.
@@ -67,6 +88,28 @@ class MappingDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def create_id_mappings(self, domain_id, entity_type, public_ids):
+        """Create and store mappings for many local entities of a domain.
+
+        Mappings that exist already, for instance because something else
+        just created them, are kept. Drivers able to create many mappings at
+        once should override this.
+
+        :param domain_id: Domain ID of the local entities.
+        :param entity_type: Type of the local entities ('user' or 'group').
+        :param dict public_ids: Mapping the local ID of each entity to the
+                                public ID to use, or to None to generate one.
+        :returns dict: Mapping each local ID to its public ID.
+
+        """
+        created = {}
+        for local_id, public_id in public_ids.items():
+            created[local_id] = self.create_id_mapping(
+                {'domain_id': domain_id,
+                 'local_id': local_id,
+                 'entity_type': entity_type}, public_id)
+        return created
+
     @abc.abstractmethod
     def delete_id_mapping(self, public_id):
         """Delete an entry for the given public_id.
@@ -12,12 +12,21 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sqlalchemy
+
 from keystone.common import dependency
 from keystone.common import sql
 from keystone.identity.mapping_backends import base
 from keystone.identity.mapping_backends import mapping as identity_mapping
 
 
+# The most local IDs looked up with a single `IN` clause, and the most
+# mappings created with a single multi-row `INSERT`, keeping the number of
+# bound parameters of a statement within what every database accepts.
+LOOKUP_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 200
+
+
 class IDMapping(sql.ModelBase, sql.ModelDictMixin):
     __tablename__ = 'id_mapping'
     public_id = sql.Column(sql.String(64), primary_key=True)
@@ -35,6 +44,28 @@ class IDMapping(sql.ModelBase, sql.ModelDictMixin):
         sql.UniqueConstraint('domain_id', 'local_id', 'entity_type'),)
 
 
+# NOTE: Building and compiling a query with a long `IN` clause costs more than
+# running it, so the bulk lookup of public IDs runs the same query for every
+# batch, with the local IDs of the batch as parameters, and lets SQLAlchemy
+# keep it compiled.
+_PUBLIC_IDS_QUERIES = {}
+_COMPILED_QUERIES = {}
+
+
+def _get_public_ids_query(batch_size):
+    query = _PUBLIC_IDS_QUERIES.get(batch_size)
+    if query is None:
+        query = sqlalchemy.select(
+            [IDMapping.local_id, IDMapping.public_id]).where(sqlalchemy.and_(
+                IDMapping.domain_id == sqlalchemy.bindparam('domain_id'),
+                IDMapping.entity_type == sqlalchemy.bindparam('entity_type'),
+                IDMapping.local_id.in_([
+                    sqlalchemy.bindparam('local_id_%d' % i)
+                    for i in range(batch_size)])))
+        _PUBLIC_IDS_QUERIES[batch_size] = query
+    return query
+
+
 @dependency.requires('id_generator_api')
 class Mapping(base.MappingDriverBase):
 
@@ -57,6 +88,24 @@ class Mapping(base.MappingDriverBase):
             except sql.NotFound:
                 return None
 
+    def get_public_ids(self, domain_id, entity_type, local_ids):
+        local_ids = sorted(set(local_ids))
+        public_ids = {}
+        query = _get_public_ids_query(LOOKUP_BATCH_SIZE)
+        with sql.session_for_read() as session:
+            connection = session.connection().execution_options(
+                compiled_cache=_COMPILED_QUERIES)
+            for i in range(0, len(local_ids), LOOKUP_BATCH_SIZE):
+                batch = local_ids[i:i + LOOKUP_BATCH_SIZE]
+                params = {'domain_id': domain_id, 'entity_type': entity_type}
+                # The last batch is padded with NULLs, which match nothing.
+                for j in range(LOOKUP_BATCH_SIZE):
+                    params['local_id_%d' % j] = (
+                        batch[j] if j < len(batch) else None)
+                for row in connection.execute(query, params):
+                    public_ids[row.local_id] = row.public_id
+        return public_ids
+
     def get_domain_mapping_list(self, domain_id):
         with sql.session_for_read() as session:
             return session.query(IDMapping).filter_by(domain_id=domain_id)
@@ -82,6 +131,36 @@ class Mapping(base.MappingDriverBase):
             public_id = self.get_public_id(local_entity)
         return public_id
 
+    def create_id_mappings(self, domain_id, entity_type, public_ids):
+        rows = []
+        for local_id, public_id in sorted(public_ids.items()):
+            entity = {'domain_id': domain_id,
+                      'local_id': local_id,
+                      'entity_type': entity_type}
+            if public_id is None:
+                public_id = self.id_generator_api.generate_public_ID(entity)
+            entity['public_id'] = public_id
+            rows.append(entity)
+
+        created = {}
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[i:i + INSERT_BATCH_SIZE]
+            try:
+                with sql.session_for_write() as session:
+                    session.execute(IDMapping.__table__.insert().values(batch))
+            except sql.DBDuplicateEntry:
+                # something else created some of these mappings already.
+                # Create the others one by one, using the existing ones.
+                for entity in batch:
+                    created[entity['local_id']] = self.create_id_mapping(
+                        {'domain_id': domain_id,
+                         'local_id': entity['local_id'],
+                         'entity_type': entity_type}, entity['public_id'])
+            else:
+                for entity in batch:
+                    created[entity['local_id']] = entity['public_id']
+        return created
+
     def delete_id_mapping(self, public_id):
         with sql.session_for_write() as session:
             try:
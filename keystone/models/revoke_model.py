@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+
 from oslo_log import log
 from oslo_serialization import msgpackutils
 from oslo_utils import timeutils
@@ -145,7 +147,7 @@ def is_revoked(events, token_data):
               match any revocation events, meaning the token is considered
               valid by the revocation API.
     """
-    return any([matches(e, token_data) for e in events])
+    return any(matches(e, token_data) for e in events)
 
 
 def matches(event, token_values):
@@ -204,6 +206,212 @@ def matches(event, token_values):
     return True
 
 
+def _token_matches_event(event, token_values):
+    """See if the token matches the revocation event, including identity.
+
+    :func:`matches` relies on the backend having already filtered events on
+    `issued_before`, `user_id`, `project_id` and `audit_id`. This performs
+    those checks as well so an event held in memory can be compared directly.
+
+    """
+    if event.issued_before < token_values['issued_at']:
+        return False
+
+    if event.user_id is not None and event.user_id not in (
+            token_values['user_id'],
+            token_values['trustor_id'],
+            token_values['trustee_id'],):
+        return False
+
+    if event.project_id is not None and event.project_id not in (
+            token_values['project_id'],):
+        return False
+
+    if event.audit_id is not None and event.audit_id not in (
+            token_values['audit_id'],):
+        return False
+
+    return matches(event, token_values)
+
+
+# The event attributes compared with a token by `_token_matches_event`, other
+# than `issued_before`. Only the attributes an event sets are compared.
+_MATCH_ATTRIBUTES = ['audit_id',
+                     'audit_chain_id',
+                     'trust_id',
+                     'consumer_id',
+                     'user_id',
+                     'project_id',
+                     'domain_scope_id',
+                     'domain_id',
+                     'role_id',
+                     'expires_at']
+
+
+def _match_values(attribute, token_values):
+    """Return the token values an event attribute could be equal to."""
+    if attribute == 'role_id':
+        values = token_values.get('roles') or []
+    else:
+        names = ALTERNATIVES.get(attribute, [attribute])
+        values = [token_values.get(name) for name in names]
+    # An event attribute that is compared is never None.
+    return set(v for v in values if v is not None)
+
+
+def _event_key(event):
+    return tuple(getattr(event, name) for name in REVOKE_KEYS)
+
+
+class RevokeMatcher(object):
+    """Revocation events compiled into hashed lookups.
+
+    Events are grouped by the attributes of `_MATCH_ATTRIBUTES` that they set.
+    Within a group, events are stored in a dict keyed by the values of those
+    attributes. Checking a token probes each group once for every combination
+    of the token's values for the group's attributes, and then only compares
+    `issued_before` for the events found, instead of comparing every attribute
+    of every event.
+
+    The results are the same as calling `_token_matches_event` for every
+    event, which is `matches` with the checks the SQL backend does when it
+    lists the events for a token.
+
+    """
+
+    def __init__(self, events=()):
+        self._groups = {}
+        for event in events:
+            self.add_event(event)
+
+    @staticmethod
+    def _signature(event):
+        return tuple(name for name in _MATCH_ATTRIBUTES
+                     if getattr(event, name) is not None)
+
+    def add_event(self, event):
+        signature = self._signature(event)
+        key = tuple(getattr(event, name) for name in signature)
+        group = self._groups.setdefault(signature, {})
+        group.setdefault(key, []).append(event)
+
+    def remove_event(self, event):
+        signature = self._signature(event)
+        key = tuple(getattr(event, name) for name in signature)
+        group = self._groups[signature]
+        events = group[key]
+        events.remove(event)
+        if not events:
+            del group[key]
+            if not group:
+                del self._groups[signature]
+
+    def _lookup(self, token_values):
+        """Yield the lists of events whose attributes match the token."""
+        values = {}
+        for signature, group in self._groups.items():
+            keys = [()]
+            for name in signature:
+                if name not in values:
+                    values[name] = _match_values(name, token_values)
+                keys = [k + (v,) for k in keys for v in values[name]]
+                if not keys:
+                    break
+            for key in keys:
+                events = group.get(key)
+                if events:
+                    yield events
+
+    def candidates(self, token_values):
+        """Yield the events that match the token, whenever it was issued."""
+        for events in self._lookup(token_values):
+            for event in events:
+                yield event
+
+    def is_revoked(self, token_values):
+        """Check if a token matches any of the revocation events."""
+        issued_at = token_values['issued_at']
+        for events in self._lookup(token_values):
+            for event in events:
+                if event.issued_before >= issued_at:
+                    return True
+        return False
+
+
+class RevokeIndex(object):
+    """An in-memory index of revocation events.
+
+    The events are held in a `RevokeMatcher`, along with what is needed to
+    ignore duplicate events and to prune old ones.
+
+    Events are expected to be added roughly in `revoked_at` order, which is
+    the order in which they are pruned. The latest `revoked_at` of any event
+    added is kept in `last_revoked_at`, and remains after the event is
+    pruned.
+
+    """
+
+    def __init__(self):
+        self._matcher = RevokeMatcher()
+        self._events = collections.deque()
+        self._keys = set()
+        self.last_revoked_at = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add_event(self, event):
+        """Add an event to the index.
+
+        :returns: False if an identical event is already indexed, otherwise
+                  True.
+
+        """
+        key = _event_key(event)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._events.append(event)
+        self._matcher.add_event(event)
+        if (self.last_revoked_at is None or
+                event.revoked_at > self.last_revoked_at):
+            self.last_revoked_at = event.revoked_at
+        return True
+
+    def add_events(self, events):
+        """Add several events, returning how many were not yet indexed."""
+        return len([e for e in events if self.add_event(e)])
+
+    def prune(self, cutoff):
+        """Drop the events revoked before `cutoff`.
+
+        :returns: the number of events removed.
+
+        """
+        pruned = 0
+        while self._events and self._events[0].revoked_at < cutoff:
+            event = self._events.popleft()
+            self._keys.discard(_event_key(event))
+            self._matcher.remove_event(event)
+            pruned += 1
+        return pruned
+
+    def list_events(self, last_fetch=None):
+        """List the events revoked after `last_fetch`, oldest first."""
+        events = [e for e in self._events
+                  if last_fetch is None or e.revoked_at > last_fetch]
+        events.sort(key=lambda e: e.revoked_at)
+        return events
+
+    def candidates(self, token_values):
+        """Yield the events that could possibly match the token."""
+        return self._matcher.candidates(token_values)
+
+    def is_revoked(self, token_values):
+        """Check if a token matches any indexed revocation event."""
+        return self._matcher.is_revoked(token_values)
+
+
 def build_token_values_v2(access, default_domain_id):
     token_data = access['token']
 
@@ -86,6 +86,24 @@ class ResourceDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_project_ids_in_subtrees(self, project_ids):
+        """List project ids in the subtrees of the provided list of ids.
+
+        :param project_ids: list of ids
+
+        :returns: a list of the ids of the projects below any of the
+                  specified projects.
+
+        This method is used internally by the assignment manager to bulk read
+        the projects that inherit the assignments on a set of projects.
+
+        """
+        subtree_ids = set()
+        for project_id in project_ids:
+            subtree = self.list_projects_in_subtree(project_id) or []
+            subtree_ids.update(ref['id'] for ref in subtree)
+        return list(subtree_ids)
+
     @abc.abstractmethod
     def list_projects_in_domain(self, domain_id):
         """List projects in the domain.
@@ -11,6 +11,7 @@
 # under the License.
 
 from oslo_log import log
+import sqlalchemy
 
 from keystone.common import driver_hints
 from keystone.common import sql
@@ -123,45 +124,104 @@ class Resource(base.ResourceDriverBase):
         project_refs = query.all()
         return [project_ref.to_dict() for project_ref in project_refs]
 
+    def _walk_project_subtree(self, session, project_id):
+        children = self._get_children(session, [project_id])
+        subtree = []
+        examined = set([project_id])
+        while children:
+            children_ids = set()
+            for ref in children:
+                if ref['id'] in examined:
+                    msg = ('Circular reference or a repeated '
+                           'entry found in projects hierarchy - '
+                           '%(project_id)s.')
+                    LOG.error(msg, {'project_id': ref['id']})
+                    return
+                children_ids.add(ref['id'])
+
+            examined.update(children_ids)
+            subtree += children
+            children = self._get_children(session, children_ids)
+        return subtree
+
+    def _walk_project_parents(self, session, project_id):
+        project = self._get_project(session, project_id).to_dict()
+        parents = []
+        examined = set()
+        while project.get('parent_id') is not None:
+            if project['id'] in examined:
+                msg = ('Circular reference or a repeated '
+                       'entry found in projects hierarchy - '
+                       '%(project_id)s.')
+                LOG.error(msg, {'project_id': project['id']})
+                return
+
+            examined.add(project['id'])
+            parent_project = self._get_project(
+                session, project['parent_id']).to_dict()
+            parents.append(parent_project)
+            project = parent_project
+        return parents
+
+    def _query_hierarchy(self, session, project_id, ancestors):
+        """Query a project and its ancestors or descendants, nearest first.
+
+        :returns: the projects, without the project itself, or None if the
+                  project is not in the hierarchy index.
+
+        """
+        if ancestors:
+            join = Project.id == ProjectHierarchy.ancestor_id
+            where = ProjectHierarchy.descendant_id == project_id
+        else:
+            join = Project.id == ProjectHierarchy.descendant_id
+            where = ProjectHierarchy.ancestor_id == project_id
+        query = session.query(Project, ProjectHierarchy.depth).join(
+            ProjectHierarchy, join).filter(where)
+        project_refs = query.order_by(ProjectHierarchy.depth).all()
+        if (not project_refs or project_refs[0].depth != 0 or
+                self._is_hidden_ref(project_refs[0][0])):
+            return None
+        return [project_ref.to_dict()
+                for project_ref, depth in project_refs[1:]
+                if not self._is_hidden_ref(project_ref)]
+
     def list_projects_in_subtree(self, project_id):
         with sql.session_for_read() as session:
-            children = self._get_children(session, [project_id])
-            subtree = []
-            examined = set([project_id])
-            while children:
-                children_ids = set()
-                for ref in children:
-                    if ref['id'] in examined:
-                        msg = ('Circular reference or a repeated '
-                               'entry found in projects hierarchy - '
-                               '%(project_id)s.')
-                        LOG.error(msg, {'project_id': ref['id']})
-                        return
-                    children_ids.add(ref['id'])
-
-                examined.update(children_ids)
-                subtree += children
-                children = self._get_children(session, children_ids)
+            subtree = self._query_hierarchy(session, project_id,
+                                            ancestors=False)
+            if subtree is None:
+                # NOTE: Projects created before the hierarchy index, by a
+                # node running an earlier release, are not in it.
+                subtree = self._walk_project_subtree(session, project_id)
             return subtree
 
-    def list_project_parents(self, project_id):
+    def list_project_ids_in_subtrees(self, project_ids):
+        if not project_ids:
+            return []
         with sql.session_for_read() as session:
-            project = self._get_project(session, project_id).to_dict()
-            parents = []
-            examined = set()
-            while project.get('parent_id') is not None:
-                if project['id'] in examined:
-                    msg = ('Circular reference or a repeated '
-                           'entry found in projects hierarchy - '
-                           '%(project_id)s.')
-                    LOG.error(msg, {'project_id': project['id']})
-                    return
+            query = session.query(ProjectHierarchy.ancestor_id,
+                                  ProjectHierarchy.descendant_id,
+                                  ProjectHierarchy.depth)
+            rows = query.filter(
+                ProjectHierarchy.ancestor_id.in_(project_ids)).all()
+            subtree_ids = set(row.descendant_id for row in rows
+                              if row.depth > 0)
+            indexed_ids = set(row.ancestor_id for row in rows
+                              if row.depth == 0)
+            for project_id in set(project_ids) - indexed_ids:
+                # NOTE: Projects created before the hierarchy index, by a
+                # node running an earlier release, are not in it.
+                subtree = self._walk_project_subtree(session, project_id)
+                subtree_ids.update(ref['id'] for ref in subtree or [])
+            return list(subtree_ids)
 
-                examined.add(project['id'])
-                parent_project = self._get_project(
-                    session, project['parent_id']).to_dict()
-                parents.append(parent_project)
-                project = parent_project
+    def list_project_parents(self, project_id):
+        with sql.session_for_read() as session:
+            parents = self._query_hierarchy(session, project_id,
+                                            ancestors=True)
+            if parents is None:
+                parents = self._walk_project_parents(session, project_id)
             return parents
 
     def is_leaf_project(self, project_id):
@@ -169,6 +229,77 @@ class Resource(base.ResourceDriverBase):
             project_refs = self._get_children(session, [project_id])
             return not project_refs
 
+    # Hierarchy index
+    def _add_to_hierarchy(self, session, project_id, parent_id):
+        """Index a new project below its parent and all of its ancestors."""
+        rows = [(project_id, 0)]
+        if parent_id is not None:
+            query = session.query(ProjectHierarchy.ancestor_id,
+                                  ProjectHierarchy.depth)
+            ancestors = query.filter(
+                ProjectHierarchy.descendant_id == parent_id).all()
+            if not ancestors:
+                # The parent is not indexed, so find its ancestors the slow
+                # way.
+                try:
+                    parents = self._walk_project_parents(session, parent_id)
+                except exception.ProjectNotFound:
+                    parents = None
+                ancestors = [(parent_id, 0)] + [
+                    (ref['id'], depth)
+                    for depth, ref in enumerate(parents or [], start=1)]
+            rows += [(ancestor_id, depth + 1)
+                     for ancestor_id, depth in ancestors]
+        for ancestor_id, depth in rows:
+            session.add(ProjectHierarchy(ancestor_id=ancestor_id,
+                                         descendant_id=project_id,
+                                         depth=depth))
+
+    def _move_in_hierarchy(self, session, project_id, parent_id):
+        """Move the subtree of a project below a new parent."""
+        query = session.query(ProjectHierarchy.descendant_id,
+                              ProjectHierarchy.depth)
+        subtree = query.filter(
+            ProjectHierarchy.ancestor_id == project_id).all()
+        subtree_ids = [descendant_id for descendant_id, depth in subtree]
+        if parent_id in subtree_ids:
+            # A circular reference cannot be indexed, so leave the subtree
+            # out of the index, and lookups walk it and detect the cycle.
+            self._delete_from_hierarchy(session, subtree_ids)
+            return
+        # Unlink the subtree from the ancestors of the project, then link it
+        # to the new ones.
+        query = session.query(ProjectHierarchy.ancestor_id)
+        old_ancestor_ids = [row.ancestor_id for row in query.filter(
+            ProjectHierarchy.descendant_id == project_id,
+            ProjectHierarchy.depth > 0)]
+        if old_ancestor_ids:
+            query = session.query(ProjectHierarchy)
+            query.filter(
+                ProjectHierarchy.ancestor_id.in_(old_ancestor_ids),
+                ProjectHierarchy.descendant_id.in_(subtree_ids)).delete(
+                    synchronize_session=False)
+        if parent_id is None:
+            return
+        query = session.query(ProjectHierarchy.ancestor_id,
+                              ProjectHierarchy.depth)
+        ancestors = query.filter(
+            ProjectHierarchy.descendant_id == parent_id).all()
+        for ancestor_id, ancestor_depth in ancestors:
+            for descendant_id, depth in subtree:
+                session.add(ProjectHierarchy(
+                    ancestor_id=ancestor_id, descendant_id=descendant_id,
+                    depth=ancestor_depth + depth + 1))
+
+    def _delete_from_hierarchy(self, session, project_ids):
+        if not project_ids:
+            return
+        query = session.query(ProjectHierarchy)
+        query.filter(sqlalchemy.or_(
+            ProjectHierarchy.ancestor_id.in_(project_ids),
+            ProjectHierarchy.descendant_id.in_(project_ids))).delete(
+                synchronize_session=False)
+
     # CRUD
     @sql.handle_conflicts(conflict_type='project')
     def create_project(self, project_id, project):
@@ -176,6 +307,8 @@ class Resource(base.ResourceDriverBase):
         with sql.session_for_write() as session:
             project_ref = Project.from_dict(new_project)
             session.add(project_ref)
+            self._add_to_hierarchy(session, project_id,
+                                   new_project.get('parent_id'))
             return project_ref.to_dict()
 
     @sql.handle_conflicts(conflict_type='project')
@@ -183,6 +316,7 @@ class Resource(base.ResourceDriverBase):
         update_project = self._encode_domain_id(project)
         with sql.session_for_write() as session:
             project_ref = self._get_project(session, project_id)
+            old_parent_id = project_ref.parent_id
             old_project_dict = project_ref.to_dict()
             for k in update_project:
                 old_project_dict[k] = update_project[k]
@@ -194,12 +328,16 @@ class Resource(base.ResourceDriverBase):
                 if attr != 'id':
                     setattr(project_ref, attr, getattr(new_project, attr))
             project_ref.extra = new_project.extra
+            if project_ref.parent_id != old_parent_id:
+                self._move_in_hierarchy(session, project_id,
+                                        project_ref.parent_id)
             return project_ref.to_dict(include_extra_dict=True)
 
     @sql.handle_conflicts(conflict_type='project')
     def delete_project(self, project_id):
         with sql.session_for_write() as session:
             project_ref = self._get_project(session, project_id)
+            self._delete_from_hierarchy(session, [project_id])
             session.delete(project_ref)
 
     @sql.handle_conflicts(conflict_type='project')
@@ -215,6 +353,7 @@ class Resource(base.ResourceDriverBase):
                         project_id == base.NULL_DOMAIN_ID):
                     LOG.warning('Project %s does not exist and was not '
                                 'deleted.', project_id)
+            self._delete_from_hierarchy(session, project_ids_from_bd)
             query.delete(synchronize_session=False)
 
 
@@ -249,3 +388,26 @@ class Project(sql.ModelBase, sql.ModelDictMixinWithExtras):
     # Unique constraint across two columns to create the separation
     # rather than just only 'name' being unique
     __table_args__ = (sql.UniqueConstraint('domain_id', 'name'),)
+
+
+class ProjectHierarchy(sql.ModelBase, sql.ModelDictMixin):
+    """Index of the ancestors of every project.
+
+    Each project has a row for itself at depth 0, and one for each of its
+    ancestors at its depth below that ancestor, so that the ancestors and
+    the subtree of a project are each found with a single query.
+
+    """
+
+    __tablename__ = 'project_hierarchy'
+    attributes = ['ancestor_id', 'descendant_id', 'depth']
+    # NOTE: There are no foreign keys to the project table, so that nodes
+    # running an earlier release, which do not maintain this table, can
+    # still delete projects during a rolling upgrade.
+    ancestor_id = sql.Column(sql.String(64), primary_key=True)
+    descendant_id = sql.Column(sql.String(64), primary_key=True)
+    depth = sql.Column(sql.Integer, nullable=False)
+    __table_args__ = (
+        sql.Index('ix_project_hierarchy_descendant_id_depth',
+                  'descendant_id', 'depth'),
+    )
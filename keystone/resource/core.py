@@ -210,6 +210,11 @@ class Manager(manager.Manager):
             notifications.Audit.created(self._DOMAIN, project_id, initiator)
         else:
             notifications.Audit.created(self._PROJECT, project_id, initiator)
+            # Invalidate user role assignments cache region, as it may be
+            # caching the projects users have a role on, which the new
+            # project is one of if it inherits assignments from its domain
+            # or parents
+            assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
         if MEMOIZE.should_cache(ret):
             self.get_project.set(ret, self, project_id)
             self.get_project_by_name.set(ret, self, ret['name'],
@@ -52,6 +52,25 @@ class RevokeDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_events_for_tokens(self, tokens):
+        """Return the revocation events that may match any of the tokens.
+
+        An event returned for one token is not filtered on the values of the
+        other tokens, so callers must compare each token with every attribute
+        of the events. Drivers may override this to fetch the events for all
+        of the tokens at once. The default implementation calls `list_events`
+        for each token.
+
+        :param tokens: a list of dictionaries of values from tokens, as
+                       passed to `list_events`.
+        :returns: A list of keystone.revoke.model.RevokeEvent
+
+        """
+        events = []
+        for token in tokens:
+            events.extend(self.list_events(token=token))
+        return events
+
     @abc.abstractmethod
     def revoke(self, event):
         """register a revocation event.
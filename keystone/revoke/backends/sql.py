@@ -113,6 +113,40 @@ class Revoke(base.RevokeDriverBase):
             events = [revoke_model.RevokeEvent(**e.to_dict()) for e in query]
             return events
 
+    def list_events_for_tokens(self, tokens):
+        # A single query for the events of every token. An event returned
+        # here may only match some of the tokens.
+        user_ids = set()
+        project_ids = set()
+        audit_ids = set()
+        for token in tokens:
+            user_ids.update(token[attr] for attr in
+                            ('user_id', 'trustor_id', 'trustee_id')
+                            if token[attr])
+            if token['project_id']:
+                project_ids.add(token['project_id'])
+            if token['audit_id']:
+                audit_ids.add(token['audit_id'])
+
+        with sql.session_for_read() as session:
+            query = session.query(RevocationEvent).filter(
+                RevocationEvent.issued_before >= min(
+                    token['issued_at'] for token in tokens))
+            user = [RevocationEvent.user_id.is_(None)]
+            proj = [RevocationEvent.project_id.is_(None)]
+            audit = [RevocationEvent.audit_id.is_(None)]
+            if user_ids:
+                user.append(RevocationEvent.user_id.in_(user_ids))
+            if project_ids:
+                proj.append(RevocationEvent.project_id.in_(project_ids))
+            if audit_ids:
+                audit.append(RevocationEvent.audit_id.in_(audit_ids))
+            query = query.filter(sqlalchemy.and_(sqlalchemy.or_(*user),
+                                                 sqlalchemy.or_(*proj),
+                                                 sqlalchemy.or_(*audit)))
+            events = [revoke_model.RevokeEvent(**e.to_dict()) for e in query]
+            return events
+
     def _list_last_fetch_events(self, last_fetch=None):
         with sql.session_for_read() as session:
             query = session.query(RevocationEvent).order_by(
@@ -12,6 +12,11 @@
 
 """Main entry point into the Revoke service."""
 
+import datetime
+import threading
+
+from oslo_utils import timeutils
+
 from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import extension
@@ -21,6 +26,7 @@ from keystone import exception
 from keystone.i18n import _
 from keystone.models import revoke_model
 from keystone import notifications
+from keystone.revoke.backends import base
 
 
 CONF = keystone.conf.CONF
@@ -52,6 +58,19 @@ MEMOIZE = cache.get_memoization_decorator(
     group='revoke',
     region=REVOKE_REGION)
 
+# Events are stamped with `revoked_at` by the node that records them, truncated
+# to the second, and may be committed after events stamped later by another
+# node. Each incremental refresh of the in-memory index therefore re-reads this
+# window of events before the latest event it holds; events the index already
+# holds are discarded. Events stamped earlier than that, by a node whose clock
+# lags or that committed them late, are only picked up by the next full reload
+# of the index, every `[revoke] index_reload_interval` seconds.
+INDEX_REFRESH_OVERLAP = datetime.timedelta(seconds=5)
+
+# The most tokens remembered as not revoked by the in-memory index before the
+# list is started over.
+CHECKED_TOKENS_LIMIT = 100000
+
 
 @dependency.provider('revoke_api')
 class Manager(manager.Manager):
@@ -70,12 +89,28 @@ class Manager(manager.Manager):
         super(Manager, self).__init__(CONF.revoke.driver)
         self._register_listeners()
         self.model = revoke_model
+        self._index = None
+        self._index_refreshed_at = None
+        self._index_loaded_at = None
+        # While the index is being reloaded, the events fetched by
+        # incremental refreshes, which the reloaded index must also hold.
+        self._reload_events = None
+        self._index_lock = threading.Lock()
+        # The revocation generation is bumped whenever the index may have
+        # gained an event. Tokens found not revoked are remembered by audit
+        # ID with the generation they were checked at.
+        self._generation = 0
+        self._not_revoked = {}
 
     @MEMOIZE
     def _list_events(self, last_fetch):
         return self.driver.list_events(last_fetch)
 
     def list_events(self, last_fetch=None):
+        if CONF.revoke.in_memory_index:
+            self._refresh_index()
+            with self._index_lock:
+                return self._index.list_events(last_fetch)
         return self._list_events(last_fetch)
 
     def _user_callback(self, service, resource_type, operation,
@@ -164,10 +199,153 @@ class Manager(manager.Manager):
         :raises keystone.exception.TokenNotFound: If the token is invalid.
 
         """
-        if revoke_model.is_revoked(self.driver.list_events(token=token),
-                                   token):
+        if CONF.revoke.in_memory_index:
+            revoked = self._index_is_revoked(token)
+        else:
+            revoked = revoke_model.is_revoked(
+                self.driver.list_events(token=token), token)
+        if revoked:
             raise exception.TokenNotFound(_('Failed to validate token'))
 
+    def check_tokens(self, tokens):
+        """Check the values from several tokens against the revocation list.
+
+        :param tokens: a list of dictionaries of values from tokens, as
+                       passed to `check_token`.
+        :returns: a list with one boolean per token, True if the token is
+                  revoked.
+
+        """
+        if not tokens:
+            return []
+        if CONF.revoke.in_memory_index:
+            self._refresh_index()
+            with self._index_lock:
+                return [self._index_check(token) for token in tokens]
+        # The events match at least one of the tokens, but not necessarily
+        # all of them, so each token is checked with the full comparison the
+        # index does.
+        index = revoke_model.RevokeIndex()
+        index.add_events(self.driver.list_events_for_tokens(tokens))
+        return [index.is_revoked(token) for token in tokens]
+
+    def _index_is_revoked(self, token):
+        self._refresh_index()
+        with self._index_lock:
+            return self._index_check(token)
+
+    def _index_check(self, token):
+        """Check a token against the in-memory index.
+
+        A token that is not revoked stays so until an event is added to the
+        index, which bumps the revocation generation, so a token checked again
+        at the same generation is not looked up in the index. This does not
+        skip the refresh that precedes it, which only waits for `[revoke]
+        index_refresh_interval` to elapse. The caller must hold `_index_lock`.
+
+        """
+        audit_id = token.get('audit_id')
+        if audit_id is None:
+            return self._index.is_revoked(token)
+        if self._not_revoked.get(audit_id) == self._generation:
+            return False
+        revoked = self._index.is_revoked(token)
+        if not revoked:
+            if len(self._not_revoked) >= CHECKED_TOKENS_LIMIT:
+                self._not_revoked.clear()
+            self._not_revoked[audit_id] = self._generation
+        return revoked
+
+    def _refresh_index(self, force=False):
+        """Bring the in-memory revocation index up to date.
+
+        The first call loads every event from the backend. Later calls only
+        fetch the events revoked since the latest event in the index, less
+        `INDEX_REFRESH_OVERLAP`, and drop the events that are too old to match
+        any unexpired token. Fetching new events bumps the revocation
+        generation. As that cursor depends on the clocks of the nodes that
+        record events, every `[revoke] index_reload_interval` seconds the
+        index is instead replaced by one loaded with every event, which
+        picks up any event the cursor missed.
+
+        `_index_lock` is held while loading the index, once per process, but
+        not while fetching events to refresh or reload it, so that token
+        checks do not queue behind each other's queries; it is only taken
+        again to merge the events, which the index deduplicates. The caller
+        must not hold it.
+
+        :param force: refresh even if `[revoke] index_refresh_interval` has
+                      not elapsed since the previous refresh.
+
+        """
+        now = timeutils.utcnow()
+        with self._index_lock:
+            if self._index is None:
+                index = revoke_model.RevokeIndex()
+                index.add_events(self.driver.list_events())
+                index.prune(base.revoked_before_cutoff_time())
+                self._index = index
+                self._index_refreshed_at = self._index_loaded_at = now
+                return
+            elapsed = (now - self._index_refreshed_at).total_seconds()
+            if not force and elapsed < CONF.revoke.index_refresh_interval:
+                return
+            reload_interval = CONF.revoke.index_reload_interval
+            reload = (
+                reload_interval and self._reload_events is None and
+                (now - self._index_loaded_at).total_seconds() >=
+                reload_interval)
+            if reload:
+                self._reload_events = []
+                last_fetch = None
+            else:
+                last_fetch = self._index.last_revoked_at
+                if last_fetch is not None:
+                    last_fetch -= INDEX_REFRESH_OVERLAP
+
+        if reload:
+            self._reload_index(now)
+            return
+        events = self.driver.list_events(last_fetch=last_fetch)
+        with self._index_lock:
+            if self._reload_events is not None:
+                self._reload_events.extend(events)
+            if self._index.add_events(events):
+                self._generation += 1
+            self._index.prune(base.revoked_before_cutoff_time())
+            self._index_refreshed_at = max(now, self._index_refreshed_at)
+
+    def _reload_index(self, now):
+        """Replace the in-memory index by one loaded with every event.
+
+        The events are fetched and indexed without holding `_index_lock`.
+        Events that concurrent refreshes fetch meanwhile are collected in
+        `_reload_events` and also added to the new index before it replaces
+        the current one.
+
+        """
+        try:
+            index = revoke_model.RevokeIndex()
+            index.add_events(self.driver.list_events())
+        except Exception:
+            with self._index_lock:
+                self._reload_events = None
+            raise
+        with self._index_lock:
+            index.add_events(self._reload_events)
+            self._reload_events = None
+            index.prune(base.revoked_before_cutoff_time())
+            self._index = index
+            self._generation += 1
+            self._index_loaded_at = now
+            self._index_refreshed_at = max(now, self._index_refreshed_at)
+
     def revoke(self, event):
         self.driver.revoke(event)
         REVOKE_REGION.invalidate()
+        if CONF.revoke.in_memory_index:
+            with self._index_lock:
+                self._generation += 1
+                loaded = self._index is not None
+            if loaded:
+                self._refresh_index(force=True)
@@ -30,11 +30,15 @@ def load_backends():
 
     # Configure and build the cache
     cache.configure_cache()
-    cache.configure_cache(region=catalog.COMPUTED_CATALOG_REGION)
-    cache.configure_cache(region=assignment.COMPUTED_ASSIGNMENTS_REGION)
-    cache.configure_cache(region=revoke.REVOKE_REGION)
-    cache.configure_cache(region=token.provider.TOKENS_REGION)
-    cache.configure_cache(region=identity.ID_MAPPING_REGION)
+    cache.configure_cache(region=catalog.COMPUTED_CATALOG_REGION,
+                          group='catalog')
+    cache.configure_cache(region=assignment.COMPUTED_ASSIGNMENTS_REGION,
+                          group='role')
+    cache.configure_cache(region=revoke.REVOKE_REGION, group='revoke')
+    cache.configure_cache(region=token.provider.TOKENS_REGION,
+                          group='token')
+    cache.configure_cache(region=identity.ID_MAPPING_REGION,
+                          group='identity_mapping')
     cache.configure_invalidation_region()
 
     # NOTE(knikolla): The assignment manager must be instantiated before the
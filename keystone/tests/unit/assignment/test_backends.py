@@ -580,15 +580,12 @@ class AssignmentTests(AssignmentTestHelperMixin):
         self.assertEqual([], assignment_list)
 
     def test_list_role_assignments_user_not_found(self):
-        def _user_not_found(value):
-            raise exception.UserNotFound(user_id=value)
-
-        # Note(knikolla): Patch get_user to return UserNotFound
+        # Note(knikolla): Patch list_users_from_ids to find no users,
         # this simulates the possibility of a user being deleted
         # directly in the backend and still having lingering role
         # assignments.
-        with mock.patch.object(self.identity_api, 'get_user',
-                               _user_not_found):
+        with mock.patch.object(self.identity_api, 'list_users_from_ids',
+                               return_value=[]):
             assignment_list = self.assignment_api.list_role_assignments(
                 include_names=True
             )
@@ -629,11 +626,11 @@ class AssignmentTests(AssignmentTestHelperMixin):
         num_assignments = len(self.assignment_api.list_role_assignments())
         self.assertEqual(1, num_assignments)
 
-        # Patch get_group to return GroupNotFound, allowing us to confirm
-        # that the exception is handled properly when include_names processing
-        # attempts to lookup a group that has been deleted in the backend
-        with mock.patch.object(self.identity_api, 'get_group',
-                               _group_not_found):
+        # Patch list_groups_from_ids to find no groups, allowing us to confirm
+        # that include_names processing handles a group that has been deleted
+        # in the backend
+        with mock.patch.object(self.identity_api, 'list_groups_from_ids',
+                               return_value=[]):
             assignment_list = self.assignment_api.list_role_assignments(
                 include_names=True
             )
@@ -3240,6 +3237,81 @@ class InheritanceTests(AssignmentTestHelperMixin):
         }
         self.execute_assignment_plan(test_plan)
 
+    def test_list_target_ids_for_actors(self):
+        domain = unit.new_domain_ref()
+        self.resource_api.create_domain(domain['id'], domain)
+        root_project = unit.new_project_ref(domain_id=domain['id'])
+        self.resource_api.create_project(root_project['id'], root_project)
+        leaf_project = unit.new_project_ref(domain_id=domain['id'],
+                                            parent_id=root_project['id'])
+        self.resource_api.create_project(leaf_project['id'], leaf_project)
+        other_project = unit.new_project_ref(domain_id=domain['id'])
+        self.resource_api.create_project(other_project['id'], other_project)
+
+        user = unit.new_user_ref(domain_id=domain['id'])
+        user = self.identity_api.create_user(user)
+        group = unit.new_group_ref(domain_id=domain['id'])
+        group = self.identity_api.create_group(group)
+        self.identity_api.add_user_to_group(user['id'], group['id'])
+        other_group = unit.new_group_ref(domain_id=domain['id'])
+        other_group = self.identity_api.create_group(other_group)
+
+        # A domain role only counts when it implies a global role.
+        domain_role = unit.new_role_ref(domain_id=domain['id'])
+        self.role_api.create_role(domain_role['id'], domain_role)
+        prior_role = unit.new_role_ref(domain_id=domain['id'])
+        self.role_api.create_role(prior_role['id'], prior_role)
+        self.role_api.create_implied_role(prior_role['id'],
+                                          self.role_member['id'])
+
+        self.assignment_api.create_grant(user_id=user['id'],
+                                         domain_id=domain['id'],
+                                         role_id=self.role_member['id'])
+        self.assignment_api.create_grant(group_id=group['id'],
+                                         project_id=root_project['id'],
+                                         role_id=self.role_admin['id'],
+                                         inherited_to_projects=True)
+        self.assignment_api.create_grant(user_id=user['id'],
+                                         project_id=other_project['id'],
+                                         role_id=domain_role['id'])
+        self.assignment_api.create_grant(group_id=other_group['id'],
+                                         project_id=other_project['id'],
+                                         role_id=prior_role['id'])
+
+        target_ids = self.assignment_api.list_target_ids_for_actors(
+            user_id=user['id'])
+        self.assertEqual([leaf_project['id']], target_ids['project_ids'])
+        self.assertEqual([domain['id']], target_ids['domain_ids'])
+        effective_project_ids = set(
+            ref['id'] for ref in
+            self.assignment_api.list_projects_for_user(user['id']))
+        self.assertEqual(effective_project_ids,
+                         set(target_ids['project_ids']))
+
+        target_ids = self.assignment_api.list_target_ids_for_actors(
+            user_id=user['id'], group_ids=[other_group['id']])
+        self.assertItemsEqual([leaf_project['id'], other_project['id']],
+                              target_ids['project_ids'])
+
+        # A user that does not exist, such as a federated user, only gets
+        # the targets of its groups.
+        target_ids = self.assignment_api.list_target_ids_for_actors(
+            user_id=uuid.uuid4().hex, group_ids=[group['id']])
+        self.assertEqual([leaf_project['id']], target_ids['project_ids'])
+        self.assertEqual([], target_ids['domain_ids'])
+
+        # A new project inherits the assignments on its parents.
+        new_project = unit.new_project_ref(domain_id=domain['id'],
+                                           parent_id=leaf_project['id'])
+        self.resource_api.create_project(new_project['id'], new_project)
+        user_projects = self.assignment_api.list_projects_for_actors(
+            user_id=user['id'])
+        self.assertItemsEqual([leaf_project['id'], new_project['id']],
+                              [ref['id'] for ref in user_projects])
+        user_domains = self.assignment_api.list_domains_for_actors(
+            user_id=user['id'])
+        self.assertEqual([domain['id']], [ref['id'] for ref in user_domains])
+
     def test_list_assignments_for_tree(self):
         """Test we correctly list direct assignments for a tree."""
         # Enable OS-INHERIT extension
@@ -3679,6 +3751,55 @@ class ImpliedRoleTests(AssignmentTestHelperMixin):
         for x in range(0, 5):
             self.assertIn(test_data['roles'][x]['id'], role_ids)
 
+    def test_role_assignments_implied_role_of_two_assigned_roles(self):
+        """Test that a role implied via two assigned roles is listed once."""
+        test_plan = {
+            'entities': {'domains': {'users': 1, 'projects': 1},
+                         'roles': 3},
+            'implied_roles': [{'role': 0, 'implied_roles': 1},
+                              {'role': 1, 'implied_roles': 2}],
+            # The user gets both a role and the role it implies
+            'assignments': [{'user': 0, 'role': 0, 'project': 0},
+                            {'user': 0, 'role': 1, 'project': 0}],
+            'tests': [
+                {'params': {'user': 0, 'effective': True},
+                 'results': [{'user': 0, 'role': 0, 'project': 0},
+                             {'user': 0, 'role': 1, 'project': 0},
+                             {'user': 0, 'role': 1, 'project': 0,
+                              'indirect': {'role': 0}},
+                             {'user': 0, 'role': 2, 'project': 0,
+                              'indirect': {'role': 1}}]},
+            ]
+        }
+        self.execute_assignment_plan(test_plan)
+
+    def test_role_inference_closure(self):
+        role_ids = []
+        for _ in range(4):
+            role = unit.new_role_ref()
+            role_ids.append(self.role_api.create_role(role['id'], role)['id'])
+        self.role_api.create_implied_role(role_ids[0], role_ids[1])
+        self.role_api.create_implied_role(role_ids[1], role_ids[2])
+        self.assertEqual(
+            [[role_ids[0], role_ids[1]], [role_ids[1], role_ids[2]]],
+            self.role_api.get_role_inference_closure()[role_ids[0]])
+
+        # The closure is recomputed when the rules change.
+        self.role_api.create_implied_role(role_ids[2], role_ids[3])
+        self.assertIn(
+            [role_ids[2], role_ids[3]],
+            self.role_api.get_role_inference_closure()[role_ids[0]])
+        self.role_api.delete_implied_role(role_ids[0], role_ids[1])
+        self.assertNotIn(role_ids[0],
+                         self.role_api.get_role_inference_closure())
+
+        # Deleting a role deletes its rules, so the closure is recomputed.
+        with mock.patch.object(self.role_api.driver,
+                               'list_role_inference_rules',
+                               return_value=[]):
+            self.role_api.delete_role(role_ids[2])
+            self.assertEqual({}, self.role_api.get_role_inference_closure())
+
     def test_role_assignments_implied_roles_filtered_by_role(self):
         """Test that you can filter by role even if roles are implied."""
         test_plan = {
@@ -10,13 +10,18 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+import time
 import uuid
 
 from dogpile.cache import api as dogpile
 from dogpile.cache.backends import memory
+import mock
 from oslo_config import fixture as config_fixture
+from oslo_context import context as oslo_context
 
 from keystone.common import cache
+from keystone.common.cache import _context_cache
 import keystone.conf
 from keystone.tests import unit
 
@@ -195,3 +200,164 @@ class TestCacheRegion(unit.BaseTestCase):
         # test invalidation
         cache.CACHE_INVALIDATION_REGION.delete(region_key)
         self.assertIsInstance(self.region0.get(key), dogpile.NoValue)
+
+
+class TestLocalCache(unit.BaseTestCase):
+
+    def setUp(self):
+        super(TestLocalCache, self).setUp()
+        self.config_fixture = self.useFixture(config_fixture.Config(CONF))
+        self.config_fixture.config(group='cache',
+                                   backend='dogpile.cache.memory')
+        self.config_fixture.config(group='token', local_cache_size=2,
+                                   local_cache_time=5)
+
+        cache.CACHE_INVALIDATION_REGION.configure(
+            backend='dogpile.cache.memory',
+            expiration_time=None,
+            replace_existing_backend=True)
+
+        # region0 has a process cache in front of the shared backend, region1
+        # stands for another process using the same backend.
+        self.region0 = cache.create_region(uuid.uuid4().hex)
+        self.region1 = cache.create_region(self.region0.name)
+        cache.configure_cache(region=self.region0, group='token')
+        cache.configure_cache(region=self.region1)
+
+        self.cache_dict = {}
+        self.backend = memory.MemoryBackend({'cache_dict': self.cache_dict})
+        self.local_cache = cache.core._LOCAL_CACHES[self.region0.name]
+        self.local_cache.proxied = self.backend
+        self.region1.backend = self.backend
+
+    def _get(self, key):
+        # Start a new request, so the value is not in the request cache.
+        oslo_context.RequestContext(overwrite=True)
+        return self.region0.get(key)
+
+    def test_values_are_kept_in_process(self):
+        key = uuid.uuid4().hex
+        self.assertIsInstance(self._get(key), dogpile.NoValue)
+        self.region0.set(key, 'value')
+        self.cache_dict.clear()
+        self.assertEqual('value', self._get(key))
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1},
+                         cache.get_local_cache_stats()[self.region0.name])
+
+    def test_values_from_backend_are_kept_in_process(self):
+        key = uuid.uuid4().hex
+        self.region1.set(key, 'value')
+        self.assertEqual('value', self._get(key))
+        self.cache_dict.clear()
+        self.assertEqual('value', self._get(key))
+
+    def test_values_expire(self):
+        key = uuid.uuid4().hex
+        self.region0.set(key, 'value')
+        self.cache_dict.clear()
+        with mock.patch.object(time, 'time', return_value=time.time() + 6):
+            self.assertIsInstance(self._get(key), dogpile.NoValue)
+
+    def test_least_recently_used_values_are_dropped(self):
+        keys = [uuid.uuid4().hex for i in range(3)]
+        self.region0.set(keys[0], 0)
+        self.region0.set(keys[1], 1)
+        self._get(keys[0])
+        self.region0.set(keys[2], 2)
+        self.cache_dict.clear()
+        self.assertEqual(0, self._get(keys[0]))
+        self.assertIsInstance(self._get(keys[1]), dogpile.NoValue)
+        self.assertEqual(2, self._get(keys[2]))
+
+    def test_cached_values_cannot_be_modified(self):
+        key = uuid.uuid4().hex
+        self.region0.set(key, {'roles': ['admin']})
+        self._get(key)['roles'].append('member')
+        self.assertEqual({'roles': ['admin']}, self._get(key))
+
+    def test_multi_methods(self):
+        mapping = {uuid.uuid4().hex: uuid.uuid4().hex for _ in range(2)}
+        keys = list(mapping.keys())
+        self.region1.set_multi(mapping)
+        oslo_context.RequestContext(overwrite=True)
+        self.assertEqual([mapping[k] for k in keys],
+                         self.region0.get_multi(keys))
+        self.cache_dict.clear()
+        oslo_context.RequestContext(overwrite=True)
+        self.assertEqual([mapping[k] for k in keys],
+                         self.region0.get_multi(keys))
+        self.region0.delete_multi(keys)
+        for key in keys:
+            self.assertIsInstance(self._get(key), dogpile.NoValue)
+
+    def test_local_invalidation_is_immediate(self):
+        key = uuid.uuid4().hex
+        self.region0.set(key, 'value')
+        self.region0.invalidate()
+        self.assertIsInstance(self._get(key), dogpile.NoValue)
+
+    def test_remote_invalidation_is_seen_after_local_cache_time(self):
+        key = uuid.uuid4().hex
+        self.region0.set(key, 'value')
+        self.region1.invalidate()
+        # The region ID is kept in process, so the value is still found.
+        self.assertEqual('value', self._get(key))
+        with mock.patch.object(time, 'time', return_value=time.time() + 6):
+            self.assertIsInstance(self._get(key), dogpile.NoValue)
+
+
+class TestRequestCache(unit.BaseTestCase):
+
+    def setUp(self):
+        super(TestRequestCache, self).setUp()
+        oslo_context.RequestContext(overwrite=True)
+        self.proxy = _context_cache._ResponseCacheProxy()
+        self.proxy.proxied = memory.MemoryBackend({'cache_dict': {}})
+
+    def _set(self, payload):
+        key = uuid.uuid4().hex
+        self.proxy.set(key, dogpile.CachedValue(payload, {'v': 1}))
+        return key
+
+    def test_immutable_values_are_not_serialized(self):
+        for payload in (None, 1, 1.5, u'text', b'bytes', (u'a', 1)):
+            with mock.patch.object(_context_cache.msgpackutils,
+                                   'dumps') as dumps:
+                key = self._set(payload)
+            self.assertFalse(dumps.called)
+            self.assertEqual(payload, self.proxy.get(key).payload)
+
+    def test_mutable_values_are_copied(self):
+        key = self._set({'a': [1]})
+        value = self.proxy.get(key)
+        self.assertEqual({'a': [1]}, value.payload)
+        value.payload['a'].append(2)
+        self.assertEqual({'a': [1]}, self.proxy.get(key).payload)
+
+    def test_tuples_with_mutable_values_are_copied(self):
+        key = self._set((u'a', [1]))
+        self.proxy.get(key).payload[1].append(2)
+        self.assertEqual([1], list(self.proxy.get(key).payload[1]))
+
+    def test_builtin_values_are_not_serialized_with_msgpack(self):
+        payload = {u'token': {u'roles': [{u'id': u'a'}], u'catalog': []}}
+        with mock.patch.object(_context_cache.msgpackutils,
+                               'dumps') as dumps:
+            key = self._set(payload)
+        self.assertFalse(dumps.called)
+        with mock.patch.object(_context_cache.msgpackutils,
+                               'loads') as loads:
+            value = self.proxy.get(key)
+        self.assertFalse(loads.called)
+        self.assertEqual(payload, value.payload)
+        self.assertEqual({'v': 1}, value.metadata)
+        value.payload[u'token'][u'roles'].append({u'id': u'b'})
+        self.assertEqual(payload, self.proxy.get(key).payload)
+
+    def test_other_values_are_serialized_with_msgpack(self):
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        key = self._set({u'expires_at': now})
+        value = self.proxy.get(key)
+        self.assertEqual({u'expires_at': now}, value.payload)
+        value.payload[u'expires_at'] = None
+        self.assertEqual(now, self.proxy.get(key).payload[u'expires_at'])
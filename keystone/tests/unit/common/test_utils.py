@@ -13,14 +13,19 @@
 
 import datetime
 import fixtures
+import multiprocessing
+import os
+import time
 import uuid
 
 import freezegun
+import mock
 from oslo_config import fixture as config_fixture
 from oslo_log import log
 import six
 
 from keystone.common import fernet_utils
+from keystone.common import password_hashing
 from keystone.common import utils as common_utils
 import keystone.conf
 from keystone.credential.providers import fernet as credential_fernet
@@ -78,6 +83,58 @@ class UtilsTestCase(unit.BaseTestCase):
         self.assertTrue(common_utils.check_password(password, hashed))
         self.assertFalse(common_utils.check_password(wrong, hashed))
 
+    def test_hash_in_worker_pool(self):
+        self.config_fixture.config(group='identity', password_hash_workers=1,
+                                   password_hash_queue_size=1)
+        password = 'right'
+        wrong = 'wrongwrong'  # Two wrongs don't make a right
+        hashed = common_utils.hash_password(password)
+        self.assertTrue(common_utils.check_password(password, hashed))
+        self.assertFalse(common_utils.check_password(wrong, hashed))
+
+        stats = password_hashing.get_hashing_pool_stats()
+        self.assertEqual(1, stats['workers'])
+        self.assertEqual(0, stats['pending'])
+        self.assertEqual(3, stats['completed'])
+        self.assertLessEqual(stats['max_time'], stats['total_time'])
+
+        # The pool is stopped once it is disabled.
+        self.config_fixture.config(group='identity', password_hash_workers=0)
+        self.assertIsNone(password_hashing.get_hashing_pool_stats())
+        self.assertTrue(common_utils.check_password(password, hashed))
+
+    def test_hash_in_worker_pool_timeout(self):
+        self.config_fixture.config(group='identity', password_hash_workers=1,
+                                   password_hash_queue_size=1,
+                                   password_hash_timeout=1)
+        password = 'right'
+        hashed = common_utils.hash_password(password)
+        pool = password_hashing._get_pool()
+
+        # A worker that dies while hashing a password never returns it, so
+        # the password is checked in this thread, and its place in the pool
+        # is given back.
+        result = mock.Mock()
+        result.get.side_effect = multiprocessing.TimeoutError
+        with mock.patch.object(pool._pool, 'apply_async',
+                               return_value=result):
+            for i in range(3):
+                self.assertTrue(common_utils.check_password(password,
+                                                            hashed))
+        result.get.assert_called_with(1)
+        stats = password_hashing.get_hashing_pool_stats()
+        self.assertEqual(3, stats['timed_out'])
+        self.assertEqual(0, stats['pending'])
+
+    def test_hash_in_worker_pool_logs_stats(self):
+        self.config_fixture.config(group='identity', password_hash_workers=1)
+        self.useFixture(fixtures.MockPatchObject(
+            password_hashing, 'POOL_STATS_LOG_INTERVAL', 0))
+        logging_fixture = self.useFixture(fixtures.FakeLogger(level=log.INFO))
+        common_utils.hash_password('right')
+        self.assertIn('Password hashing pool: 1 passwords hashed',
+                      logging_fixture.output)
+
     def test_verify_normal_password_strict(self):
         self.config_fixture.config(strict_password_check=False)
         password = uuid.uuid4().hex
@@ -295,3 +352,60 @@ class FernetUtilsTestCase(unit.BaseTestCase):
                 'dir': CONF.credential.key_repository,
                 'max': credential_fernet.MAX_ACTIVE_KEYS}
         self.assertNotIn(debug_message, logging_fixture.output)
+
+    def _settled_fernet_utils(self):
+        self.useFixture(
+            ksfixtures.KeyRepository(
+                self.config_fixture,
+                'fernet_tokens',
+                CONF.fernet_tokens.max_active_keys
+            )
+        )
+        # Make the key repository look like it has not been modified for a
+        # while, so that its timestamp can be trusted.
+        old = time.time() - 60
+        os.utime(CONF.fernet_tokens.key_repository, (old, old))
+        return fernet_utils.FernetUtils(
+            CONF.fernet_tokens.key_repository,
+            CONF.fernet_tokens.max_active_keys,
+            'fernet_tokens'
+        )
+
+    def test_multi_fernet_is_cached(self):
+        fernet_utilities = self._settled_fernet_utils()
+        crypto, keys = fernet_utilities.load_multi_fernet()
+        with mock.patch.object(fernet_utilities, 'load_keys') as load_keys:
+            cached_crypto, cached_keys = fernet_utilities.load_multi_fernet()
+            self.assertFalse(load_keys.called)
+        self.assertIs(crypto, cached_crypto)
+        self.assertEqual(keys, cached_keys)
+
+    def test_multi_fernet_is_reloaded_after_rotation(self):
+        fernet_utilities = self._settled_fernet_utils()
+        crypto, keys = fernet_utilities.load_multi_fernet()
+        fernet_utilities.rotate_keys()
+        new_crypto, new_keys = fernet_utilities.load_multi_fernet()
+        self.assertIsNot(crypto, new_crypto)
+        self.assertEqual(len(keys) + 1, len(new_keys))
+        self.assertEqual(fernet_utilities.load_keys(), new_keys)
+
+    def test_recently_modified_key_repository_is_not_cached(self):
+        fernet_utilities = self._settled_fernet_utils()
+        now = time.time()
+        os.utime(CONF.fernet_tokens.key_repository, (now, now))
+        crypto, keys = fernet_utilities.load_multi_fernet()
+        new_crypto, new_keys = fernet_utilities.load_multi_fernet()
+        self.assertIsNot(crypto, new_crypto)
+        self.assertEqual(keys, new_keys)
+
+    def test_multi_fernet_without_keys(self):
+        self.config_fixture.config(group='fernet_tokens',
+                                   key_repository=uuid.uuid4().hex)
+        fernet_utilities = fernet_utils.FernetUtils(
+            CONF.fernet_tokens.key_repository,
+            CONF.fernet_tokens.max_active_keys,
+            'fernet_tokens'
+        )
+        self.assertEqual((None, []), fernet_utilities.load_multi_fernet())
+        crypto, keys = fernet_utilities.load_multi_fernet(use_null_key=True)
+        self.assertEqual([fernet_utils.NULL_KEY], keys)
@@ -14,6 +14,7 @@ import datetime
 import uuid
 
 import freezegun
+import mock
 import passlib.hash
 
 from keystone.common import controller
@@ -24,6 +25,7 @@ import keystone.conf
 from keystone import exception
 from keystone.identity.backends import base
 from keystone.identity.backends import resource_options as iro
+from keystone.identity.backends import sql as sql_identity
 from keystone.identity.backends import sql_model as model
 from keystone.tests.unit import test_backend_sql
 
@@ -688,6 +690,151 @@ class LockingOutUserTests(test_backend_sql.SqlTests):
                               password=wrong_password)
 
 
+class VerifiedPasswordTests(test_backend_sql.SqlTests):
+    def setUp(self):
+        super(VerifiedPasswordTests, self).setUp()
+        self.config_fixture.config(
+            group='identity',
+            password_verification_cache_ttl=60)
+        self.config_fixture.config(
+            group='security_compliance',
+            lockout_failure_attempts=3)
+        self.password = uuid.uuid4().hex
+        user_dict = {
+            'name': uuid.uuid4().hex,
+            'domain_id': CONF.identity.default_domain_id,
+            'enabled': True,
+            'password': self.password
+        }
+        self.user = self.identity_api.create_user(user_dict)
+        verify = mock.patch.object(password_hashing, '_verify',
+                                   wraps=password_hashing._verify)
+        self.verify = verify.start()
+        self.addCleanup(verify.stop)
+
+    def _authenticate(self, password):
+        return self.identity_api.authenticate(self.make_request(),
+                                              user_id=self.user['id'],
+                                              password=password)
+
+    def test_verified_password_is_not_hashed_again(self):
+        self._authenticate(self.password)
+        self._authenticate(self.password)
+        self.assertEqual(1, self.verify.call_count)
+
+        # A wrong password is still hashed, and counts as a failure.
+        self.assertRaises(AssertionError, self._authenticate,
+                          uuid.uuid4().hex)
+        self.assertEqual(2, self.verify.call_count)
+        with sql.session_for_read() as session:
+            user_ref = session.query(model.User).get(self.user['id'])
+            self.assertEqual(1, user_ref.local_user.failed_auth_count)
+
+        self._authenticate(self.password)
+        self.assertEqual(2, self.verify.call_count)
+
+    def test_verified_password_forgotten_when_disabled(self):
+        self._authenticate(self.password)
+        self.config_fixture.config(group='identity',
+                                   password_verification_cache_ttl=0)
+        self._authenticate(self.password)
+        self.assertEqual(2, self.verify.call_count)
+
+    def test_verified_password_forgotten_on_password_change(self):
+        self._authenticate(self.password)
+        new_password = uuid.uuid4().hex
+        self.identity_api.change_password(self.make_request(),
+                                          user_id=self.user['id'],
+                                          original_password=self.password,
+                                          new_password=new_password)
+        self.assertRaises(AssertionError, self._authenticate, self.password)
+        self._authenticate(new_password)
+
+        self.identity_api.update_user(self.user['id'],
+                                      {'password': self.password})
+        self.assertRaises(AssertionError, self._authenticate, new_password)
+        self._authenticate(self.password)
+
+    def test_verified_password_of_locked_out_user(self):
+        self._authenticate(self.password)
+        for _ in range(CONF.security_compliance.lockout_failure_attempts):
+            self.assertRaises(AssertionError, self._authenticate,
+                              uuid.uuid4().hex)
+        self.assertRaises(exception.AccountLocked, self._authenticate,
+                          self.password)
+
+
+class PasswordRehashTests(test_backend_sql.SqlTests):
+    def setUp(self):
+        super(PasswordRehashTests, self).setUp()
+        self.password = uuid.uuid4().hex
+        user_dict = {
+            'name': uuid.uuid4().hex,
+            'domain_id': CONF.identity.default_domain_id,
+            'enabled': True,
+            'password': self.password
+        }
+        self.user = self.identity_api.create_user(user_dict)
+        self.config_fixture.config(group='identity',
+                                   password_hash_algorithm='pbkdf2_sha512',
+                                   password_hash_rounds=1000)
+
+    def _authenticate(self, password):
+        self.identity_api.authenticate(self.make_request(),
+                                       user_id=self.user['id'],
+                                       password=password)
+        sql_identity._get_rehasher().join()
+
+    def _get_password_ref(self):
+        with sql.session_for_read() as session:
+            user_ref = session.query(model.User).get(self.user['id'])
+            return user_ref.password_ref
+
+    def test_password_rehashed_on_login(self):
+        self.config_fixture.config(group='identity',
+                                   password_rehash_on_login=True)
+        old_ref = self._get_password_ref()
+        self.assertTrue(password_hashing.needs_rehash(old_ref.password_hash))
+
+        self._authenticate(self.password)
+        new_ref = self._get_password_ref()
+        self.assertEqual(old_ref.id, new_ref.id)
+        self.assertEqual(old_ref.created_at, new_ref.created_at)
+        self.assertEqual(old_ref.expires_at, new_ref.expires_at)
+        self.assertTrue(new_ref.password_hash.startswith('$pbkdf2-sha512$'))
+        self.assertFalse(password_hashing.needs_rehash(new_ref.password_hash))
+
+        self._authenticate(self.password)
+        self.assertEqual(new_ref.password_hash,
+                         self._get_password_ref().password_hash)
+
+    def test_password_not_rehashed_when_disabled(self):
+        old_ref = self._get_password_ref()
+        self._authenticate(self.password)
+        self.assertEqual(old_ref.password_hash,
+                         self._get_password_ref().password_hash)
+
+    def test_password_not_rehashed_on_failed_login(self):
+        self.config_fixture.config(group='identity',
+                                   password_rehash_on_login=True)
+        old_ref = self._get_password_ref()
+        self.assertRaises(AssertionError, self._authenticate,
+                          uuid.uuid4().hex)
+        sql_identity._get_rehasher().join()
+        self.assertEqual(old_ref.password_hash,
+                         self._get_password_ref().password_hash)
+
+    def test_changed_password_not_rehashed(self):
+        old_ref = self._get_password_ref()
+        new_password = uuid.uuid4().hex
+        self.identity_api.update_user(self.user['id'],
+                                      {'password': new_password})
+        self.identity_api.driver._rehash_password(
+            self.user['id'], self.password, old_ref.password_hash)
+        self.assertRaises(AssertionError, self._authenticate, self.password)
+        self._authenticate(new_password)
+
+
 class PasswordExpiresValidationTests(test_backend_sql.SqlTests):
     def setUp(self):
         super(PasswordExpiresValidationTests, self).setUp()
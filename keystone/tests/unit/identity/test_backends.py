@@ -539,6 +539,31 @@ class IdentityTests(object):
         self.assertIn(group1['id'], group_ids)
         self.assertIn(group2['id'], group_ids)
 
+    def test_list_users_from_ids(self):
+        user = self.identity_api.create_user(
+            unit.new_user_ref(domain_id=CONF.identity.default_domain_id))
+        users = self.identity_api.list_users_from_ids(
+            [self.user_foo['id'], user['id'], uuid.uuid4().hex])
+        users = {ref['id']: ref for ref in users}
+        self.assertEqual(
+            {self.user_foo['id']: self.identity_api.get_user(
+                self.user_foo['id']),
+             user['id']: self.identity_api.get_user(user['id'])},
+            users)
+        self.assertEqual([], self.identity_api.list_users_from_ids([]))
+
+    def test_list_groups_from_ids(self):
+        group1 = self.identity_api.create_group(
+            unit.new_group_ref(domain_id=CONF.identity.default_domain_id))
+        group2 = self.identity_api.create_group(
+            unit.new_group_ref(domain_id=CONF.identity.default_domain_id))
+        groups = self.identity_api.list_groups_from_ids(
+            [group1['id'], group2['id'], uuid.uuid4().hex])
+        groups = {ref['id']: ref for ref in groups}
+        self.assertEqual({group1['id']: group1, group2['id']: group2},
+                         groups)
+        self.assertEqual([], self.identity_api.list_groups_from_ids([]))
+
     def test_create_user_doesnt_modify_passed_in_dict(self):
         new_user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
         original_user = new_user.copy()
@@ -1341,3 +1366,33 @@ class LimitTests(filtering.FilterTests):
 
     def test_list_projects_filtered_and_limited(self):
         self._test_list_entity_filtered_and_limited('project')
+
+    def _test_list_entity_paginated(self, entity):
+        self.config_fixture.config(list_limit=7)
+        all_ids = sorted(e['id'] for e in self._list_entities(entity)())
+
+        # Page through the entities, starting each page after the last
+        # entity of the previous one, until a page is not truncated.
+        ids = []
+        marker = None
+        while True:
+            hints = driver_hints.Hints()
+            hints.marker = marker
+            entities = self._list_entities(entity)(hints=hints)
+            self.assertLessEqual(len(entities), 7)
+            ids.extend(e['id'] for e in entities)
+            if not hints.limit['truncated']:
+                break
+            marker = entities[-1]['id']
+
+        # Every entity is seen exactly once, in order of ID.
+        self.assertEqual(all_ids, ids)
+
+    def test_list_users_paginated(self):
+        self._test_list_entity_paginated('user')
+
+    def test_list_groups_paginated(self):
+        self._test_list_entity_paginated('group')
+
+    def test_list_projects_paginated(self):
+        self._test_list_entity_paginated('project')
@@ -620,6 +620,27 @@ class ResourceTests(object):
         subtree = self.resource_api.list_projects_in_subtree(project3['id'])
         self.assertEqual(0, len(subtree))
 
+    def test_list_project_ids_in_subtrees(self):
+        project1, project2, project3 = self._create_projects_hierarchy(
+            hierarchy_size=3)
+        project4 = unit.new_project_ref(
+            domain_id=CONF.identity.default_domain_id,
+            parent_id=project2['id'])
+        self.resource_api.create_project(project4['id'], project4)
+        project5 = self._create_projects_hierarchy(hierarchy_size=1)[0]
+
+        subtree_ids = self.resource_api.list_project_ids_in_subtrees(
+            [project2['id'], project3['id'], project5['id']])
+        self.assertItemsEqual([project3['id'], project4['id']], subtree_ids)
+
+        subtree_ids = self.resource_api.list_project_ids_in_subtrees(
+            [project1['id']])
+        self.assertItemsEqual(
+            [project2['id'], project3['id'], project4['id']], subtree_ids)
+
+        self.assertEqual(
+            [], self.resource_api.list_project_ids_in_subtrees([]))
+
     def test_get_projects_in_subtree_as_ids_with_large_tree(self):
         """Check project hierarchy is returned correctly in large tree.
 
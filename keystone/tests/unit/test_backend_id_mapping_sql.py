@@ -15,10 +15,12 @@
 
 import uuid
 
+import fixtures
 from testtools import matchers
 
 from keystone.common import sql
 from keystone.identity.mapping_backends import mapping
+from keystone.identity.mapping_backends import sql as mapping_sql_backend
 from keystone.tests import unit
 from keystone.tests.unit import identity_mapping as mapping_sql
 from keystone.tests.unit import test_backend_sql
@@ -336,3 +338,44 @@ class SqlIDMapping(test_backend_sql.SqlTests):
             domain_a_mappings = [m.to_dict() for m in domain_a_mappings]
         self.assertItemsEqual([local_entity1, local_entity2],
                               domain_a_mappings)
+
+    def test_create_and_get_id_mappings_in_bulk(self):
+        self.useFixture(fixtures.MockPatchObject(
+            mapping_sql_backend, 'LOOKUP_BATCH_SIZE', 2))
+        self.useFixture(fixtures.MockPatchObject(
+            mapping_sql_backend, 'INSERT_BATCH_SIZE', 2))
+        local_ids = [uuid.uuid4().hex for i in range(5)]
+        existing = {'domain_id': self.domainA['id'],
+                    'local_id': local_ids[0],
+                    'entity_type': mapping.EntityType.USER}
+        existing_public_id = self.id_mapping_api.create_id_mapping(existing)
+        # A mapping of another domain is not returned.
+        self.id_mapping_api.create_id_mapping(
+            {'domain_id': self.domainB['id'],
+             'local_id': local_ids[1],
+             'entity_type': mapping.EntityType.USER})
+
+        self.assertEqual(
+            {local_ids[0]: existing_public_id},
+            self.id_mapping_api.get_public_ids(
+                self.domainA['id'], mapping.EntityType.USER, local_ids))
+
+        # The existing mapping is kept, and a given public ID is used.
+        public_id = uuid.uuid4().hex
+        public_ids = self.id_mapping_api.create_id_mappings(
+            self.domainA['id'], mapping.EntityType.USER,
+            {local_ids[0]: None, local_ids[1]: public_id, local_ids[2]: None,
+             local_ids[3]: None, local_ids[4]: None})
+        self.assertEqual(existing_public_id, public_ids[local_ids[0]])
+        self.assertEqual(public_id, public_ids[local_ids[1]])
+        self.assertEqual(public_ids, self.id_mapping_api.get_public_ids(
+            self.domainA['id'], mapping.EntityType.USER, local_ids))
+        for local_id in local_ids:
+            local_entity = {'domain_id': self.domainA['id'],
+                            'local_id': local_id,
+                            'entity_type': mapping.EntityType.USER}
+            self.assertEqual(public_ids[local_id],
+                             self.id_mapping_api.get_public_id(local_entity))
+            local_id_ref = self.id_mapping_api.get_id_mapping(
+                public_ids[local_id])
+            self.assertEqual(local_id, local_id_ref['local_id'])
@@ -1625,6 +1625,41 @@ class LDAPIdentity(BaseLDAPIdentity, unit.TestCase):
             self.assertNotIn('dn', group_ref)
         self.assertEqual(set(expected_group_ids), group_ids)
 
+    def test_list_users_in_group_in_batches(self):
+        self.config_fixture.config(group='ldap', group_members_batch_size=2)
+        domain = self._get_domain_fixture()
+        group = unit.new_group_ref(domain_id=domain['id'])
+        group = self.identity_api.create_group(group)
+        expected_user_ids = []
+        for _ in range(5):
+            user = self.new_user_ref(domain_id=domain['id'])
+            user = self.identity_api.create_user(user)
+            expected_user_ids.append(user['id'])
+            self.identity_api.add_user_to_group(user['id'], group['id'])
+
+        # Add a member that is not in the directory, which is ignored.
+        group_api = self.identity_api.driver.group
+        group_ref = group_api.get(group['id'])
+        dangling_dn = self.identity_api.driver.user._id_to_dn_string(
+            uuid.uuid4().hex)
+        with group_api.get_connection() as conn:
+            conn.modify_s(group_ref['dn'], [
+                (ldap.MOD_ADD, group_api.member_attribute, dangling_dn)])
+
+        with mock.patch.object(
+                common_ldap.KeystoneLDAPHandler, 'search_s', autospec=True,
+                side_effect=common_ldap.KeystoneLDAPHandler.search_s) as m:
+            users = self.identity_api.list_users_in_group(group['id'])
+        self.assertItemsEqual(expected_user_ids,
+                              [user['id'] for user in users])
+        for user in users:
+            self.assertNotIn('dn', user)
+            self.assertNotIn('password', user)
+        # The six members are fetched with three searches.
+        user_searches = [call for call in m.call_args_list
+                         if call[0][3].startswith('(&(|')]
+        self.assertEqual(3, len(user_searches))
+
     def test_user_id_attribute_in_create(self):
         driver = self.identity_api._select_identity_driver(
             CONF.identity.default_domain_id)
@@ -1749,6 +1784,16 @@ class LDAPLimitTests(unit.TestCase, identity_tests.LimitTests):
         config_files.append(unit.dirs.tests_conf('backend_ldap.conf'))
         return config_files
 
+    def test_list_users_paginated(self):
+        self.skip_test_overrides(
+            'LDAP does not support pagination markers, the controller '
+            'pages through the users instead')
+
+    def test_list_groups_paginated(self):
+        self.skip_test_overrides(
+            'LDAP does not support pagination markers, the controller '
+            'pages through the groups instead')
+
 
 class LDAPIdentityEnabledEmulation(LDAPIdentity):
     def setUp(self):
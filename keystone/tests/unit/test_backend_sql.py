@@ -15,6 +15,7 @@
 import datetime
 import functools
 import uuid
+import weakref
 
 import freezegun
 import mock
@@ -25,6 +26,9 @@ import sqlalchemy
 from sqlalchemy import exc
 from testtools import matchers
 
+from keystone import assignment
+from keystone import catalog
+from keystone.catalog.backends import sql as catalog_sql
 from keystone.common import driver_hints
 from keystone.common import sql
 import keystone.conf
@@ -32,6 +36,7 @@ from keystone.credential.providers import fernet as credential_provider
 from keystone import exception
 from keystone.identity.backends import sql_model as identity_sql
 from keystone.resource.backends import base as resource
+from keystone.resource.backends import sql as resource_sql
 from keystone.tests import unit
 from keystone.tests.unit.assignment import test_backends as assignment_tests
 from keystone.tests.unit.catalog import test_backends as catalog_tests
@@ -183,6 +188,12 @@ class SqlModels(SqlTests):
                 ('extra', sql.JsonBlob, None))
         self.assertExpectedSchema('group', cols)
 
+    def test_project_hierarchy_model(self):
+        cols = (('ancestor_id', sql.String, 64),
+                ('descendant_id', sql.String, 64),
+                ('depth', sql.Integer, None))
+        self.assertExpectedSchema('project_hierarchy', cols)
+
     def test_project_model(self):
         cols = (('id', sql.String, 64),
                 ('name', sql.String, 64),
@@ -657,6 +668,93 @@ class SqlIdentity(SqlTests,
         _exercise_project_api(uuid.uuid4().hex)
         _exercise_project_api(resource.NULL_DOMAIN_ID)
 
+    def test_project_hierarchy_call_count(self):
+        """There should not be O(depth) queries."""
+        class CallCounter(object):
+            def __init__(self):
+                self.calls = 0
+
+            def query_counter(self, query):
+                self.calls += 1
+
+        def count_calls(func, project_id):
+            counter = CallCounter()
+            sqlalchemy.event.listen(sqlalchemy.orm.query.Query,
+                                    'before_compile', counter.query_counter)
+            try:
+                func(project_id)
+            finally:
+                sqlalchemy.event.remove(sqlalchemy.orm.query.Query,
+                                        'before_compile',
+                                        counter.query_counter)
+            return counter.calls
+
+        driver = self.resource_api.driver
+        short = self._create_projects_hierarchy(hierarchy_size=2)
+        deep = self._create_projects_hierarchy(hierarchy_size=4)
+        self.assertEqual(count_calls(driver.list_project_parents,
+                                     short[-1]['id']),
+                         count_calls(driver.list_project_parents,
+                                     deep[-1]['id']))
+        self.assertEqual(count_calls(driver.list_projects_in_subtree,
+                                     short[0]['id']),
+                         count_calls(driver.list_projects_in_subtree,
+                                     deep[0]['id']))
+
+    def test_update_project_parent_moves_subtree_in_hierarchy(self):
+        project1, project2, project3 = self._create_projects_hierarchy(
+            hierarchy_size=3)
+        project4 = self._create_projects_hierarchy(
+            hierarchy_size=1, parent_project_id=project1['id'])[0]
+
+        # NOTE: The manager does not allow parent_id to be updated, so use
+        # the driver directly to move project2 below project4.
+        project2['parent_id'] = project4['id']
+        self.resource_api.driver.update_project(project2['id'], project2)
+
+        driver = self.resource_api.driver
+        parents = driver.list_project_parents(project3['id'])
+        self.assertEqual(
+            [project2['id'], project4['id'], project1['id'],
+             CONF.identity.default_domain_id],
+            [p['id'] for p in parents])
+        self.assertItemsEqual(
+            [project2['id'], project3['id']],
+            [p['id'] for p in driver.list_projects_in_subtree(
+                project4['id'])])
+        self.assertItemsEqual(
+            [project2['id'], project3['id'], project4['id']],
+            [p['id'] for p in driver.list_projects_in_subtree(
+                project1['id'])])
+
+    def test_project_hierarchy_without_index(self):
+        project1, project2, project3 = self._create_projects_hierarchy(
+            hierarchy_size=3)
+        driver = self.resource_api.driver
+        parents = driver.list_project_parents(project3['id'])
+        subtree = driver.list_projects_in_subtree(project1['id'])
+
+        # Projects created by an earlier release are not in the index.
+        with sql.session_for_write() as session:
+            session.query(resource_sql.ProjectHierarchy).delete()
+
+        self.assertEqual(parents, driver.list_project_parents(project3['id']))
+        self.assertEqual(subtree,
+                         driver.list_projects_in_subtree(project1['id']))
+
+        # A project created below them is indexed with all its ancestors.
+        project4 = self._create_projects_hierarchy(
+            hierarchy_size=1, parent_project_id=project3['id'])[0]
+        with sql.session_for_read() as session:
+            ancestor_ids = [
+                row.ancestor_id for row in
+                session.query(resource_sql.ProjectHierarchy).filter_by(
+                    descendant_id=project4['id']).order_by('depth')]
+        self.assertEqual(
+            [project4['id'], project3['id'], project2['id'], project1['id'],
+             CONF.identity.default_domain_id],
+            ancestor_ids)
+
     def test_list_users_call_count(self):
         """There should not be O(N) queries."""
         # create 10 users. 10 is just a random number
@@ -980,6 +1078,96 @@ class SqlCatalog(SqlTests, catalog_tests.CatalogTests):
         srv_id_list = [catalog_ref[0]['id'], catalog_ref[1]['id']]
         self.assertItemsEqual([srv_1['id'], srv_2['id']], srv_id_list)
 
+    def test_v3_catalog_compiled_once_per_revision(self):
+        service = unit.new_service_ref()
+        self.catalog_api.create_service(service['id'], service)
+        endpoint = unit.new_endpoint_ref(service_id=service['id'],
+                                         region_id=None)
+        self.catalog_api.create_endpoint(endpoint['id'], endpoint)
+
+        with mock.patch.object(catalog_sql, 'CompiledCatalog',
+                               wraps=catalog_sql.CompiledCatalog) as compile:
+            self.catalog_api.driver.get_v3_catalog(
+                'user', self.tenant_bar['id'])
+            self.catalog_api.driver.get_v3_catalog(
+                'user', self.tenant_bar['id'])
+            self.assertEqual(1, compile.call_count)
+
+            # Changing the catalog compiles it again.
+            endpoint_2 = unit.new_endpoint_ref(service_id=service['id'],
+                                               region_id=None)
+            self.catalog_api.create_endpoint(endpoint_2['id'], endpoint_2)
+            catalog_ref = self.catalog_api.driver.get_v3_catalog(
+                'user', self.tenant_bar['id'])
+            self.assertEqual(2, compile.call_count)
+        self.assertItemsEqual([endpoint['id'], endpoint_2['id']],
+                              [e['id'] for e in catalog_ref[0]['endpoints']])
+
+    def test_v3_catalog_recompiled_when_another_process_changes_it(self):
+        service = unit.new_service_ref()
+        self.catalog_api.create_service(service['id'], service)
+        self.catalog_api.driver.get_v3_catalog('user', self.tenant_bar['id'])
+
+        # Another process adds an endpoint and invalidates the catalog.
+        endpoint = unit.new_endpoint_ref(service_id=service['id'],
+                                         region_id=None)
+        with sql.session_for_write() as session:
+            session.add(catalog_sql.Endpoint.from_dict(endpoint))
+        catalog.COMPUTED_CATALOG_REGION.invalidate()
+
+        catalog_ref = self.catalog_api.driver.get_v3_catalog(
+            'user', self.tenant_bar['id'])
+        self.assertEqual([endpoint['id']],
+                         [e['id'] for e in catalog_ref[0]['endpoints']])
+
+    def test_v3_catalog_formats_urls_for_each_user_and_project(self):
+        service = unit.new_service_ref()
+        self.catalog_api.create_service(service['id'], service)
+        urls = ['http://localhost/$(project_id)s/$(user_id)s',
+                'http://localhost:$(public_port)s/$(tenant_id)s',
+                'http://localhost/$(project_id)r']
+        for url in urls:
+            endpoint = unit.new_endpoint_ref(service_id=service['id'],
+                                             url=url, region_id=None)
+            self.catalog_api.create_endpoint(endpoint['id'], endpoint)
+
+        for user_id, project_id in [('u1', self.tenant_bar['id']),
+                                    ('u2', self.tenant_baz['id'])]:
+            catalog_ref = self.catalog_api.driver.get_v3_catalog(user_id,
+                                                                 project_id)
+            self.assertItemsEqual(
+                ['http://localhost/%s/%s' % (project_id, user_id),
+                 'http://localhost:%s/%s' % (CONF.eventlet_server.public_port,
+                                             project_id),
+                 'http://localhost/%r' % project_id],
+                [e['url'] for e in catalog_ref[0]['endpoints']])
+
+        # Without a project, URLs that need one are left out.
+        catalog_ref = self.catalog_api.driver.get_v3_catalog('u1', None)
+        self.assertEqual([], catalog_ref[0]['endpoints'])
+
+    def test_catalog_not_compiled_without_caching(self):
+        self.config_fixture.config(group='catalog', caching=False)
+        service = unit.new_service_ref()
+        self.catalog_api.create_service(service['id'], service)
+        endpoint = unit.new_endpoint_ref(
+            service_id=service['id'], region_id=None,
+            url='http://localhost/$(project_id)s')
+        self.catalog_api.create_endpoint(endpoint['id'], endpoint)
+
+        with mock.patch.object(catalog_sql, 'CompiledCatalog') as compile:
+            catalog_ref = self.catalog_api.driver.get_v3_catalog(
+                'user', self.tenant_bar['id'])
+            v2_catalog_ref = self.catalog_api.driver.get_catalog(
+                'user', self.tenant_bar['id'])
+        compile.assert_not_called()
+        url = 'http://localhost/%s' % self.tenant_bar['id']
+        self.assertEqual([url],
+                         [e['url'] for e in catalog_ref[0]['endpoints']])
+        interface_url = '%sURL' % endpoint['interface']
+        self.assertEqual(
+            url, v2_catalog_ref[None][service['type']][interface_url])
+
 
 class SqlPolicy(SqlTests, policy_tests.PolicyTests):
     pass
@@ -993,6 +1181,83 @@ class SqlImpliedRoles(SqlTests, assignment_tests.ImpliedRoleTests):
     pass
 
 
+class SqlAssignmentIndex(SqlTests,
+                         assignment_tests.AssignmentTests,
+                         assignment_tests.InheritanceTests,
+                         assignment_tests.ImpliedRoleTests):
+
+    def config_overrides(self):
+        super(SqlAssignmentIndex, self).config_overrides()
+        self.config_fixture.config(group='assignment', in_memory_index=True)
+
+    def _list_effective_role_ids(self, user_id, project_id):
+        refs = self.assignment_api.list_role_assignments(
+            user_id=user_id, project_id=project_id, effective=True)
+        return sorted(ref['role_id'] for ref in refs)
+
+    def test_index_loads_assignments_once(self):
+        group = unit.new_group_ref(domain_id=CONF.identity.default_domain_id)
+        group = self.identity_api.create_group(group)
+        self.identity_api.add_user_to_group(self.user_foo['id'], group['id'])
+        self.assignment_api.create_grant(
+            self.role_admin['id'], group_id=group['id'],
+            project_id=self.tenant_bar['id'])
+        expected = sorted(
+            self.assignment_api.get_roles_for_user_and_project(
+                self.user_foo['id'], self.tenant_bar['id']))
+
+        # Start from an empty index.
+        assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        driver = self.assignment_api.driver
+        list_role_assignments = mock.patch.object(
+            driver, 'list_role_assignments',
+            wraps=driver.list_role_assignments)
+        with list_role_assignments as mock_list:
+            self.assertEqual(expected, self._list_effective_role_ids(
+                self.user_foo['id'], self.tenant_bar['id']))
+            self.assertEqual(expected, self._list_effective_role_ids(
+                self.user_foo['id'], self.tenant_bar['id']))
+            # One query for the user and one for its groups.
+            self.assertEqual(2, mock_list.call_count)
+
+    def test_index_is_emptied_when_assignments_change(self):
+        user_id = self.user_foo['id']
+        project_id = self.tenant_bar['id']
+        roles = self._list_effective_role_ids(user_id, project_id)
+
+        self.assignment_api.create_grant(
+            self.role_admin['id'], user_id=user_id, project_id=project_id)
+        self.assertEqual(sorted(roles + [self.role_admin['id']]),
+                         self._list_effective_role_ids(user_id, project_id))
+
+        group = unit.new_group_ref(domain_id=CONF.identity.default_domain_id)
+        group = self.identity_api.create_group(group)
+        self.assignment_api.create_grant(
+            self.role_other['id'], group_id=group['id'],
+            project_id=project_id)
+        self.identity_api.add_user_to_group(user_id, group['id'])
+        self.assertIn(self.role_other['id'],
+                      self._list_effective_role_ids(user_id, project_id))
+
+        self.identity_api.remove_user_from_group(user_id, group['id'])
+        self.assertNotIn(self.role_other['id'],
+                         self._list_effective_role_ids(user_id, project_id))
+
+    def test_index_is_emptied_when_another_process_changes_it(self):
+        user_id = self.user_foo['id']
+        project_id = self.tenant_bar['id']
+        roles = self._list_effective_role_ids(user_id, project_id)
+
+        # Another process adds an assignment and invalidates the region.
+        self.assignment_api.driver.create_grant(
+            self.role_admin['id'], user_id=user_id, project_id=project_id)
+        self.assertEqual(roles,
+                         self._list_effective_role_ids(user_id, project_id))
+        assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self.assertEqual(sorted(roles + [self.role_admin['id']]),
+                         self._list_effective_role_ids(user_id, project_id))
+
+
 class SqlTokenCacheInvalidationWithUUID(SqlTests,
                                         token_tests.TokenCacheInvalidation):
     def setUp(self):
@@ -1082,6 +1347,111 @@ class SqlFilterTests(SqlTests, identity_tests.FilterTests):
         groups = self.identity_api.list_groups()
         self.assertGreater(len(groups), 0)
 
+    def _create_users(self, *names):
+        users = []
+        for name in names:
+            user = unit.new_user_ref(
+                domain_id=CONF.identity.default_domain_id, name=name)
+            users.append(self.identity_api.create_user(user))
+        return users
+
+    def _list_users_filtered(self, name, **kwargs):
+        hints = driver_hints.Hints()
+        hints.add_filter('name', name, **kwargs)
+        users = self.identity_api.driver.list_users(hints)
+        # Check the driver has satisfied the filter
+        self.assertEqual([], hints.filters)
+        return sorted(user['name'] for user in users)
+
+    def test_inexact_filter_wildcards(self):
+        self._create_users('a_b', 'axb', '50%', '500', 'a!b')
+        self.assertEqual(['a_b'], self._list_users_filtered(
+            'a_', comparator='contains', case_sensitive=False))
+        self.assertEqual(['50%'], self._list_users_filtered(
+            '%', comparator='endswith', case_sensitive=False))
+        self.assertEqual(['a!b'], self._list_users_filtered(
+            'a!', comparator='startswith', case_sensitive=False))
+
+    def test_case_sensitive_inexact_filters(self):
+        self._create_users('The Ministry', 'the ministry', 'x*y', 'x[y')
+        self.assertEqual(['The Ministry', 'the ministry'],
+                         self._list_users_filtered(
+                             'Ministry', comparator='contains',
+                             case_sensitive=False))
+        self.assertEqual(['The Ministry'], self._list_users_filtered(
+            'Ministry', comparator='contains', case_sensitive=True))
+        self.assertEqual(['the ministry'], self._list_users_filtered(
+            'the', comparator='startswith', case_sensitive=True))
+        self.assertEqual(['x*y'], self._list_users_filtered(
+            '*y', comparator='endswith', case_sensitive=True))
+        self.assertEqual(['x[y'], self._list_users_filtered(
+            'x[', comparator='startswith', case_sensitive=True))
+
+    def test_filter_extra_attributes(self):
+        # The name of a service and any other attribute that isn't a column
+        # are stored in `extra`.
+        services = {}
+        for name, hidden in [('Compute', True), ('compute', 'false'),
+                             ('identity', False), ('network', 'True')]:
+            service = unit.new_service_ref(name=name, hidden=hidden)
+            service = self.catalog_api.create_service(service['id'], service)
+            services[service['id']] = service
+
+        def list_services(name, value, **kwargs):
+            hints = driver_hints.Hints()
+            hints.add_filter(name, value, **kwargs)
+            refs = self.catalog_api.driver.list_services(hints)
+            # Check the driver has satisfied the filter
+            self.assertEqual([], hints.filters)
+            return sorted(ref['name'] for ref in refs
+                          if ref['id'] in services)
+
+        self.assertEqual(['compute'], list_services('name', 'compute'))
+        self.assertEqual(['Compute', 'compute'], list_services(
+            'name', 'COMP', comparator='startswith', case_sensitive=False))
+        self.assertEqual(['Compute'], list_services(
+            'name', 'Com', comparator='startswith', case_sensitive=True))
+        # Booleans match boolean strings, and strings only match themselves,
+        # as they would when filtering in the controller.
+        self.assertEqual(['Compute'], list_services('hidden', 'true'))
+        self.assertEqual(['Compute', 'network'],
+                         list_services('hidden', 'True'))
+        self.assertEqual(['identity'], list_services('hidden', '0'))
+        self.assertEqual(['compute', 'identity'],
+                         list_services('hidden', 'false'))
+        self.assertEqual(['network'], list_services(
+            'hidden', 'ru', comparator='contains', case_sensitive=False))
+
+    def test_filter_extra_attributes_without_json_functions(self):
+        service = unit.new_service_ref(name='compute')
+        self.catalog_api.create_service(service['id'], service)
+
+        # SQLite may be built without its JSON functions, in which case the
+        # filter is left to the controller.
+        probe = mock.patch.object(sql.core, '_SQLITE_JSON_PROBE',
+                                  'SELECT no_such_function()')
+        cache = mock.patch.object(sql.core, '_SQLITE_JSON',
+                                  weakref.WeakKeyDictionary())
+        with probe, cache:
+            for i in range(2):
+                hints = driver_hints.Hints()
+                hints.add_filter('name', 'compute')
+                refs = self.catalog_api.driver.list_services(hints)
+                self.assertEqual(1, len(hints.filters))
+                self.assertIn(service['id'], [ref['id'] for ref in refs])
+            self.assertEqual([False], list(sql.core._SQLITE_JSON.values()))
+
+    def test_list_in_batches(self):
+        self._create_users(*[uuid.uuid4().hex for i in range(7)])
+        refs = self.identity_api.driver.list_users(driver_hints.Hints())
+        expected_ids = sorted(ref['id'] for ref in refs)
+        self.assertGreater(len(expected_ids), 6)
+
+        # Read the users three at a time
+        with mock.patch.object(sql.core, 'LIST_BATCH_SIZE', 3):
+            refs = self.identity_api.driver.list_users(driver_hints.Hints())
+        self.assertEqual(expected_ids, [ref['id'] for ref in refs])
+
 
 class SqlLimitTests(SqlTests, identity_tests.LimitTests):
     def setUp(self):
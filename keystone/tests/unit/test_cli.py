@@ -62,6 +62,21 @@ class CliTestCase(unit.SQLDriverOverrides, unit.TestCase):
         self.load_backends()
         cli.TokenFlush.main()
 
+    def test_password_hash_report(self):
+        self.useFixture(database.Database())
+        self.load_backends()
+        self.load_fixtures(default_fixtures)
+        users = [user for user in default_fixtures.USERS if 'password' in user]
+
+        counts = cli.PasswordHashReport._count_password_hashes()
+        self.assertEqual({('bcrypt', 'rounds=4'): (len(users), False)},
+                         counts)
+
+        self.config_fixture.config(group='identity', password_hash_rounds=5)
+        counts = cli.PasswordHashReport._count_password_hashes()
+        self.assertEqual({('bcrypt', 'rounds=4'): (len(users), True)},
+                         counts)
+
 
 class CliNoConfigTestCase(unit.BaseTestCase):
 
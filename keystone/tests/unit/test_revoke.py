@@ -12,6 +12,7 @@
 
 
 import datetime
+import random
 import uuid
 
 import mock
@@ -22,6 +23,7 @@ from keystone.common import utils
 import keystone.conf
 from keystone import exception
 from keystone.models import revoke_model
+from keystone.revoke import core as revoke
 from keystone.revoke.backends import sql
 from keystone.tests import unit
 from keystone.tests.unit import ksfixtures
@@ -389,6 +391,49 @@ class RevokeTests(object):
         self._assertTokenRevoked(token)
         self.assertEqual(1, len(revocation_backend.list_events(token=token)))
 
+    def test_check_tokens(self):
+        tokens = []
+        for i in range(6):
+            token = _sample_blank_token()
+            token['user_id'] = uuid.uuid4().hex
+            token['project_id'] = uuid.uuid4().hex
+            token['audit_id'] = uuid.uuid4().hex
+            token['audit_chain_id'] = token['audit_id']
+            tokens.append(token)
+        self.revoke_api.revoke_by_user(user_id=tokens[1]['user_id'])
+        self.revoke_api.revoke(
+            revoke_model.RevokeEvent(project_id=tokens[3]['project_id']))
+        self.revoke_api.revoke_by_audit_id(audit_id=tokens[5]['audit_id'])
+        # Revoked for a user of one token and the project of another.
+        self.revoke_api.revoke_by_user_and_project(
+            user_id=tokens[0]['user_id'], project_id=tokens[2]['project_id'])
+
+        self.assertEqual([False, True, False, True, False, True],
+                         self.revoke_api.check_tokens(tokens))
+        for token, revoked in zip(tokens,
+                                  self.revoke_api.check_tokens(tokens)):
+            if revoked:
+                self._assertTokenRevoked(token)
+            else:
+                self._assertTokenNotRevoked(token)
+        self.assertEqual([], self.revoke_api.check_tokens([]))
+
+    def test_list_events_for_tokens(self):
+        revocation_backend = sql.Revoke()
+        tokens = []
+        for i in range(3):
+            token = _sample_blank_token()
+            token['user_id'] = uuid.uuid4().hex
+            token['audit_id'] = uuid.uuid4().hex
+            tokens.append(token)
+            self.revoke_api.revoke_by_user(user_id=token['user_id'])
+        self.revoke_api.revoke_by_user(user_id=uuid.uuid4().hex)
+
+        events = revocation_backend.list_events_for_tokens(tokens)
+        self.assertEqual(
+            set(token['user_id'] for token in tokens),
+            set(event.user_id for event in events))
+
     @mock.patch.object(timeutils, 'utcnow')
     def test_expired_events_are_removed(self, mock_utcnow):
         def _sample_token_values():
@@ -493,3 +538,326 @@ class FernetSqlRevokeTests(test_backend_sql.SqlTests, RevokeTests):
                 CONF.fernet_tokens.max_active_keys
             )
         )
+
+
+class UUIDSqlRevokeIndexTests(UUIDSqlRevokeTests):
+    def config_overrides(self):
+        super(UUIDSqlRevokeIndexTests, self).config_overrides()
+        self.config_fixture.config(group='revoke', in_memory_index=True)
+
+    def test_check_token_does_not_query_matching_events(self):
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        self.revoke_api.revoke_by_user(user_id=token['user_id'])
+        with mock.patch.object(self.revoke_api.driver, 'list_events',
+                               wraps=self.revoke_api.driver.list_events) as m:
+            self._assertTokenRevoked(token)
+            for call in m.call_args_list:
+                self.assertIsNone(call[1].get('token'))
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_refresh_interval(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', index_refresh_interval=60)
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        self._assertTokenNotRevoked(token)
+
+        # An event recorded by another node is not seen until the interval
+        # has elapsed.
+        sql.Revoke().revoke(revoke_model.RevokeEvent(user_id=token['user_id']))
+        self._assertTokenNotRevoked(token)
+        mock_utcnow.return_value = now + datetime.timedelta(seconds=61)
+        self._assertTokenRevoked(token)
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_local_revocation_ignores_refresh_interval(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', index_refresh_interval=60)
+        mock_utcnow.return_value = datetime.datetime.utcnow()
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        self._assertTokenNotRevoked(token)
+        self.revoke_api.revoke_by_user(user_id=token['user_id'])
+        self._assertTokenRevoked(token)
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_index_is_reloaded_after_reload_interval(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', index_reload_interval=300)
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        self.revoke_api.revoke_by_user(user_id=uuid.uuid4().hex)
+        last_fetch = (self.revoke_api.list_events()[-1].revoked_at -
+                      revoke.INDEX_REFRESH_OVERLAP)
+        with mock.patch.object(self.revoke_api.driver, 'list_events',
+                               wraps=self.revoke_api.driver.list_events) as m:
+            self.revoke_api.list_events()
+            mock_utcnow.return_value = now + datetime.timedelta(seconds=301)
+            self.assertEqual(1, len(self.revoke_api.list_events()))
+            self.revoke_api.list_events()
+        self.assertEqual([mock.call(last_fetch=last_fetch), mock.call(),
+                          mock.call(last_fetch=last_fetch)],
+                         m.call_args_list)
+
+    def test_events_are_fetched_without_holding_the_index_lock(self):
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        self._assertTokenNotRevoked(token)
+        list_events = self.revoke_api.driver.list_events
+
+        def fetch(**kwargs):
+            self.assertFalse(self.revoke_api._index_lock.locked())
+            return list_events(**kwargs)
+
+        with mock.patch.object(self.revoke_api.driver, 'list_events',
+                               side_effect=fetch) as m:
+            self._assertTokenNotRevoked(token)
+            self.assertEqual([False], self.revoke_api.check_tokens([token]))
+        self.assertEqual(2, m.call_count)
+
+    def _sample_token_with_audit_id(self):
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        token['audit_id'] = uuid.uuid4().hex
+        token['audit_chain_id'] = token['audit_id']
+        return token
+
+    def test_unrevoked_token_is_not_looked_up_again(self):
+        token = self._sample_token_with_audit_id()
+        self._assertTokenNotRevoked(token)
+        with mock.patch.object(revoke_model.RevokeIndex,
+                               'is_revoked') as is_revoked:
+            self._assertTokenNotRevoked(token)
+            self.assertEqual([False], self.revoke_api.check_tokens([token]))
+        self.assertFalse(is_revoked.called)
+
+    def test_unrevoked_token_does_not_query_backend_within_interval(self):
+        self.config_fixture.config(group='revoke', index_refresh_interval=60)
+        token = self._sample_token_with_audit_id()
+        self._assertTokenNotRevoked(token)
+        with mock.patch.object(self.revoke_api.driver,
+                               'list_events') as list_events:
+            self._assertTokenNotRevoked(token)
+        self.assertFalse(list_events.called)
+
+    def test_unrevoked_token_is_checked_after_revocation(self):
+        token = self._sample_token_with_audit_id()
+        self._assertTokenNotRevoked(token)
+        self.revoke_api.revoke_by_user(user_id=token['user_id'])
+        self._assertTokenRevoked(token)
+
+    def test_unrevoked_token_is_checked_after_event_from_other_node(self):
+        token = self._sample_token_with_audit_id()
+        self._assertTokenNotRevoked(token)
+        sql.Revoke().revoke(revoke_model.RevokeEvent(user_id=token['user_id']))
+        self._assertTokenRevoked(token)
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_event_stamped_before_latest_is_reloaded(self, mock_utcnow):
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        mock_utcnow.return_value = now
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        token['issued_at'] = now - datetime.timedelta(minutes=5)
+        self.revoke_api.revoke_by_user(user_id=uuid.uuid4().hex)
+        self._assertTokenNotRevoked(token)
+
+        # Another node, whose clock lags by a minute, revokes the token. The
+        # event is stamped before the latest event in the index, beyond the
+        # overlap, so incremental refreshes miss it.
+        sql.Revoke().revoke(revoke_model.RevokeEvent(
+            user_id=token['user_id'],
+            revoked_at=now - datetime.timedelta(minutes=1)))
+        self._assertTokenNotRevoked(token)
+
+        # The next full reload of the index picks it up.
+        mock_utcnow.return_value = now + datetime.timedelta(
+            seconds=CONF.revoke.index_reload_interval)
+        self._assertTokenRevoked(token)
+
+    def test_list_events_fetches_events_after_latest_indexed(self):
+        self.revoke_api.revoke_by_user(user_id=uuid.uuid4().hex)
+        latest = self.revoke_api.list_events()[-1].revoked_at
+        with mock.patch.object(self.revoke_api.driver, 'list_events',
+                               wraps=self.revoke_api.driver.list_events) as m:
+            sql.Revoke().revoke(
+                revoke_model.RevokeEvent(user_id=uuid.uuid4().hex))
+            self.assertEqual(2, len(self.revoke_api.list_events()))
+            m.assert_called_once_with(
+                last_fetch=latest - revoke.INDEX_REFRESH_OVERLAP)
+
+
+class FernetSqlRevokeIndexTests(FernetSqlRevokeTests):
+    def config_overrides(self):
+        super(FernetSqlRevokeIndexTests, self).config_overrides()
+        self.config_fixture.config(group='revoke', in_memory_index=True)
+
+
+class RevokeIndexTests(unit.BaseTestCase):
+
+    def test_duplicate_events_are_ignored(self):
+        index = revoke_model.RevokeIndex()
+        event = revoke_model.RevokeEvent(user_id=uuid.uuid4().hex)
+        self.assertEqual(1, index.add_events([event]))
+        duplicate = revoke_model.RevokeEvent(**{
+            k: getattr(event, k) for k in revoke_model.REVOKE_KEYS})
+        self.assertEqual(0, index.add_events([duplicate]))
+        self.assertEqual(1, len(index))
+
+    def test_candidates_are_limited_to_token_values(self):
+        index = revoke_model.RevokeIndex()
+        token = _sample_blank_token()
+        token['user_id'] = uuid.uuid4().hex
+        token['project_id'] = uuid.uuid4().hex
+        matching = [
+            revoke_model.RevokeEvent(user_id=token['user_id']),
+            revoke_model.RevokeEvent(project_id=token['project_id'],
+                                     user_id=token['user_id']),
+        ]
+        index.add_events(matching)
+        for i in range(100):
+            index.add_event(
+                revoke_model.RevokeEvent(user_id=uuid.uuid4().hex))
+        candidates = list(index.candidates(token))
+        self.assertEqual(2, len(candidates))
+        for event in matching:
+            self.assertIn(event, candidates)
+        self.assertTrue(index.is_revoked(token))
+
+    def test_matches_brute_force(self):
+        index = revoke_model.RevokeIndex()
+        domain_id = uuid.uuid4().hex
+        events = [
+            revoke_model.RevokeEvent(domain_id=domain_id),
+            revoke_model.RevokeEvent(audit_chain_id=uuid.uuid4().hex),
+            revoke_model.RevokeEvent(role_id=uuid.uuid4().hex),
+            revoke_model.RevokeEvent(trust_id=uuid.uuid4().hex),
+        ]
+        index.add_events(events)
+        token = _sample_blank_token()
+        token['roles'] = []
+        self.assertFalse(index.is_revoked(token))
+        token['assignment_domain_id'] = domain_id
+        self.assertTrue(index.is_revoked(token))
+        token['assignment_domain_id'] = None
+        token['roles'] = [events[2].role_id]
+        self.assertTrue(index.is_revoked(token))
+
+    def test_prune(self):
+        index = revoke_model.RevokeIndex()
+        now = timeutils.utcnow().replace(microsecond=0)
+        old = revoke_model.RevokeEvent(
+            user_id=uuid.uuid4().hex,
+            revoked_at=now - datetime.timedelta(hours=2))
+        new = revoke_model.RevokeEvent(user_id=uuid.uuid4().hex,
+                                       revoked_at=now)
+        index.add_events([old, new])
+        self.assertEqual(1, index.prune(now - datetime.timedelta(hours=1)))
+        self.assertEqual(1, len(index))
+        token = _sample_blank_token()
+        token['issued_at'] = now - datetime.timedelta(hours=3)
+        token['user_id'] = old.user_id
+        self.assertFalse(index.is_revoked(token))
+        token['user_id'] = new.user_id
+        self.assertTrue(index.is_revoked(token))
+
+    def test_list_events(self):
+        index = revoke_model.RevokeIndex()
+        now = timeutils.utcnow().replace(microsecond=0)
+        events = [
+            revoke_model.RevokeEvent(user_id=uuid.uuid4().hex,
+                                     revoked_at=now - datetime.timedelta(
+                                         seconds=i))
+            for i in range(3)]
+        index.add_events(events)
+        self.assertEqual(now, index.last_revoked_at)
+        self.assertEqual(events[::-1], index.list_events())
+        self.assertEqual([events[0]], index.list_events(
+            now - datetime.timedelta(seconds=1)))
+
+        # The latest event is remembered after it is pruned.
+        index.prune(now + datetime.timedelta(seconds=1))
+        self.assertEqual([], index.list_events())
+        self.assertEqual(now, index.last_revoked_at)
+
+
+class RevokeMatcherTests(unit.BaseTestCase):
+
+    def _random_events_and_tokens(self, rand, event_count, token_count):
+        # Draw every value from small pools so that tokens and events share
+        # values often.
+        now = timeutils.utcnow().replace(microsecond=0)
+        times = [now - datetime.timedelta(minutes=i) for i in range(4)]
+        pools = {name: [uuid.uuid4().hex for i in range(3)]
+                 for name in revoke_model._MATCH_ATTRIBUTES}
+        pools['expires_at'] = times
+
+        # An event with both `domain_id` and `expires_at` gets a
+        # `domain_scope_id` instead of a `domain_id`.
+        names = [name for name in revoke_model._MATCH_ATTRIBUTES
+                 if name != 'domain_scope_id']
+        events = []
+        for i in range(event_count):
+            kwargs = {'issued_before': rand.choice(times)}
+            for name in rand.sample(names, rand.randint(1, 3)):
+                kwargs[name] = rand.choice(pools[name])
+            events.append(revoke_model.RevokeEvent(**kwargs))
+
+        tokens = []
+        for i in range(token_count):
+            token = revoke_model.blank_token_data(rand.choice(times))
+            for name in ('user_id', 'trustor_id', 'trustee_id'):
+                token[name] = rand.choice(pools['user_id'] + [None])
+            for name in ('identity_domain_id', 'assignment_domain_id'):
+                token[name] = rand.choice(pools['domain_id'] + [None])
+            for name in ('project_id', 'audit_id', 'audit_chain_id',
+                         'trust_id', 'consumer_id', 'expires_at'):
+                token[name] = rand.choice(pools[name] + [None])
+            token['roles'] = rand.sample(pools['role_id'],
+                                         rand.randint(0, 2))
+            tokens.append(token)
+        return events, tokens
+
+    def _brute_force(self, events, token):
+        return any(revoke_model._token_matches_event(e, token)
+                   for e in events)
+
+    def test_matches_brute_force(self):
+        rand = random.Random(0)
+        for i in range(20):
+            events, tokens = self._random_events_and_tokens(rand, 10, 50)
+            matcher = revoke_model.RevokeMatcher(events)
+            results = [matcher.is_revoked(token) for token in tokens]
+            self.assertEqual(
+                [self._brute_force(events, token) for token in tokens],
+                results)
+            # The values are drawn so that the two outcomes are both common.
+            self.assertIn(True, results)
+            self.assertIn(False, results)
+
+            for event in events[::2]:
+                matcher.remove_event(event)
+            remaining = events[1::2]
+            self.assertEqual(
+                [self._brute_force(remaining, token) for token in tokens],
+                [matcher.is_revoked(token) for token in tokens])
+
+    def test_matches_is_revoked_of_backend_events(self):
+        # The SQL backend filters the events of a token on `issued_before`,
+        # `user_id`, `project_id` and `audit_id` before `is_revoked` checks
+        # the rest with `matches`.
+        rand = random.Random(1)
+        for i in range(20):
+            events, tokens = self._random_events_and_tokens(rand, 10, 50)
+            matcher = revoke_model.RevokeMatcher(events)
+            for token in tokens:
+                backend_events = [
+                    e for e in events
+                    if e.issued_before >= token['issued_at'] and
+                    e.user_id in (None, token['user_id'], token['trustor_id'],
+                                  token['trustee_id']) and
+                    e.project_id in (None, token['project_id']) and
+                    e.audit_id in (None, token['audit_id'])]
+                self.assertEqual(
+                    revoke_model.is_revoked(backend_events, token),
+                    matcher.is_revoked(token))
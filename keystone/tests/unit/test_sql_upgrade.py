@@ -2356,6 +2356,108 @@ class FullMigration(SqlMigrateBase, unit.TestCase):
         self.assertTableColumns(user_option,
                                 ['user_id', 'option_id', 'option_value'])
 
+    def test_migration_024_add_project_hierarchy(self):
+        def create_project(parent_id, domain_id, is_domain=False):
+            table = sqlalchemy.Table('project', self.metadata, autoload=True)
+            project_id = uuid.uuid4().hex
+            project = {
+                'id': project_id,
+                'name': project_id,
+                'enabled': True,
+                'description': uuid.uuid4().hex,
+                'domain_id': domain_id,
+                'is_domain': is_domain,
+                'parent_id': parent_id,
+                'extra': '{}'
+            }
+            table.insert().values(project).execute()
+            return project_id
+
+        self.expand(23)
+        self.migrate(23)
+        self.contract(23)
+
+        project_hierarchy = 'project_hierarchy'
+        self.assertTableDoesNotExist(project_hierarchy)
+
+        domain_id = create_project(None, resource_base.NULL_DOMAIN_ID,
+                                   is_domain=True)
+        project_id = create_project(domain_id, domain_id)
+        child_id = create_project(project_id, domain_id)
+
+        self.expand(24)
+        self.migrate(24)
+        self.contract(24)
+        self.assertTableColumns(project_hierarchy,
+                                ['ancestor_id', 'descendant_id', 'depth'])
+
+        # test migrate indexed the existing projects
+        table = sqlalchemy.Table(project_hierarchy, self.metadata,
+                                 autoload=True)
+        rows = set((row.ancestor_id, row.descendant_id, row.depth)
+                   for row in table.select().execute()
+                   if row.descendant_id in (domain_id, project_id, child_id))
+        self.assertEqual(set([(domain_id, domain_id, 0),
+                              (project_id, project_id, 0),
+                              (domain_id, project_id, 1),
+                              (child_id, child_id, 0),
+                              (project_id, child_id, 1),
+                              (domain_id, child_id, 2)]),
+                         rows)
+
+    def test_migration_024_contract_indexes_projects_of_old_nodes(self):
+        def create_project(parent_id, domain_id, is_domain=False):
+            table = sqlalchemy.Table('project', self.metadata, autoload=True)
+            project_id = uuid.uuid4().hex
+            project = {
+                'id': project_id,
+                'name': project_id,
+                'enabled': True,
+                'description': uuid.uuid4().hex,
+                'domain_id': domain_id,
+                'is_domain': is_domain,
+                'parent_id': parent_id,
+                'extra': '{}'
+            }
+            table.insert().values(project).execute()
+            return project_id
+
+        self.expand(23)
+        self.migrate(23)
+        self.contract(23)
+
+        domain_id = create_project(None, resource_base.NULL_DOMAIN_ID,
+                                   is_domain=True)
+        project_id = create_project(domain_id, domain_id)
+
+        self.expand(24)
+        self.migrate(24)
+
+        # A node on the previous release creates projects below an indexed
+        # project, without adding them to the index.
+        child_id = create_project(project_id, domain_id)
+        grandchild_id = create_project(child_id, domain_id)
+        table = sqlalchemy.Table('project_hierarchy', self.metadata,
+                                 autoload=True)
+        self.assertEqual(0, len([
+            row for row in table.select().execute()
+            if row.descendant_id in (child_id, grandchild_id)]))
+
+        self.contract(24)
+
+        # test contract indexed them
+        rows = set((row.ancestor_id, row.descendant_id, row.depth)
+                   for row in table.select().execute()
+                   if row.descendant_id in (child_id, grandchild_id))
+        self.assertEqual(set([(child_id, child_id, 0),
+                              (project_id, child_id, 1),
+                              (domain_id, child_id, 2),
+                              (grandchild_id, grandchild_id, 0),
+                              (child_id, grandchild_id, 1),
+                              (project_id, grandchild_id, 2),
+                              (domain_id, grandchild_id, 3)]),
+                         rows)
+
 
 class MySQLOpportunisticFullMigration(FullMigration):
     FIXTURE = test_base.MySQLOpportunisticFixture
@@ -1728,6 +1728,19 @@ class TokenAPITests(object):
         self.head('/auth/tokens', headers=self.headers,
                   expected_status=http_client.OK)
 
+    def test_check_token_lightweight(self):
+        self.config_fixture.config(group='token', lightweight_check=True)
+        project_token = self._get_project_scoped_token()
+        headers = {'X-Subject-Token': project_token}
+        self.head('/auth/tokens', headers=self.headers,
+                  expected_status=http_client.OK)
+        self.head('/auth/tokens', headers=headers,
+                  expected_status=http_client.OK)
+
+        self.delete('/auth/tokens', headers=headers)
+        self.head('/auth/tokens', headers=headers,
+                  expected_status=http_client.NOT_FOUND)
+
     def test_validate_token(self):
         r = self.get('/auth/tokens', headers=self.headers)
         self.assertValidUnscopedTokenResponse(r)
@@ -1753,6 +1766,47 @@ class TokenAPITests(object):
             headers={'X-Subject-Token': v3_token})
         self.assertValidProjectScopedTokenResponse(r, require_catalog=False)
 
+    def test_validate_tokens(self):
+        project_token = self._get_project_scoped_token()
+        revoked_token = self._get_project_scoped_token()
+        self.delete('/auth/tokens', headers={'X-Subject-Token': revoked_token})
+        token_ids = [self.v3_token, project_token, revoked_token,
+                     uuid.uuid4().hex]
+
+        r = self.post('/auth/tokens/validate',
+                      body={'token_ids': token_ids},
+                      expected_status=http_client.OK)
+        tokens = r.result['tokens']
+        self.assertEqual(token_ids, [t['token_id'] for t in tokens])
+        self.assertEqual([True, True, False, False],
+                         [t['valid'] for t in tokens])
+        self.assertNotIn('token', tokens[2])
+
+        for token_id, result in zip(token_ids[:2], tokens[:2]):
+            r = self.get('/auth/tokens',
+                         headers={'X-Subject-Token': token_id})
+            self.assertEqual(r.result['token'], result['token'])
+        self.assertIn('catalog', tokens[1]['token'])
+
+    def test_validate_tokens_nocatalog(self):
+        project_token = self._get_project_scoped_token()
+        r = self.post('/auth/tokens/validate?nocatalog',
+                      body={'token_ids': [project_token]},
+                      expected_status=http_client.OK)
+        self.assertNotIn('catalog', r.result['tokens'][0]['token'])
+
+    def test_validate_tokens_limit(self):
+        self.config_fixture.config(group='token', max_bulk_validation=1)
+        self.post('/auth/tokens/validate',
+                  body={'token_ids': [self.v3_token, self.v3_token]},
+                  expected_status=http_client.BAD_REQUEST)
+
+    def test_validate_tokens_requires_token_ids(self):
+        self.post('/auth/tokens/validate', body={},
+                  expected_status=http_client.BAD_REQUEST)
+        self.post('/auth/tokens/validate', body={'token_ids': []},
+                  expected_status=http_client.BAD_REQUEST)
+
     def test_is_admin_token_by_ids(self):
         self.config_fixture.config(
             group='resource',
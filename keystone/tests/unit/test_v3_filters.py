@@ -821,6 +821,17 @@ class IdentityTestListLimitCase(IdentityTestFilteredCase):
         """
         self._test_entity_list_limit('policy', 'policy')
 
+    def test_list_streamed(self):
+        """Check a streamed list is rendered like one that isn't."""
+        self._set_policy({"identity:list_users": []})
+        r = self.get('/users', auth=self.auth)
+        self.assertIsNotNone(r.headers.get('Content-Length'))
+
+        self.config_fixture.config(stream_list_threshold=1)
+        streamed = self.get('/users', auth=self.auth)
+        self.assertIsNone(streamed.headers.get('Content-Length'))
+        self.assertEqual(r.result, streamed.result)
+
     def test_no_limit(self):
         """Check truncated attribute not set when list not limited."""
         self._set_policy({"identity:list_services": []})
@@ -839,3 +850,64 @@ class IdentityTestListLimitCase(IdentityTestFilteredCase):
         r = self.get('/services', auth=self.auth)
         self.assertEqual(10, len(r.result.get('services')))
         self.assertIsNone(r.result.get('truncated'))
+
+    def _test_entity_list_paginated(self, entity, driver):
+        """GET /<entities> (paginated), following the next links."""
+        if entity == 'policy':
+            plural = 'policies'
+        else:
+            plural = '%ss' % entity
+
+        self._set_policy({"identity:list_%s" % plural: []})
+        r = self.get('/%s' % plural, auth=self.auth)
+        all_ids = sorted(e['id'] for e in r.result.get(plural))
+
+        self.config_fixture.config(list_limit=5)
+        self.config_fixture.config(group=driver, list_limit=None)
+        ids = []
+        path = '/%s' % plural
+        while path:
+            r = self.get(path, auth=self.auth)
+            self.assertLessEqual(len(r.result.get(plural)), 5)
+            ids.extend(e['id'] for e in r.result.get(plural))
+            self.assertIsNone(r.result['links']['previous'])
+            path = r.result['links']['next']
+            if path:
+                self.assertIn('marker=%s' % ids[-1], path)
+                path = path.split('/v3', 1)[1]
+
+        self.assertEqual(all_ids, ids)
+
+    def test_users_list_paginated(self):
+        self._test_entity_list_paginated('user', 'identity')
+
+    def test_projects_list_paginated(self):
+        self._test_entity_list_paginated('project', 'resource')
+
+    def test_non_driver_list_paginated(self):
+        self._test_entity_list_paginated('policy', 'policy')
+
+    def test_list_limit_parameter(self):
+        """Check a smaller limit can be requested, but not a larger one."""
+        self._set_policy({"identity:list_services": []})
+        self.config_fixture.config(list_limit=5)
+        r = self.get('/services?limit=3', auth=self.auth)
+        self.assertEqual(3, len(r.result.get('services')))
+        self.assertIs(r.result.get('truncated'), True)
+        self.assertIn('limit=3', r.result['links']['next'])
+
+        r = self.get('/services?limit=8', auth=self.auth)
+        self.assertEqual(5, len(r.result.get('services')))
+
+        for limit in ['0', '-1', 'ten']:
+            self.get('/services?limit=%s' % limit, auth=self.auth,
+                     expected_status=http_client.BAD_REQUEST)
+
+    def test_list_marker_parameter(self):
+        """Check only entities after the marker are listed."""
+        self._set_policy({"identity:list_services": []})
+        r = self.get('/services', auth=self.auth)
+        ids = sorted(s['id'] for s in r.result.get('services'))
+        r = self.get('/services?marker=%s' % ids[3], auth=self.auth)
+        self.assertEqual(ids[4:],
+                         [s['id'] for s in r.result.get('services')])
@@ -184,6 +184,33 @@ class ApplicationTest(BaseWSGITest):
         self.assertNotEqual('0', resp.headers.get('Content-Length'))
         self.assertEqual('application/json', resp.headers.get('Content-Type'))
 
+    def test_render_response_streamed(self):
+        refs = [{'id': uuid.uuid4().hex, 'name': u'\u00e9l\u00e8ve'}
+                for i in range(2000)]
+        expected = jsonutils.dump_as_bytes(
+            {'refs': [dict(ref, seen=True) for ref in refs], 'count': 2000})
+
+        def transform(ref):
+            ref['seen'] = True
+
+        resp = wsgi.render_response(
+            body={'refs': wsgi.StreamedList(refs, transform), 'count': 2000})
+        self.assertEqual(http_client.OK, resp.status_int)
+        self.assertIsNone(resp.headers.get('Content-Length'))
+        self.assertEqual('application/json', resp.headers.get('Content-Type'))
+        chunks = list(resp.app_iter)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(expected, b''.join(chunks))
+
+    def test_render_response_head_streamed(self):
+        resp = wsgi.render_response(
+            {'refs': wsgi.StreamedList([{'id': uuid.uuid4().hex}])},
+            method='HEAD')
+        self.assertEqual(http_client.OK, resp.status_int)
+        self.assertEqual(b'', resp.body)
+        self.assertIsNone(resp.headers.get('Content-Length'))
+        self.assertEqual('application/json', resp.headers.get('Content-Type'))
+
     def test_application_local_config(self):
         class FakeApp(wsgi.Application):
             def __init__(self, *args, **kwargs):
@@ -13,8 +13,10 @@
 import base64
 import datetime
 import hashlib
+import itertools
 import mock
 import os
+import struct
 import uuid
 
 from oslo_utils import timeutils
@@ -224,6 +226,120 @@ class TestValidate(unit.TestCase):
         self.assertRaises(exception.TokenNotFound,
                           self.token_provider_api.validate_token, token_id)
 
+    def test_check_token(self):
+        self.config_fixture.config(group='token', lightweight_check=True)
+        domain_ref = unit.new_domain_ref()
+        domain_ref = self.resource_api.create_domain(domain_ref['id'],
+                                                     domain_ref)
+        user_ref = unit.new_user_ref(domain_ref['id'])
+        user_ref = self.identity_api.create_user(user_ref)
+        project_ref = unit.new_project_ref(domain_id=domain_ref['id'])
+        project_ref = self.resource_api.create_project(project_ref['id'],
+                                                       project_ref)
+        role_ref = unit.new_role_ref()
+        role_ref = self.role_api.create_role(role_ref['id'], role_ref)
+        self.assignment_api.create_grant(
+            role_ref['id'], user_id=user_ref['id'],
+            project_id=project_ref['id'])
+
+        token_id, token_data_ = self.token_provider_api.issue_token(
+            user_ref['id'], ['password'], project_id=project_ref['id'])
+        helper = self.token_provider_api.driver.v3_token_data_helper
+        with mock.patch.object(helper, 'get_token_data') as get_token_data:
+            token = self.token_provider_api.check_token(token_id)['token']
+            get_token_data.assert_not_called()
+
+        self.assertEqual(user_ref['id'], token['user']['id'])
+        self.assertEqual(domain_ref['id'], token['user']['domain']['id'])
+        self.assertEqual(project_ref['id'], token['project']['id'])
+        self.assertEqual(domain_ref['id'], token['project']['domain']['id'])
+        self.assertEqual(token_data_['token']['audit_ids'],
+                         token['audit_ids'])
+        self.assertNotIn('roles', token)
+        self.assertNotIn('catalog', token)
+
+        self.token_provider_api.revoke_token(token_id)
+        self.assertRaises(exception.TokenNotFound,
+                          self.token_provider_api.check_token, token_id)
+
+    def test_check_token_without_lightweight_check(self):
+        domain_ref = unit.new_domain_ref()
+        domain_ref = self.resource_api.create_domain(domain_ref['id'],
+                                                     domain_ref)
+        user_ref = unit.new_user_ref(domain_ref['id'])
+        user_ref = self.identity_api.create_user(user_ref)
+        token_id, token_data_ = self.token_provider_api.issue_token(
+            user_ref['id'], ['password'])
+
+        self.assertEqual(self.token_provider_api.validate_token(token_id),
+                         self.token_provider_api.check_token(token_id))
+
+    def test_check_token_invalid_token(self):
+        self.config_fixture.config(group='token', lightweight_check=True)
+        self.assertRaises(exception.TokenNotFound,
+                          self.token_provider_api.check_token,
+                          uuid.uuid4().hex)
+
+    def test_validate_tokens(self):
+        domain_ref = unit.new_domain_ref()
+        domain_ref = self.resource_api.create_domain(domain_ref['id'],
+                                                     domain_ref)
+        user_ref = unit.new_user_ref(domain_ref['id'])
+        user_ref = self.identity_api.create_user(user_ref)
+
+        token_ids = [
+            self.token_provider_api.issue_token(
+                user_ref['id'], ['password'])[0] for i in range(3)]
+        revoked_id = self.token_provider_api.issue_token(
+            user_ref['id'], ['password'])[0]
+        self.token_provider_api.revoke_token(revoked_id)
+        invalid_id = uuid.uuid4().hex
+
+        results = self.token_provider_api.validate_tokens(
+            token_ids + [revoked_id, invalid_id, token_ids[0]])
+        self.assertEqual(set(token_ids + [revoked_id, invalid_id]),
+                         set(results))
+        self.assertIsNone(results[revoked_id])
+        self.assertIsNone(results[invalid_id])
+        for token_id in token_ids:
+            self.assertEqual(
+                self.token_provider_api.validate_token(token_id),
+                results[token_id])
+
+    def test_validate_tokens_builds_shared_token_data_once(self):
+        domain_ref = unit.new_domain_ref()
+        domain_ref = self.resource_api.create_domain(domain_ref['id'],
+                                                     domain_ref)
+        user_ref = unit.new_user_ref(domain_ref['id'])
+        user_ref = self.identity_api.create_user(user_ref)
+        other_user_ref = unit.new_user_ref(domain_ref['id'])
+        other_user_ref = self.identity_api.create_user(other_user_ref)
+
+        token_ids = [
+            self.token_provider_api.issue_token(
+                user_ref['id'], ['password'])[0] for i in range(3)]
+        token_ids.append(self.token_provider_api.issue_token(
+            other_user_ref['id'], ['password'])[0])
+        for token_id in token_ids:
+            self.token_provider_api.invalidate_individual_token_cache(token_id)
+
+        helper = self.token_provider_api.driver.v3_token_data_helper
+        with mock.patch.object(helper, 'get_token_data',
+                               wraps=helper.get_token_data) as get_token_data:
+            results = self.token_provider_api.validate_tokens(token_ids)
+            self.assertEqual(2, get_token_data.call_count)
+
+        audit_ids = set()
+        for token_id in token_ids:
+            token = results[token_id]['token']
+            audit_ids.add(token['audit_ids'][0])
+            self.assertEqual(['password'], token['methods'])
+        self.assertEqual(len(token_ids), len(audit_ids))
+        self.assertEqual(user_ref['id'],
+                         results[token_ids[0]]['token']['user']['id'])
+        self.assertEqual(other_user_ref['id'],
+                         results[token_ids[3]]['token']['user']['id'])
+
 
 class TestTokenFormatter(unit.TestCase):
     def setUp(self):
@@ -255,6 +371,46 @@ class TestTokenFormatter(unit.TestCase):
             )
             self.assertEqual(encoded_string, encoded_str_with_padding_restored)
 
+    def test_creation_time(self):
+        token = token_formatters.TokenFormatter().create_token(
+            uuid.uuid4().hex, utils.isotime(timeutils.utcnow()),
+            [common.random_urlsafe_str()], methods=['password'])
+        token_bytes = base64.urlsafe_b64decode(
+            token_formatters.TokenFormatter.restore_padding(token))
+        timestamp = struct.unpack('>Q', token_bytes[1:9])[0]
+        self.assertEqual(
+            datetime.datetime.utcfromtimestamp(timestamp),
+            token_formatters.TokenFormatter.creation_time(token))
+
+    def test_validate_token_returns_expires_at_as_created(self):
+        formatter = token_formatters.TokenFormatter()
+        expires_at = utils.isotime(timeutils.utcnow(), subsecond=True)
+        token = formatter.create_token(
+            uuid.uuid4().hex, expires_at, [common.random_urlsafe_str()],
+            methods=['password'], project_id=uuid.uuid4().hex)
+        self.assertTimestampsEqual(expires_at,
+                                   formatter.validate_token(token)[-1])
+
+    def test_create_payload_class_is_first_that_applies(self):
+        names = ['project_id', 'domain_id', 'trust_id', 'federated_info',
+                 'access_token_id']
+        for values in itertools.product([None, uuid.uuid4().hex],
+                                        repeat=len(names)):
+            kwargs = dict(zip(names, values))
+            expected = [
+                payload_class
+                for payload_class in token_formatters.PAYLOAD_CLASSES
+                if payload_class.create_arguments_apply(**kwargs)][0]
+            self.assertIs(
+                expected,
+                token_formatters._get_create_payload_class(**kwargs))
+
+    def test_payload_classes_by_version(self):
+        for payload_class in token_formatters.PAYLOAD_CLASSES:
+            self.assertIs(payload_class,
+                          token_formatters.PAYLOAD_CLASSES_BY_VERSION[
+                              payload_class.version])
+
 
 class TestPayloads(unit.TestCase):
     def assertTimestampsEqual(self, expected, actual):
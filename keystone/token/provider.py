@@ -17,6 +17,7 @@
 import datetime
 import sys
 
+from dogpile.cache import api as dogpile_api
 from oslo_log import log
 from oslo_utils import timeutils
 import six
@@ -177,11 +178,121 @@ class Manager(manager.Manager):
             LOG.debug('Unable to validate token: %s', e)
             raise exception.TokenNotFound(token_id=token_id)
 
+    def check_token(self, token_id, window_seconds=0):
+        """Check that a token is valid.
+
+        With `[token] lightweight_check` enabled, the token's roles and
+        catalog are not rebuilt, so the token data returned is incomplete and
+        must only be used to tell whether the token is valid. Otherwise this
+        is the same as `validate_token`.
+
+        :raises keystone.exception.TokenNotFound: If the token is not valid.
+
+        """
+        if not CONF.token.lightweight_check:
+            return self.validate_token(token_id,
+                                       window_seconds=window_seconds)
+        if not token_id:
+            raise exception.TokenNotFound(_('No token in the request'))
+
+        try:
+            if self._needs_persistence:
+                token_id = self._persistence.get_token(token_id)
+            token_ref = self.driver.check_token(token_id)
+            self._is_valid_token(token_ref, window_seconds=window_seconds)
+            return token_ref
+        except (exception.Unauthorized, exception.NotFound) as e:
+            LOG.debug('Unable to validate token: %s', e)
+            raise exception.TokenNotFound(token_id=token_id)
+
+    def validate_tokens(self, token_ids, window_seconds=0):
+        """Validate several tokens at once.
+
+        Tokens that are already cached are taken from the cache. The others
+        are handed to the driver together, so that it can share the work of
+        rebuilding tokens that have the same user, scope and trust.
+
+        :param token_ids: the IDs of the tokens to validate
+        :param window_seconds: the number of seconds a token remains valid for
+                               after it expires
+        :returns: a dict mapping each distinct token ID to its token data, or
+                  to None if the token is not valid.
+
+        """
+        results = {}
+        token_refs = {}
+        for token_id in set(token_ids):
+            results[token_id] = None
+            if not token_id:
+                continue
+            if self._needs_persistence:
+                try:
+                    token_refs[token_id] = self._persistence.get_token(
+                        token_id)
+                except exception.TokenNotFound:
+                    continue
+            else:
+                token_refs[token_id] = token_id
+
+        uncached = {}
+        for token_id, token_ref in token_refs.items():
+            token_data = self._validate_token.get(self, token_ref)
+            if token_data is dogpile_api.NO_VALUE:
+                uncached[token_id] = token_ref
+            else:
+                results[token_id] = token_data
+
+        for token_id, token_data in self.driver.validate_tokens(
+                uncached).items():
+            if MEMOIZE_TOKENS.should_cache(token_data):
+                self._validate_token.set(token_data, self, uncached[token_id])
+            results[token_id] = token_data
+
+        # Look up the revocation events for all of the unexpired tokens at
+        # once, instead of once per token.
+        token_values = {}
+        for token_id, token_data in results.items():
+            if token_data is None:
+                continue
+            try:
+                self._check_expiry(token_data, window_seconds=window_seconds)
+                token_values[token_id] = self._get_revocation_values(
+                    token_data)
+            except exception.TokenNotFound as e:
+                LOG.debug('Unable to validate token: %s', e)
+                results[token_id] = None
+
+        token_ids = list(token_values)
+        revoked = self.revoke_api.check_tokens(
+            [token_values[token_id] for token_id in token_ids])
+        for token_id, is_revoked in zip(token_ids, revoked):
+            if is_revoked:
+                LOG.debug('Unable to validate token: %s', token_id)
+                results[token_id] = None
+        return results
+
+    def _get_revocation_values(self, token):
+        """Return the values of a token that revocation events match."""
+        try:
+            if self.get_token_version(token) == V2:
+                return self.revoke_api.model.build_token_values_v2(
+                    token['access'], CONF.identity.default_domain_id)
+            return self.revoke_api.model.build_token_values(token['token'])
+        except KeyError:
+            raise exception.TokenNotFound(_('Failed to validate token'))
+
     @MEMOIZE_TOKENS
     def _validate_token(self, token_id):
         return self.driver.validate_token(token_id)
 
     def _is_valid_token(self, token, window_seconds=0):
+        """Verify the token is valid format and has not expired."""
+        self._check_expiry(token, window_seconds=window_seconds)
+        self.check_revocation(token)
+        # Token has not expired and has not been revoked.
+        return None
+
+    def _check_expiry(self, token, window_seconds=0):
         """Verify the token is valid format and has not expired."""
         current_time = timeutils.normalize_time(timeutils.utcnow())
 
@@ -205,11 +316,7 @@ class Manager(manager.Manager):
                           'determining token expiry: %s', token)
             raise exception.TokenNotFound(_('Failed to validate token'))
 
-        if current_time < expiry:
-            self.check_revocation(token)
-            # Token has not expired and has not been revoked.
-            return None
-        else:
+        if current_time >= expiry:
             raise exception.TokenNotFound(_('Failed to validate token'))
 
     def issue_token(self, user_id, method_names, expires_at=None,
@@ -14,11 +14,15 @@
 
 import abc
 
+from oslo_log import log
 import six
 
 from keystone import exception
 
 
+LOG = log.getLogger(__name__)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class Provider(object):
     """Interface description for a Token provider."""
@@ -87,6 +91,39 @@ class Provider(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def check_token(self, token_ref):
+        """Return enough of a V3 token's data to check that it is valid.
+
+        Providers may override this to skip building the parts of the token,
+        such as its roles and catalog, that are not needed to check its
+        expiry and revocation. The default implementation builds the whole
+        token.
+
+        :param token_ref: the token reference
+        :type token_ref: dict
+        :returns: token data
+        """
+        return self.validate_token(token_ref)
+
+    def validate_tokens(self, token_refs):
+        """Validate several V3 tokens and return their token_data.
+
+        Providers may override this to share work between tokens. The default
+        implementation validates each token in turn.
+
+        :param token_refs: a dict mapping each token ID to its token reference
+        :type token_refs: dict
+        :returns: a dict mapping the ID of each token that could be validated
+                  to its token data. Tokens that are not valid are omitted.
+        """
+        token_data = {}
+        for token_id, token_ref in token_refs.items():
+            try:
+                token_data[token_id] = self.validate_token(token_ref)
+            except (exception.Unauthorized, exception.NotFound) as e:
+                LOG.debug('Unable to validate token: %s', e)
+        return token_data
+
     @abc.abstractmethod
     def _get_token_id(self, token_data):
         """Generate the token_id based upon the data in token_data.
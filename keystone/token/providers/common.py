@@ -596,41 +596,62 @@ class BaseProvider(base.Provider):
                         federation_constants.FEDERATION):
                     token_dict = {'user': token_ref['user']}
         else:
-            try:
-                (user_id, methods, audit_ids, domain_id, project_id, trust_id,
-                    federated_info, access_token_id, issued_at, expires_at) = (
-                        self.token_formatter.validate_token(token_id))
-            except exception.ValidationError as e:
-                raise exception.TokenNotFound(e)
+            return self._get_token_data_from_payload(
+                *self._unpack_token(token_id))
 
-            token_dict = None
-            trust_ref = None
-            if federated_info:
-                # NOTE(lbragstad): We need to rebuild information about the
-                # federated token as well as the federated token roles. This is
-                # because when we validate a non-persistent token, we don't
-                # have a token reference to pull the federated token
-                # information out of.  As a result, we have to extract it from
-                # the token itself and rebuild the federated context. These
-                # private methods currently live in the
-                # keystone.token.providers.fernet.Provider() class.
-                token_dict = self._rebuild_federated_info(
-                    federated_info, user_id
+        return self.v3_token_data_helper.get_token_data(
+            user_id,
+            method_names=methods,
+            domain_id=domain_id,
+            project_id=project_id,
+            issued_at=issued_at,
+            expires=expires_at,
+            trust=trust_ref,
+            token=token_dict,
+            bind=bind,
+            access_token=access_token,
+            audit_info=audit_ids)
+
+    def _unpack_token(self, token_id):
+        """Decrypt a non-persistent token and return its payload."""
+        try:
+            return self.token_formatter.validate_token(token_id)
+        except exception.ValidationError as e:
+            raise exception.TokenNotFound(e)
+
+    def _get_token_data_from_payload(self, user_id, methods, audit_ids,
+                                     domain_id, project_id, trust_id,
+                                     federated_info, access_token_id,
+                                     issued_at, expires_at):
+        """Build the token data for a decrypted non-persistent token."""
+        token_dict = None
+        trust_ref = None
+        if federated_info:
+            # NOTE(lbragstad): We need to rebuild information about the
+            # federated token as well as the federated token roles. This is
+            # because when we validate a non-persistent token, we don't
+            # have a token reference to pull the federated token
+            # information out of.  As a result, we have to extract it from
+            # the token itself and rebuild the federated context. These
+            # private methods currently live in the
+            # keystone.token.providers.fernet.Provider() class.
+            token_dict = self._rebuild_federated_info(
+                federated_info, user_id
+            )
+            if project_id or domain_id:
+                self._rebuild_federated_token_roles(
+                    token_dict,
+                    federated_info,
+                    user_id,
+                    project_id,
+                    domain_id
                 )
-                if project_id or domain_id:
-                    self._rebuild_federated_token_roles(
-                        token_dict,
-                        federated_info,
-                        user_id,
-                        project_id,
-                        domain_id
-                    )
-            if trust_id:
-                trust_ref = self.trust_api.get_trust(trust_id)
-
-            access_token = None
-            if access_token_id:
-                access_token = self.oauth_api.get_access_token(access_token_id)
+        if trust_id:
+            trust_ref = self.trust_api.get_trust(trust_id)
+
+        access_token = None
+        if access_token_id:
+            access_token = self.oauth_api.get_access_token(access_token_id)
 
         return self.v3_token_data_helper.get_token_data(
             user_id,
@@ -641,6 +662,98 @@ class BaseProvider(base.Provider):
             expires=expires_at,
             trust=trust_ref,
             token=token_dict,
-            bind=bind,
             access_token=access_token,
             audit_info=audit_ids)
+
+    def check_token(self, token_ref):
+        if self.needs_persistence():
+            return super(BaseProvider, self).check_token(token_ref)
+
+        payload = self._unpack_token(token_ref)
+        (user_id, methods, audit_ids, domain_id, project_id, trust_id,
+            federated_info, access_token_id, issued_at, expires_at) = payload
+        if federated_info:
+            # The user of a federated token is rebuilt from its payload.
+            return self._get_token_data_from_payload(*payload)
+
+        # Only build what `revoke_model.build_token_values` needs. Looking up
+        # the user, project, trust and access token also checks that they
+        # still exist.
+        token_data = {'methods': methods}
+        trust_ref = None
+        if trust_id:
+            trust_ref = self.trust_api.get_trust(trust_id)
+            if trust_ref['impersonation']:
+                user_id = trust_ref['trustor_user_id']
+            token_data['OS-TRUST:trust'] = {
+                'id': trust_ref['id'],
+                'trustor_user': {'id': trust_ref['trustor_user_id']},
+                'trustee_user': {'id': trust_ref['trustee_user_id']},
+                'impersonation': trust_ref['impersonation']}
+        user_ref = self.identity_api.get_user(user_id)
+        token_data['user'] = {'id': user_ref['id'],
+                              'domain': {'id': user_ref['domain_id']}}
+        if domain_id:
+            token_data['domain'] = {'id': domain_id}
+        if project_id:
+            project_ref = self.resource_api.get_project(project_id)
+            # Projects acting as a domain do not have a domain_id attribute
+            token_data['project'] = {
+                'id': project_ref['id'],
+                'domain': ({'id': project_ref['domain_id']}
+                           if project_ref['domain_id'] is not None else None)}
+        if access_token_id:
+            self.v3_token_data_helper._populate_oauth_section(
+                token_data, self.oauth_api.get_access_token(access_token_id))
+        self.v3_token_data_helper._populate_audit_info(token_data, audit_ids)
+        self.v3_token_data_helper._populate_token_dates(
+            token_data, expires=expires_at, issued_at=issued_at)
+        return {'token': token_data}
+
+    def validate_tokens(self, token_refs):
+        if self.needs_persistence():
+            return super(BaseProvider, self).validate_tokens(token_refs)
+
+        # Tokens for the same user, scope, trust and OAuth access token only
+        # differ by their methods, audit IDs and dates, so the rest of their
+        # token data (user, roles, catalog, ...) is built once per group.
+        # Federated tokens also depend on the groups they carry, so they are
+        # each built on their own.
+        groups = {}
+        for token_id in token_refs:
+            try:
+                payload = self._unpack_token(token_id)
+            except exception.TokenNotFound as e:
+                LOG.debug('Unable to validate token: %s', e)
+                continue
+            (user_id, methods, audit_ids, domain_id, project_id, trust_id,
+                federated_info, access_token_id, issued_at, expires_at) = (
+                    payload)
+            if federated_info:
+                key = token_id
+            else:
+                key = (user_id, domain_id, project_id, trust_id,
+                       access_token_id)
+            groups.setdefault(key, []).append((token_id, payload))
+
+        token_data = {}
+        for members in groups.values():
+            first_id, first_payload = members[0]
+            try:
+                first_data = self._get_token_data_from_payload(*first_payload)
+            except (exception.Unauthorized, exception.NotFound) as e:
+                LOG.debug('Unable to validate token: %s', e)
+                continue
+            token_data[first_id] = first_data
+
+            for token_id, payload in members[1:]:
+                (user_id, methods, audit_ids, domain_id, project_id, trust_id,
+                    federated_info, access_token_id, issued_at, expires_at) = (
+                        payload)
+                data = dict(first_data['token'], methods=methods)
+                self.v3_token_data_helper._populate_audit_info(
+                    data, audit_ids)
+                self.v3_token_data_helper._populate_token_dates(
+                    data, expires=expires_at, issued_at=issued_at)
+                token_data[token_id] = {'token': data}
+        return token_data
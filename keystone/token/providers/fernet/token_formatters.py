@@ -37,6 +37,9 @@ LOG = log.getLogger(__name__)
 # https://github.com/fernet/spec
 TIMESTAMP_START = 1
 TIMESTAMP_END = 9
+# The number of base64 characters that encode the bytes up to TIMESTAMP_END,
+# which need no padding.
+TIMESTAMP_ENCODED_END = 12
 
 
 class TokenFormatter(object):
@@ -60,13 +63,12 @@ class TokenFormatter(object):
             CONF.fernet_tokens.max_active_keys,
             'fernet_tokens'
         )
-        keys = fernet_utils.load_keys()
+        crypto, keys = fernet_utils.load_multi_fernet()
 
         if not keys:
             raise exception.KeysNotFound()
 
-        fernet_instances = [fernet.Fernet(key) for key in keys]
-        return fernet.MultiFernet(fernet_instances)
+        return crypto
 
     def pack(self, payload):
         """Pack a payload for transport as a token.
@@ -116,12 +118,11 @@ class TokenFormatter(object):
         :type fernet_token: six.text_type
 
         """
-        fernet_token = TokenFormatter.restore_padding(fernet_token)
-        # fernet_token is six.text_type
-
-        # Fernet tokens are base64 encoded, so we need to unpack them first
-        # urlsafe_b64decode() requires six.binary_type
-        token_bytes = base64.urlsafe_b64decode(fernet_token.encode('utf-8'))
+        # Fernet tokens are base64 encoded, so we need to unpack them first,
+        # but only as far as the timestamp. urlsafe_b64decode() requires
+        # six.binary_type
+        token_bytes = base64.urlsafe_b64decode(
+            fernet_token[:TIMESTAMP_ENCODED_END].encode('utf-8'))
 
         # slice into the byte array to get just the timestamp
         timestamp_bytes = token_bytes[TIMESTAMP_START:TIMESTAMP_END]
@@ -139,12 +140,9 @@ class TokenFormatter(object):
                      domain_id=None, project_id=None, trust_id=None,
                      federated_info=None, access_token_id=None):
         """Given a set of payload attributes, generate a Fernet token."""
-        for payload_class in PAYLOAD_CLASSES:
-            if payload_class.create_arguments_apply(
-                    project_id=project_id, domain_id=domain_id,
-                    trust_id=trust_id, federated_info=federated_info,
-                    access_token_id=access_token_id):
-                break
+        payload_class = _get_create_payload_class(
+            project_id=project_id, domain_id=domain_id, trust_id=trust_id,
+            federated_info=federated_info, access_token_id=access_token_id)
 
         version = payload_class.version
         payload = payload_class.assemble(
@@ -179,24 +177,22 @@ class TokenFormatter(object):
         versioned_payload = msgpack.unpackb(serialized_payload)
         version, payload = versioned_payload[0], versioned_payload[1:]
 
-        for payload_class in PAYLOAD_CLASSES:
-            if version == payload_class.version:
-                (user_id, methods, project_id, domain_id, expires_at,
-                 audit_ids, trust_id, federated_info, access_token_id) = (
-                    payload_class.disassemble(payload))
-                break
-        else:
+        payload_class = PAYLOAD_CLASSES_BY_VERSION.get(version)
+        if payload_class is None:
             # If the token_format is not recognized, raise ValidationError.
             raise exception.ValidationError(_(
                 'This is not a recognized Fernet payload version: %s') %
                 version)
+        # The expiration time is kept in the payload as a timestamp, which
+        # disassemble() formats the way it is returned.
+        (user_id, methods, project_id, domain_id, expires_at,
+         audit_ids, trust_id, federated_info, access_token_id) = (
+            payload_class.disassemble(payload))
 
         # rather than appearing in the payload, the creation time is encoded
         # into the token format itself
         issued_at = TokenFormatter.creation_time(token)
         issued_at = ks_utils.isotime(at=issued_at, subsecond=True)
-        expires_at = timeutils.parse_isotime(expires_at)
-        expires_at = ks_utils.isotime(at=expires_at, subsecond=True)
 
         return (user_id, methods, audit_ids, domain_id, project_id, trust_id,
                 federated_info, access_token_id, issued_at, expires_at)
@@ -699,3 +695,29 @@ PAYLOAD_CLASSES = [
     DomainScopedPayload,
     UnscopedPayload,
 ]
+
+PAYLOAD_CLASSES_BY_VERSION = dict(
+    (payload_class.version, payload_class)
+    for payload_class in PAYLOAD_CLASSES)
+
+# The payload class that applies to each combination of set and unset create
+# arguments, filled in as combinations are seen.
+_CREATE_PAYLOAD_CLASSES = {}
+
+
+def _get_create_payload_class(**kwargs):
+    """Return the first of PAYLOAD_CLASSES that applies to the arguments.
+
+    Whether a payload class applies only depends on which arguments are set,
+    so the result is looked up by that rather than asking every class.
+
+    """
+    key = tuple(bool(kwargs[name]) for name in sorted(kwargs))
+    try:
+        return _CREATE_PAYLOAD_CLASSES[key]
+    except KeyError:
+        for payload_class in PAYLOAD_CLASSES:
+            if payload_class.create_arguments_apply(**kwargs):
+                break
+        _CREATE_PAYLOAD_CLASSES[key] = payload_class
+        return payload_class
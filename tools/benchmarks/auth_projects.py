@@ -0,0 +1,86 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing the projects and domains a user can scope a token to.
+
+The users are members of several groups and have direct, group and inherited
+assignments on a tree of projects, as in `role_assignments.py`. Each
+operation lists the projects and the domains of a random user, as
+`GET /v3/auth/projects` and `GET /v3/auth/domains` do, first from the
+effective role assignments of the user, then from the IDs of the targets of
+the user, computed each time and then memoized once for every user.
+
+"""
+
+import random
+
+import base
+import role_assignments
+
+from keystone.assignment import core as assignment
+from keystone.server import backends
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=1000,
+                        help='Number of users.')
+    parser.add_argument('--projects', type=int, default=200,
+                        help='Number of projects.')
+    parser.add_argument('--groups', type=int, default=50,
+                        help='Number of groups.')
+    parser.add_argument('--groups-per-user', type=int, default=3,
+                        help='Number of groups each user is a member of.')
+    parser.add_argument('--assignments', type=int, default=5,
+                        help='Number of assignments of each user and group.')
+    parser.add_argument('--depth', type=int, default=4,
+                        help='Maximum depth of the project tree.')
+    parser.set_defaults(iterations=1000)
+    args = parser.parse_args()
+
+    # Only the assignment API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': True, 'backend': 'dogpile.cache.memory'})
+    drivers = backends.load_backends()
+    assignment_api = drivers['assignment_api']
+    user_ids, project_ids = role_assignments.create_data(
+        drivers, args.users, args.projects, args.groups,
+        args.groups_per_user, args.assignments, args.depth)
+
+    rand = random.Random(1)
+    users = [rand.choice(user_ids) for i in range(args.iterations)]
+
+    def effective(i):
+        assignment_api.list_projects_for_user(users[i])
+        assignment_api.list_domains_for_user(users[i])
+
+    def target_ids(i):
+        assignment_api.list_projects_for_actors(users[i])
+        assignment_api.list_domains_for_actors(users[i])
+
+    def target_ids_computed(i):
+        assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        target_ids(i)
+
+    name = '%d users, %d projects' % (args.users, args.projects)
+    base.timeit('effective assignments, %s' % name, effective,
+                args.iterations)
+    base.timeit('target IDs (computed), %s' % name, target_ids_computed,
+                args.iterations)
+    for i in range(args.iterations):
+        target_ids(i)
+    base.timeit('target IDs (memoized), %s' % name, target_ids,
+                args.iterations)
+
+
+if __name__ == '__main__':
+    main()
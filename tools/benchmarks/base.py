@@ -0,0 +1,149 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Helpers shared by the keystone benchmarks."""
+
+import argparse
+import contextlib
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+possible_topdir = os.path.normpath(os.path.join(os.path.abspath(__file__),
+                                                os.pardir,
+                                                os.pardir,
+                                                os.pardir))
+if os.path.exists(os.path.join(possible_topdir, 'keystone', '__init__.py')):
+    sys.path.insert(0, possible_topdir)
+
+from oslo_context import context as oslo_context  # noqa
+
+from keystone.common import fernet_utils  # noqa
+from keystone.common import sql  # noqa
+import keystone.conf  # noqa
+from keystone.server import backends  # noqa
+
+
+CONF = keystone.conf.CONF
+
+
+def parser(description):
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument('--connection', default='sqlite://',
+                   help='SQLAlchemy URL of the database to benchmark '
+                        'against. Defaults to an in-memory SQLite database.')
+    p.add_argument('--iterations', type=int, default=1000,
+                   help='Number of operations to time per scenario.')
+    return p
+
+
+def _load_models():
+    """Import every module that defines SQL models, so all tables exist."""
+    keystone_root = os.path.join(possible_topdir, 'keystone')
+    for root, dirs, files in os.walk(keystone_root):
+        if root.endswith('backends') and 'sql.py' in files:
+            package = os.path.relpath(root, possible_topdir)
+            importlib.import_module(
+                package.replace(os.sep, '.') + '.sql')
+
+
+def setup(connection='sqlite://', **overrides):
+    """Configure keystone and create its schema in `connection`.
+
+    :param overrides: a mapping of config group name to a dict of option
+                      overrides for that group.
+
+    """
+    keystone.conf.configure()
+    sql.initialize()
+    CONF([], project='keystone', default_config_files=[])
+    CONF.set_override('connection', connection, group='database')
+    for group, options in overrides.items():
+        for name, value in options.items():
+            CONF.set_override(name, value, group=group)
+    sql.cleanup()
+    _load_models()
+    with sql.session_for_write() as session:
+        sql.ModelBase.metadata.create_all(bind=session.get_bind())
+
+
+@contextlib.contextmanager
+def fernet_backends(connection='sqlite://', **overrides):
+    """Set up keystone with Fernet tokens and yield its loaded backends.
+
+    Caching is disabled unless `overrides` enable it. The key repository is
+    a temporary directory that is removed on exit.
+
+    """
+    key_repository = tempfile.mkdtemp()
+    try:
+        overrides.setdefault('cache', {}).setdefault('enabled', False)
+        overrides.setdefault('fernet_tokens', {})['key_repository'] = (
+            key_repository)
+        overrides.setdefault('token', {})['provider'] = 'fernet'
+        setup(connection, **overrides)
+        futils = fernet_utils.FernetUtils(key_repository, 3, 'fernet_tokens')
+        futils.create_key_directory()
+        futils.initialize_key_repository()
+        yield backends.load_backends()
+    finally:
+        shutil.rmtree(key_repository)
+
+
+def create_users(drivers, users, projects):
+    """Create users that each have a role on every one of the projects.
+
+    :returns: a tuple of the list of user IDs and the list of project IDs.
+
+    """
+    domain = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+    drivers['resource_api'].create_domain(domain['id'], domain)
+    role = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+    drivers['role_api'].create_role(role['id'], role)
+    user_ids = []
+    for i in range(users):
+        user = drivers['identity_api'].create_user(
+            {'name': uuid.uuid4().hex, 'domain_id': domain['id'],
+             'enabled': True})
+        user_ids.append(user['id'])
+    project_ids = []
+    for i in range(projects):
+        project = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex,
+                   'domain_id': domain['id'], 'parent_id': domain['id'],
+                   'is_domain': False, 'enabled': True}
+        drivers['resource_api'].create_project(project['id'], project)
+        project_ids.append(project['id'])
+        for user_id in user_ids:
+            drivers['assignment_api'].create_grant(
+                role['id'], user_id=user_id, project_id=project['id'])
+    return user_ids, project_ids
+
+
+def timeit(name, func, iterations):
+    """Call `func` `iterations` times and report the rate.
+
+    Each call runs in a new request context, as it would in a server, so that
+    nothing is served from the request-local cache of the previous call.
+
+    """
+    start = time.time()
+    for i in range(iterations):
+        oslo_context.RequestContext(overwrite=True)
+        func(i)
+    elapsed = time.time() - start
+    print('%-50s %8d ops %12.1f ops/s' % (
+        name, iterations, iterations / elapsed))
+    return elapsed
@@ -0,0 +1,66 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare validating Fernet tokens one at a time and in bulk.
+
+The single scenario calls `keystone.token.provider.Manager.validate_token`
+once per token, which is what a service does today by sending one
+`GET /v3/auth/tokens` per token. The bulk scenario validates the same tokens
+with one call to `validate_tokens`, which is what
+`POST /v3/auth/tokens/validate` does. Caching is disabled so that every
+validation rebuilds its token.
+
+"""
+
+import base
+
+from oslo_context import context as oslo_context
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--batch', type=int, default=100,
+                        help='Number of tokens validated per bulk call.')
+    parser.add_argument('--users', type=int, default=5,
+                        help='Number of distinct users the tokens belong to.')
+    args = parser.parse_args()
+
+    with base.fernet_backends(
+            args.connection,
+            token={'max_bulk_validation': args.batch}) as drivers:
+        token_api = drivers['token_provider_api']
+
+        user_ids, project_ids = base.create_users(drivers, args.users, 1)
+        token_ids = []
+        for i in range(args.batch):
+            token_id, token_data = token_api.issue_token(
+                user_ids[i % len(user_ids)], ['password'],
+                project_id=project_ids[0])
+            token_ids.append(token_id)
+
+        def single(i):
+            # One request per token.
+            for token_id in token_ids:
+                oslo_context.RequestContext(overwrite=True)
+                token_api.validate_token(token_id)
+
+        def bulk(i):
+            token_api.validate_tokens(token_ids)
+
+        base.timeit('validate_token x %d, %d users' % (
+            args.batch, args.users), single, args.iterations)
+        base.timeit('validate_tokens of %d, %d users' % (
+            args.batch, args.users), bulk, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
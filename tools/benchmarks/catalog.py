@@ -0,0 +1,106 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure building the service catalog for a new user and project.
+
+The SQL catalog driver is called directly, as it is when the computed
+catalog cache has no entry for the user and project, which is almost always
+the case when there are many projects. The uncached scenario turns
+`[catalog] caching` off, so the catalog revision cannot be tracked and each
+call builds the catalog straight from the database. The recompiled scenario
+compiles the catalog on every call, as happens right after each change to
+the catalog. The compiled scenario reuses the catalog compiled at the
+current catalog revision.
+
+"""
+
+import uuid
+
+import base
+
+import mock
+
+from keystone.catalog import core
+
+
+def create_catalog(catalog_api, services, regions, interfaces):
+    region_ids = []
+    for i in range(regions):
+        region = catalog_api.create_region({'id': 'region-%d' % i})
+        region_ids.append(region['id'])
+    for i in range(services):
+        service_id = uuid.uuid4().hex
+        service = catalog_api.create_service(
+            service_id, {'id': service_id, 'type': 'service-%d' % i,
+                         'name': 'service-%d' % i, 'enabled': True})
+        for region_id in region_ids:
+            for interface in ['public', 'internal', 'admin'][:interfaces]:
+                # Most services need the project ID in their URLs, the rest
+                # only use static substitutions.
+                url = 'http://%s.%s.example.com:$(public_port)s/v1' % (
+                    interface, region_id)
+                if i % 4:
+                    url += '/$(project_id)s'
+                endpoint_id = uuid.uuid4().hex
+                catalog_api.create_endpoint(
+                    endpoint_id,
+                    {'id': endpoint_id, 'service_id': service['id'],
+                     'region_id': region_id, 'interface': interface,
+                     'url': url, 'enabled': True})
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--services', type=int, default=200,
+                        help='Number of services.')
+    parser.add_argument('--regions', type=int, default=5,
+                        help='Number of regions.')
+    parser.add_argument('--interfaces', type=int, default=3, choices=[1, 2, 3],
+                        help='Number of interfaces per service and region.')
+    parser.set_defaults(iterations=100)
+    args = parser.parse_args()
+
+    with base.fernet_backends(
+            args.connection,
+            cache={'enabled': True,
+                   'backend': 'dogpile.cache.memory'}) as drivers:
+        catalog_api = drivers['catalog_api']
+        create_catalog(catalog_api, args.services, args.regions,
+                       args.interfaces)
+        driver = catalog_api.driver
+        user_ids, project_ids = base.create_users(drivers, 1,
+                                                  args.iterations)
+
+        def v2(i):
+            driver.get_catalog(user_ids[0], project_ids[i])
+
+        def v3(i):
+            driver.get_v3_catalog(user_ids[0], project_ids[i])
+
+        size = '%d endpoints' % (
+            args.services * args.regions * args.interfaces)
+        base.CONF.set_override('caching', False, group='catalog')
+        base.timeit('v2 catalog, uncached, %s' % size, v2, args.iterations)
+        base.timeit('v3 catalog, uncached, %s' % size, v3, args.iterations)
+        base.CONF.clear_override('caching', group='catalog')
+        with mock.patch.object(core.Manager, 'get_catalog_revision',
+                               side_effect=lambda: uuid.uuid4().hex):
+            base.timeit('v2 catalog, recompiled, %s' % size, v2,
+                        args.iterations)
+            base.timeit('v3 catalog, recompiled, %s' % size, v3,
+                        args.iterations)
+        base.timeit('v2 catalog, compiled, %s' % size, v2, args.iterations)
+        base.timeit('v3 catalog, compiled, %s' % size, v3, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure filtering the service catalog by endpoint filter associations.
+
+Every project is associated with `--project-endpoints` endpoints directly
+and with `--project-groups` of the `--groups` endpoint groups, each matching
+the endpoints of one service in one region. The scenarios list the endpoints
+of a project, which is what `GET /OS-EP-FILTER/projects/{project_id}/endpoints`
+does, and build the V3 catalog of a project with the SQL catalog driver, as
+it is when the computed catalog cache has no entry for the user and project.
+
+With `[catalog] caching` disabled, the endpoints associated with the project
+are found again for every call. With it enabled, they are cached per project.
+
+"""
+
+import itertools
+import uuid
+
+import base
+import catalog
+
+import keystone.conf
+
+
+CONF = keystone.conf.CONF
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--services', type=int, default=100,
+                        help='Number of services.')
+    parser.add_argument('--regions', type=int, default=4,
+                        help='Number of regions.')
+    parser.add_argument('--groups', type=int, default=100,
+                        help='Number of endpoint groups.')
+    parser.add_argument('--project-groups', type=int, default=10,
+                        help='Number of endpoint groups per project.')
+    parser.add_argument('--project-endpoints', type=int, default=20,
+                        help='Number of endpoints associated per project.')
+    parser.add_argument('--projects', type=int, default=10,
+                        help='Number of projects the calls cycle through.')
+    parser.set_defaults(iterations=100)
+    args = parser.parse_args()
+
+    with base.fernet_backends(
+            args.connection,
+            cache={'enabled': True,
+                   'backend': 'dogpile.cache.memory'}) as drivers:
+        catalog_api = drivers['catalog_api']
+        catalog.create_catalog(catalog_api, args.services, args.regions, 3)
+        endpoints = catalog_api.list_endpoints()
+        user_ids, project_ids = base.create_users(drivers, 1, args.projects)
+
+        # Each endpoint group matches the endpoints of a service in a region.
+        targets = sorted(set((e['service_id'], e['region_id'])
+                             for e in endpoints))
+        group_ids = []
+        for service_id, region_id in itertools.islice(
+                itertools.cycle(targets), args.groups):
+            group_id = uuid.uuid4().hex
+            catalog_api.create_endpoint_group(
+                group_id, {'id': group_id, 'name': group_id,
+                           'filters': {'service_id': service_id,
+                                       'region_id': region_id}})
+            group_ids.append(group_id)
+        for i, project_id in enumerate(project_ids):
+            for j in range(args.project_groups):
+                catalog_api.add_endpoint_group_to_project(
+                    group_ids[(i + j * args.projects) % len(group_ids)],
+                    project_id)
+            for j in range(args.project_endpoints):
+                catalog_api.add_endpoint_to_project(
+                    endpoints[(i + j * args.projects) % len(endpoints)]['id'],
+                    project_id)
+
+        def list_endpoints(i):
+            catalog_api.list_endpoints_for_project(
+                project_ids[i % len(project_ids)])
+
+        def v3(i):
+            catalog_api.driver.get_v3_catalog(
+                user_ids[0], project_ids[i % len(project_ids)])
+
+        size = '%d endpoints, %d groups' % (len(endpoints), len(group_ids))
+        for caching in [False, True]:
+            CONF.set_override('caching', caching, group='catalog')
+            name = 'cached' if caching else 'uncached'
+            base.timeit('project endpoints, %s, %s' % (name, size),
+                        list_endpoints, args.iterations)
+            base.timeit('v3 catalog, %s, %s' % (name, size), v3,
+                        args.iterations)
+        CONF.clear_override('caching', group='catalog')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing users with inexact and extra attribute filters.
+
+Each operation lists the users matching a filter with `[identity]
+list_limit` set, then applies the filters left in the hints and the limit
+as the controller does, like `GET /v3/users?name__icontains=...`. Filters
+the driver can't satisfy make it read every user, since it can't apply the
+limit either.
+
+"""
+
+import uuid
+
+import base
+
+from keystone.common import controller
+from keystone.common import driver_hints
+from keystone.server import backends
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=20000,
+                        help='Number of users.')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='Value of [identity] list_limit.')
+    parser.set_defaults(iterations=100)
+    args = parser.parse_args()
+
+    # Only the identity API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': False},
+               identity={'list_limit': args.limit})
+    identity_api = backends.load_backends()['identity_api']
+    for i in range(args.users):
+        user_id = uuid.uuid4().hex
+        identity_api.driver.create_user(
+            user_id, {'id': user_id, 'name': 'User-%s' % uuid.uuid4().hex,
+                      'domain_id': 'default', 'enabled': True,
+                      'email': '%s@example.com' % user_id})
+
+    def list_users(name, value, **kwargs):
+        def list_filtered(i):
+            hints = driver_hints.Hints()
+            hints.add_filter(name, value, **kwargs)
+            refs = identity_api.list_users(hints=hints)
+            refs = controller.V3Controller.filter_by_attributes(refs, hints)
+            controller.V3Controller.limit(refs, hints)
+        return list_filtered
+
+    suffix = '%d users' % args.users
+    base.timeit('name__icontains=user, %s' % suffix,
+                list_users('name', 'user', comparator='contains',
+                           case_sensitive=False), args.iterations)
+    base.timeit('name__contains=User, %s' % suffix,
+                list_users('name', 'User', comparator='contains',
+                           case_sensitive=True), args.iterations)
+    base.timeit('email__endswith=.com, %s' % suffix,
+                list_users('email', '.com', comparator='endswith',
+                           case_sensitive=True), args.iterations)
+    base.timeit('email=<one user>, %s' % suffix,
+                list_users('email', 'nobody@example.com'), args.iterations)
+
+
+if __name__ == '__main__':
+    main()
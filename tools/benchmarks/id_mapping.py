@@ -0,0 +1,111 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure mapping the IDs of a list of LDAP users to public IDs.
+
+An LDAP driver neither generates UUIDs nor knows about domains, so every
+user it lists is given a domain and a public ID from the ID mapping table
+before being returned, as `GET /v3/users` does. The domain has `--users`
+users, which already have a mapping. Each operation maps a list of users,
+first of the whole domain, then a page of `--page` users: once by reading
+every mapping of the domain, as keystone used to do, then by looking up only
+the users on the list. The last scenarios map `--new` users that have no
+mapping yet, creating mappings one by one and then all at once.
+
+"""
+
+import uuid
+
+import base
+
+from keystone.identity.mapping_backends import mapping
+from keystone.server import backends
+
+
+class LDAPDriver(object):
+    """Stand in for an LDAP identity driver, which only lists users here."""
+
+    def generates_uuids(self):
+        return False
+
+    def is_domain_aware(self):
+        return False
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=100000,
+                        help='Number of users of the domain.')
+    parser.add_argument('--page', type=int, default=1000,
+                        help='Number of users on a page.')
+    parser.add_argument('--new', type=int, default=5000,
+                        help='Number of users without a mapping.')
+    parser.set_defaults(iterations=3)
+    args = parser.parse_args()
+
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': False},
+               identity_mapping={'backward_compatible_ids': False})
+    drivers = backends.load_backends()
+    identity_api = drivers['identity_api']
+    id_mapping_api = drivers['id_mapping_api']
+    driver = LDAPDriver()
+    domain_id = 'default'
+    user = mapping.EntityType.USER
+
+    local_ids = [uuid.uuid4().hex for i in range(args.users)]
+    id_mapping_api.create_id_mappings(
+        domain_id, user, {local_id: None for local_id in local_ids})
+
+    def refs(ids):
+        return [{'id': local_id, 'name': local_id} for local_id in ids]
+
+    def scan(ref_list):
+        # How keystone used to map a list: read every mapping of the domain,
+        # then create the missing ones one by one.
+        refs_map = {}
+        for r in ref_list:
+            r['domain_id'] = domain_id
+            refs_map[r['id']] = r
+        for m in id_mapping_api.get_domain_mapping_list(domain_id):
+            ref = refs_map.pop(m.local_id, None)
+            if ref is not None and m.entity_type == user:
+                ref['id'] = m.public_id
+        for ref in refs_map.values():
+            ref['id'] = id_mapping_api.create_id_mapping(
+                {'domain_id': domain_id, 'local_id': ref['id'],
+                 'entity_type': user})
+
+    def bulk(ref_list):
+        identity_api._set_domain_id_and_mapping(ref_list, None, driver, user)
+
+    for name, ids in [('%d users' % args.users, local_ids),
+                      ('page of %d of %d users' % (args.page, args.users),
+                       local_ids[:args.page])]:
+        base.timeit('domain scan, %s' % name,
+                    lambda i: scan(refs(ids)), args.iterations)
+        base.timeit('bulk lookup, %s' % name,
+                    lambda i: bulk(refs(ids)), args.iterations)
+
+    name = '%d new users' % args.new
+    base.timeit('one by one, %s' % name,
+                lambda i: scan(refs(uuid.uuid4().hex
+                                    for j in range(args.new))),
+                args.iterations)
+    base.timeit('bulk insert, %s' % name,
+                lambda i: bulk(refs(uuid.uuid4().hex
+                                    for j in range(args.new))),
+                args.iterations)
+
+
+if __name__ == '__main__':
+    main()
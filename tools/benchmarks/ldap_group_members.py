@@ -0,0 +1,76 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing the users in a group of an LDAP identity backend.
+
+The directory is the in-memory LDAP stand-in of the unit tests, holding a
+group for each of the `--members` sizes, with that many users. Each
+operation lists the users in a group, as `GET /v3/groups/{group_id}/users`
+does, first fetching one member per LDAP search, as keystone used to do, then
+`--batch-size` members per search. The stand-in scans the whole directory on
+every search, so the number of searches dominates, as the round trips to a
+real LDAP server would.
+
+"""
+
+import uuid
+
+import base
+
+from keystone.identity.backends.ldap import common as common_ldap
+from keystone.server import backends
+from keystone.tests.unit import fakeldap
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--members', type=int, nargs='+',
+                        default=[100, 1000, 5000],
+                        help='Numbers of users in the groups.')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Number of members fetched with each search.')
+    parser.set_defaults(iterations=3)
+    args = parser.parse_args()
+
+    common_ldap.WRITABLE = True
+    common_ldap.register_handler('fake://', fakeldap.FakeLdap)
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': False}, identity={'driver': 'ldap'},
+               ldap={'url': 'fake://memory', 'user': 'cn=Admin',
+                     'password': 'password', 'suffix': 'cn=example,cn=com'})
+    drivers = backends.load_backends()
+    identity_api = drivers['identity_api']
+
+    group_ids = []
+    for members in args.members:
+        group = identity_api.create_group(
+            {'name': uuid.uuid4().hex, 'domain_id': 'default'})
+        for i in range(members):
+            user = identity_api.create_user(
+                {'name': uuid.uuid4().hex, 'domain_id': 'default',
+                 'enabled': True})
+            identity_api.add_user_to_group(user['id'], group['id'])
+        group_ids.append(group['id'])
+
+    for members, group_id in zip(args.members, group_ids):
+        for name, batch_size in [('one member per search', 1),
+                                 ('%d members per search' % args.batch_size,
+                                  args.batch_size)]:
+            base.CONF.set_override('group_members_batch_size', batch_size,
+                                   group='ldap')
+            base.timeit('%s, %d members' % (name, members),
+                        lambda i: identity_api.list_users_in_group(group_id),
+                        args.iterations)
+
+
+if __name__ == '__main__':
+    main()
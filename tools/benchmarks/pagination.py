@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing users page by page.
+
+`[identity] list_limit` is set to the page size. The first scenario lists the
+first page of users, as `GET /v3/users` does. The second lists the users
+page by page, each page starting after the last user of the previous one, as
+following the `next` links of `GET /v3/users` does. The last lists every
+user in one call, as keystone does internally.
+
+"""
+
+import uuid
+
+import base
+
+from keystone.common import driver_hints
+from keystone.server import backends
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=20000,
+                        help='Number of users.')
+    parser.add_argument('--page-size', type=int, default=500,
+                        help='Number of users in a page.')
+    parser.set_defaults(iterations=100)
+    args = parser.parse_args()
+
+    # Only the identity API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': False},
+               identity={'list_limit': args.page_size})
+    identity_api = backends.load_backends()['identity_api']
+    domain_id = 'default'
+    for i in range(args.users):
+        user_id = uuid.uuid4().hex
+        identity_api.driver.create_user(
+            user_id, {'id': user_id, 'name': uuid.uuid4().hex,
+                      'domain_id': domain_id, 'enabled': True})
+
+    def first_page(i):
+        identity_api.list_users(hints=driver_hints.Hints())
+
+    name = '%d users, %d per page' % (args.users, args.page_size)
+    base.timeit('first page, %s' % name, first_page, args.iterations)
+
+    marker = [None]
+
+    def next_page(i):
+        hints = driver_hints.Hints()
+        hints.marker = marker[0]
+        users = identity_api.list_users(hints=hints)
+        # Start again from the first page after the last one.
+        marker[0] = users[-1]['id'] if hints.limit['truncated'] else None
+
+    base.timeit('next page, %s' % name, next_page, args.iterations)
+
+    def whole_list(i):
+        identity_api.list_users()
+
+    base.timeit('whole list, %s' % name, whole_list,
+                max(1, args.iterations // 10))
+
+
+if __name__ == '__main__':
+    main()
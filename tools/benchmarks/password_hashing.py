@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure validating Fernet tokens during a burst of password logins.
+
+A thread validates a token over and over, as `GET /v3/auth/tokens` does,
+and the latency of each validation is recorded. The first scenario has
+nothing else running. In the others, `--logins` threads authenticate users
+with their password as fast as they can, as a burst of
+`POST /v3/auth/tokens` would, first hashing passwords in those threads, then
+in `--workers` worker processes. The median and 99th percentile latency of
+the validations are reported for each scenario, with the rate of logins.
+
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import base
+
+import keystone.conf
+from keystone.common import password_hashing
+
+
+CONF = keystone.conf.CONF
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--logins', type=int, default=8,
+                        help='Number of threads authenticating users.')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Number of password hashing worker processes.')
+    parser.add_argument('--algorithm',
+                        choices=['bcrypt', 'scrypt', 'pbkdf2_sha512'],
+                        help='Password hashing algorithm.')
+    parser.add_argument('--rounds', type=int,
+                        help='Password hashing rounds.')
+    parser.set_defaults(iterations=500, connection=None)
+    args = parser.parse_args()
+
+    # Each thread needs its own connection, which an in-memory SQLite
+    # database cannot have, so default to a temporary SQLite file.
+    directory = tempfile.mkdtemp()
+    try:
+        run(args, args.connection or 'sqlite:///%s' % os.path.join(
+            directory, 'keystone.db'))
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(args, connection):
+    identity = {}
+    if args.algorithm:
+        identity['password_hash_algorithm'] = args.algorithm
+    if args.rounds:
+        identity['password_hash_rounds'] = args.rounds
+    with base.fernet_backends(connection, identity=identity) as drivers:
+        token_api = drivers['token_provider_api']
+        identity_api = drivers['identity_api']
+        user_ids, project_ids = base.create_users(drivers, args.logins, 1)
+        password = uuid.uuid4().hex
+        for user_id in user_ids:
+            identity_api.driver.update_user(user_id, {'password': password})
+        token_id, token_data = token_api.issue_token(
+            user_ids[0], ['password'], project_id=project_ids[0])
+
+        def login(user_id, stop, logins):
+            while not stop.is_set():
+                identity_api.driver.authenticate(user_id, password)
+                logins.append(1)
+
+        def validations(name, logins=0):
+            stop = threading.Event()
+            done = []
+            threads = [threading.Thread(target=login,
+                                        args=(user_id, stop, done))
+                       for user_id in user_ids[:logins]]
+            for thread in threads:
+                thread.start()
+            latencies = []
+            start = time.time()
+            for i in range(args.iterations):
+                validation_start = time.time()
+                token_api.validate_token(token_id)
+                latencies.append(time.time() - validation_start)
+            elapsed = time.time() - start
+            stop.set()
+            for thread in threads:
+                thread.join()
+            latencies.sort()
+            print('%-50s %8.1f ms p50 %8.1f ms p99 %8.1f logins/s' % (
+                name, latencies[len(latencies) // 2] * 1000,
+                latencies[len(latencies) * 99 // 100] * 1000,
+                len(done) / elapsed))
+
+        validations('no logins')
+        validations('%d login threads, hashing inline' % args.logins,
+                    args.logins)
+        CONF.set_override('password_hash_workers', args.workers,
+                          group='identity')
+        validations('%d login threads, %d hashing workers' % (
+            args.logins, args.workers), args.logins)
+        stats = password_hashing.get_hashing_pool_stats()
+        print('%-50s %8.1f ms mean %8.1f ms max %8d throttled' % (
+            'hashing pool', stats['total_time'] / stats['completed'] * 1000,
+            stats['max_time'] * 1000, stats['throttled']))
+
+
+if __name__ == '__main__':
+    main()
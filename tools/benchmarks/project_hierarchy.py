@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare walking the project hierarchy with querying its index.
+
+For each tree shape, given as `DEPTHxCHILDREN`, a domain gets a tree of
+projects `DEPTH` levels deep in which every project has `CHILDREN` children.
+The scenarios list the parents of the leaf projects, which is what issuing
+a project scoped token does to find inherited role assignments, and the
+subtree of the top level project and of projects half way down.
+
+The walk scenarios query one level at a time, as the SQL resource driver did
+before the hierarchy index. The indexed scenarios call the driver, which
+queries the index.
+
+"""
+
+import uuid
+
+import base
+
+from keystone.common import sql
+from keystone.server import backends
+
+
+def create_tree(driver, depth, children):
+    """Create a tree of projects in a new domain.
+
+    :returns: the project IDs of each level of the tree, top level first.
+
+    """
+    domain_id = uuid.uuid4().hex
+    driver.create_project(domain_id, {
+        'id': domain_id, 'name': domain_id, 'domain_id': None,
+        'parent_id': None, 'is_domain': True, 'enabled': True})
+    levels = [[domain_id]]
+    for i in range(depth):
+        level = []
+        for parent_id in levels[-1][:1] if i == 0 else levels[-1]:
+            for j in range(1 if i == 0 else children):
+                project_id = uuid.uuid4().hex
+                driver.create_project(project_id, {
+                    'id': project_id, 'name': project_id,
+                    'domain_id': domain_id, 'parent_id': parent_id,
+                    'is_domain': False, 'enabled': True})
+                level.append(project_id)
+        levels.append(level)
+    return levels[1:]
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--shapes', nargs='+', default=['10x2', '4x20'],
+                        help='Tree shapes, as DEPTHxCHILDREN.')
+    args = parser.parse_args()
+
+    # Only the resource API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'})
+    driver = backends.load_backends()['resource_api'].driver
+
+    for shape in args.shapes:
+        depth, children = (int(x) for x in shape.split('x'))
+        levels = create_tree(driver, depth, children)
+        leaves = levels[-1]
+        middle = levels[len(levels) // 2]
+        size = '%d projects, %s' % (sum(len(level) for level in levels), shape)
+
+        def walk_parents(i):
+            with sql.session_for_read() as session:
+                driver._walk_project_parents(session, leaves[i % len(leaves)])
+
+        def parents(i):
+            driver.list_project_parents(leaves[i % len(leaves)])
+
+        def walk_subtree(project_ids):
+            def subtree(i):
+                with sql.session_for_read() as session:
+                    driver._walk_project_subtree(
+                        session, project_ids[i % len(project_ids)])
+            return subtree
+
+        def indexed_subtree(project_ids):
+            def subtree(i):
+                driver.list_projects_in_subtree(
+                    project_ids[i % len(project_ids)])
+            return subtree
+
+        base.timeit('leaf parents, walk, %s' % size, walk_parents,
+                    args.iterations)
+        base.timeit('leaf parents, indexed, %s' % size, parents,
+                    args.iterations)
+        base.timeit('middle subtree, walk, %s' % size,
+                    walk_subtree(middle), args.iterations)
+        base.timeit('middle subtree, indexed, %s' % size,
+                    indexed_subtree(middle), args.iterations)
+        base.timeit('top subtree, walk, %s' % size,
+                    walk_subtree(levels[0]), max(1, args.iterations // 10))
+        base.timeit('top subtree, indexed, %s' % size,
+                    indexed_subtree(levels[0]),
+                    max(1, args.iterations // 10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the request local cache during token issue requests.
+
+Each iteration issues a project-scoped Fernet token in a new request
+context, with caching enabled on an in-memory backend and a catalog of
+`--services` services with three endpoints each. The serialized
+scenario stores every value in the request local cache with msgpack, which
+is what `keystone.common.cache._context_cache._ResponseCacheProxy` did for
+all values before immutable ones were stored as they are. The next scenario
+keeps immutable values as they are but still copies the others with
+msgpack; the last one copies those made of builtin types with marshal. For
+each scenario the script reports the rate, the number of msgpack and marshal
+calls and the bytes they produced per request, and the peak memory traced
+during a request.
+
+"""
+
+import marshal
+import tracemalloc
+
+import base
+import catalog
+
+import mock
+from oslo_context import context as oslo_context
+from oslo_serialization import msgpackutils
+
+from keystone.common.cache import _context_cache
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.dumps = 0
+        self.loads = 0
+        self.bytes = 0
+
+    def patch(self):
+        dumps = msgpackutils.dumps
+        loads = msgpackutils.loads
+
+        def counted_dumps(*args, **kwargs):
+            data = dumps(*args, **kwargs)
+            self.dumps += 1
+            self.bytes += len(data)
+            return data
+
+        def counted_loads(*args, **kwargs):
+            self.loads += 1
+            return loads(*args, **kwargs)
+
+        return mock.patch.multiple(_context_cache.msgpackutils,
+                                   dumps=counted_dumps, loads=counted_loads)
+
+    def patch_marshal(self):
+        counter = self
+
+        class CountedMarshal(object):
+
+            @staticmethod
+            def dumps(*args, **kwargs):
+                data = marshal.dumps(*args, **kwargs)
+                counter.dumps += 1
+                counter.bytes += len(data)
+                return data
+
+            @staticmethod
+            def loads(*args, **kwargs):
+                counter.loads += 1
+                return marshal.loads(*args, **kwargs)
+
+        return mock.patch.object(_context_cache, 'marshal', CountedMarshal)
+
+
+def run(name, issue, iterations):
+    base.timeit(name, issue, iterations)
+
+    counter = Counter()
+    with counter.patch(), counter.patch_marshal():
+        for i in range(iterations):
+            oslo_context.RequestContext(overwrite=True)
+            issue(i)
+    peak = 0
+    for i in range(min(iterations, 50)):
+        oslo_context.RequestContext(overwrite=True)
+        tracemalloc.start()
+        issue(i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print('%-50s %8.1f dumps %8.1f loads %10.0f bytes %10d peak' % (
+        '', float(counter.dumps) / iterations,
+        float(counter.loads) / iterations,
+        float(counter.bytes) / iterations, peak))
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--services', type=int, default=30,
+                        help='Number of services in the catalog.')
+    args = parser.parse_args()
+
+    with base.fernet_backends(
+            args.connection,
+            cache={'enabled': True,
+                   'backend': 'dogpile.cache.memory'}) as drivers:
+        token_api = drivers['token_provider_api']
+        user_ids, project_ids = base.create_users(drivers, 1, 1)
+        catalog.create_catalog(drivers['catalog_api'], args.services, 1, 3)
+
+        def issue(i):
+            token_api.issue_token(user_ids[0], ['password'],
+                                  project_id=project_ids[0])
+
+        # Warm the cache backend, so both scenarios only differ in the
+        # request local cache.
+        issue(0)
+
+        with mock.patch.object(_context_cache._MarshaledValue, '__init__',
+                               side_effect=ValueError):
+            with mock.patch.object(_context_cache, '_is_immutable',
+                                   return_value=False):
+                run('issue token, serialized request cache', issue,
+                    args.iterations)
+            run('issue token, immutable values kept as is', issue,
+                args.iterations)
+        run('issue token, builtin values copied with marshal', issue,
+            args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the peak memory of rendering a large list of users.
+
+Each operation lists every user, wraps them in a collection with the links of
+each user, as `GET /v3/users` does, renders the response and reads its body
+the way a WSGI server sends it. The peak memory allocated by an operation,
+as traced by `tracemalloc`, is reported for each scenario, first with
+`stream_list_threshold` unset, then with every list streamed. Tracing memory
+makes the operations several times slower than they would otherwise be.
+
+"""
+
+import tracemalloc
+import uuid
+
+import base
+
+import keystone.conf
+from keystone.common import wsgi
+from keystone.identity import controllers
+from keystone.server import backends
+
+
+CONF = keystone.conf.CONF
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=20000,
+                        help='Number of users.')
+    parser.set_defaults(iterations=3)
+    args = parser.parse_args()
+
+    # Only the identity API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': False})
+    identity_api = backends.load_backends()['identity_api']
+    for i in range(args.users):
+        user_id = uuid.uuid4().hex
+        identity_api.driver.create_user(
+            user_id, {'id': user_id, 'name': uuid.uuid4().hex,
+                      'domain_id': 'default', 'enabled': True,
+                      'email': '%s@example.com' % user_id})
+
+    context = {'path': '/users',
+               'environment': {'wsgi.url_scheme': 'http',
+                               'SERVER_NAME': 'localhost',
+                               'SERVER_PORT': '5000'}}
+    peaks = []
+
+    def list_users(i):
+        tracemalloc.start()
+        refs = identity_api.list_users()
+        body = controllers.UserV3.wrap_collection(context, refs)
+        del refs
+        size = 0
+        for chunk in wsgi.render_response(body=body).app_iter:
+            size += len(chunk)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    for threshold in (0, 1):
+        CONF.set_override('stream_list_threshold', threshold)
+        del peaks[:]
+        name = '%s, %d users' % (
+            'streamed' if threshold else 'not streamed', args.users)
+        base.timeit(name, list_users, args.iterations)
+        print('%-50s %25.1f MiB peak' % (
+            name, max(peaks) / 1024.0 / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure repeated revocation checks of the same unrevoked tokens.
+
+`keystone.revoke.core.Manager.check_token` is called for a small set of hot
+tokens, as token validation does on every request, with revocation events
+recorded in the database. The backend scenario queries the driver on every
+check. The index scenarios use `[revoke] in_memory_index`, looking every
+check up in the index or, by default, remembering tokens found not revoked
+until the revocation generation changes. They refresh the index every 60
+seconds; the last scenario refreshes it on every check, as `[revoke]
+index_refresh_interval` does by default, which queries the backend for new
+events even when the token is remembered.
+
+"""
+
+import base
+import revoke_matcher
+
+import mock
+
+from keystone.revoke import core
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--events', type=int, default=10000,
+                        help='Number of revocation events.')
+    parser.add_argument('--tokens', type=int, default=10,
+                        help='Number of distinct tokens checked.')
+    args = parser.parse_args()
+
+    with base.fernet_backends(
+            args.connection,
+            revoke={'in_memory_index': True,
+                    'index_refresh_interval': 60}) as drivers:
+        revoke_api = drivers['revoke_api']
+        for event in revoke_matcher.events(args.events):
+            revoke_api.driver.revoke(event)
+        tokens = revoke_matcher.tokens(args.tokens)
+
+        def check(i):
+            revoke_api.check_token(tokens[i % len(tokens)])
+
+        with mock.patch.object(core.CONF.revoke, 'in_memory_index', False):
+            base.timeit('backend, %d events' % args.events, check,
+                        max(1, min(args.iterations, 1000)))
+
+        def index_check(self, token):
+            return self._index.is_revoked(token)
+
+        with mock.patch.object(core.Manager, '_index_check', index_check):
+            base.timeit('index, %d events' % args.events, check,
+                        args.iterations)
+        base.timeit('index and generation, %d events' % args.events, check,
+                    args.iterations)
+        base.CONF.set_override('index_refresh_interval', 0, group='revoke')
+        base.timeit('index and generation, refresh every check, '
+                    '%d events' % args.events, check,
+                    max(1, min(args.iterations, 1000)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare revocation checks against the backend and the in-memory index.
+
+The backend check is what `keystone.revoke.core.Manager.check_token` does
+by default: one query for the events that may match the token, followed by
+`revoke_model.is_revoked`. The index check is what it does when
+`[revoke] in_memory_index` is enabled.
+
+"""
+
+import datetime
+import uuid
+
+import base
+
+from oslo_utils import timeutils
+
+from keystone.common import sql
+from keystone.models import revoke_model
+from keystone.revoke.backends import sql as revoke_sql
+
+
+def populate(count):
+    now = timeutils.utcnow().replace(microsecond=0)
+    with sql.session_for_write() as session:
+        for i in range(count):
+            # A realistic mix of user, project and audit ID revocations,
+            # recorded over the last hour.
+            revoked_at = now - datetime.timedelta(seconds=10 + i % 3600)
+            kwargs = {'revoked_at': revoked_at, 'issued_before': revoked_at}
+            kind = i % 3
+            if kind == 0:
+                kwargs['user_id'] = uuid.uuid4().hex
+            elif kind == 1:
+                kwargs['project_id'] = uuid.uuid4().hex
+            else:
+                kwargs['audit_id'] = uuid.uuid4().hex[:22]
+            session.add(revoke_sql.RevocationEvent(**kwargs))
+
+
+def tokens(iterations):
+    issued_at = timeutils.utcnow() - datetime.timedelta(hours=2)
+    result = []
+    for i in range(iterations):
+        token = revoke_model.blank_token_data(issued_at)
+        token['user_id'] = uuid.uuid4().hex
+        token['project_id'] = uuid.uuid4().hex
+        token['audit_id'] = uuid.uuid4().hex[:22]
+        token['audit_chain_id'] = token['audit_id']
+        token['roles'] = [uuid.uuid4().hex]
+        result.append(token)
+    return result
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--events', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help='Numbers of live revocation events.')
+    args = parser.parse_args()
+    base.setup(args.connection)
+    driver = revoke_sql.Revoke()
+
+    loaded = 0
+    for count in args.events:
+        populate(count - loaded)
+        loaded = count
+        checks = tokens(args.iterations)
+
+        def backend(i):
+            token = checks[i]
+            revoke_model.is_revoked(driver.list_events(token=token), token)
+
+        index = revoke_model.RevokeIndex()
+        index.add_events(driver.list_events())
+
+        def indexed(i):
+            index.is_revoked(checks[i])
+
+        def refreshed(i):
+            # The default `[revoke] index_refresh_interval` of 0 looks for
+            # new events before every check.
+            last_fetch = timeutils.utcnow() - datetime.timedelta(seconds=5)
+            index.add_events(driver.list_events(last_fetch=last_fetch))
+            index.is_revoked(checks[i])
+
+        base.timeit('backend query, %d events' % count, backend,
+                    args.iterations)
+        base.timeit('in-memory index, %d events' % count, indexed,
+                    args.iterations)
+        base.timeit('in-memory index + refresh, %d events' % count,
+                    refreshed, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
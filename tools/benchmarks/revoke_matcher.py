@@ -0,0 +1,101 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare brute-force revocation checks with a compiled RevokeMatcher.
+
+The brute-force check compares a token with every event of an in-memory
+event list, as `revoke_model.is_revoked` does. The matcher check uses
+`revoke_model.RevokeMatcher` built from the same events. No database is
+used.
+
+"""
+
+import datetime
+import time
+import uuid
+
+import base
+
+from oslo_utils import timeutils
+
+from keystone.models import revoke_model
+
+
+def events(count):
+    now = timeutils.utcnow().replace(microsecond=0)
+    result = []
+    for i in range(count):
+        # A realistic mix of user, project, user and project, audit ID and
+        # domain revocations, recorded over the last hour.
+        revoked_at = now - datetime.timedelta(seconds=10 + i % 3600)
+        kwargs = {'revoked_at': revoked_at, 'issued_before': revoked_at}
+        kind = i % 5
+        if kind in (0, 2):
+            kwargs['user_id'] = uuid.uuid4().hex
+        if kind in (1, 2):
+            kwargs['project_id'] = uuid.uuid4().hex
+        if kind == 3:
+            kwargs['audit_id'] = uuid.uuid4().hex[:22]
+        if kind == 4:
+            kwargs['domain_id'] = uuid.uuid4().hex
+        result.append(revoke_model.RevokeEvent(**kwargs))
+    return result
+
+
+def tokens(iterations):
+    issued_at = timeutils.utcnow() - datetime.timedelta(hours=2)
+    result = []
+    for i in range(iterations):
+        token = revoke_model.blank_token_data(issued_at)
+        token['user_id'] = uuid.uuid4().hex
+        token['identity_domain_id'] = uuid.uuid4().hex
+        token['assignment_domain_id'] = token['identity_domain_id']
+        token['project_id'] = uuid.uuid4().hex
+        token['audit_id'] = uuid.uuid4().hex[:22]
+        token['audit_chain_id'] = token['audit_id']
+        token['roles'] = [uuid.uuid4().hex]
+        result.append(token)
+    return result
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--events', type=int, nargs='+',
+                        default=[100, 1000, 10000, 100000, 1000000],
+                        help='Numbers of revocation events.')
+    args = parser.parse_args()
+
+    for count in args.events:
+        revoke_events = events(count)
+        checks = tokens(args.iterations)
+
+        start = time.time()
+        matcher = revoke_model.RevokeMatcher(revoke_events)
+        print('%-50s %8d events %9.3f s' % (
+            'build matcher', count, time.time() - start))
+
+        def brute_force(i):
+            any(revoke_model._token_matches_event(e, checks[i])
+                for e in revoke_events)
+
+        def compiled(i):
+            matcher.is_revoked(checks[i])
+
+        # Keep the brute-force scenario to about a million comparisons.
+        base.timeit('brute force, %d events' % count, brute_force,
+                    max(1, min(args.iterations, 1000000 // count)))
+        base.timeit('matcher, %d events' % count, compiled,
+                    args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the database load of listing revocation events on several nodes.
+
+Each node is a separate process with its own revoke manager, sharing a
+SQLite database file and, for the cached scenario, a dbm cache file that
+stands in for memcached. Every node lists the revocation events once per
+round, `--interval` seconds apart, and the first node records a new event
+every `--revoke-every` rounds.
+
+The cached scenario memoizes `keystone.revoke.core.Manager.list_events`, so
+every new event invalidates the cached list on all nodes, and the full list
+is read again. The incremental scenario uses
+`[revoke] in_memory_index`, so each node only reads the events after the
+latest one it holds. Once each node has loaded the events, the script
+reports the queries and the rows read from the revocation event table, in
+total and per node.
+
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import base
+import revoke_matcher
+
+from keystone.models import revoke_model
+from keystone.server import backends
+
+
+def node(connection, overrides, rounds, interval, revoke_every, first,
+         barrier, results):
+    # Only the revocation API is exercised, so avoid needing Fernet keys.
+    overrides['token'] = {'provider': 'uuid'}
+    base.setup(connection, **overrides)
+    revoke_api = backends.load_backends()['revoke_api']
+    driver_list_events = revoke_api.driver.list_events
+    counts = {'queries': 0, 'rows': 0}
+
+    def list_events(*args, **kwargs):
+        events = driver_list_events(*args, **kwargs)
+        counts['queries'] += 1
+        counts['rows'] += len(events)
+        return events
+
+    # Load the events before counting, as a node that has been running for
+    # a while would have, and start the rounds together.
+    revoke_api.list_events()
+    revoke_api.driver.list_events = list_events
+    barrier.wait()
+    for i in range(rounds):
+        if first and i % revoke_every == 0:
+            revoke_api.revoke(
+                revoke_model.RevokeEvent(user_id=uuid.uuid4().hex))
+        revoke_api.list_events()
+        time.sleep(interval)
+    results.put(counts)
+
+
+def run(name, connection, overrides, nodes, args):
+    # Spawn the nodes, so that each configures keystone from scratch.
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(nodes)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=node,
+            args=(connection, overrides, args.iterations, args.interval,
+                  args.revoke_every, i == 0, barrier, results))
+        for i in range(nodes)]
+    for p in processes:
+        p.start()
+    counts = [results.get() for p in processes]
+    for p in processes:
+        p.join()
+    queries = sum(c['queries'] for c in counts)
+    rows = sum(c['rows'] for c in counts)
+    print('%-30s %3d nodes %8d queries %10d rows %10.0f rows/node' % (
+        name, nodes, queries, rows, float(rows) / nodes))
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--events', type=int, default=5000,
+                        help='Number of revocation events to start with.')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of nodes.')
+    parser.add_argument('--revoke-every', type=int, default=10,
+                        help='Rounds between new revocation events.')
+    parser.add_argument('--interval', type=float, default=0.05,
+                        help='Seconds between rounds on each node.')
+    parser.set_defaults(iterations=100)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        connection = args.connection
+        if connection == 'sqlite://':
+            connection = 'sqlite:///%s' % os.path.join(directory, 'db.sqlite')
+        base.setup(connection, token={'provider': 'uuid'})
+        revoke_api = backends.load_backends()['revoke_api']
+        for event in revoke_matcher.events(args.events):
+            revoke_api.driver.revoke(event)
+
+        for count in args.nodes:
+            cache = {'enabled': True, 'backend': 'dogpile.cache.dbm',
+                     'backend_argument': [
+                         'filename:%s' % os.path.join(
+                             directory, '%s.dbm' % uuid.uuid4().hex)]}
+            run('cached', connection, {'cache': cache}, count, args)
+            run('incremental', connection,
+                {'cache': cache, 'revoke': {'in_memory_index': True}},
+                count, args)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
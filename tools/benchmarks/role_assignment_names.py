@@ -0,0 +1,64 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing every role assignment with the names of its entities.
+
+Each operation lists all the role assignments with `include_names`, as
+`GET /v3/role_assignments?include_names` does. Caching is disabled unless
+`--cache` is given, in which case an in-memory cache backend serves the
+entity lookups once the first listing has filled it.
+
+"""
+
+import base
+import role_assignments
+
+from keystone.server import backends
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=200,
+                        help='Number of users.')
+    parser.add_argument('--projects', type=int, default=100,
+                        help='Number of projects.')
+    parser.add_argument('--groups', type=int, default=20,
+                        help='Number of groups.')
+    parser.add_argument('--assignments', type=int, default=5,
+                        help='Number of assignments of each user and group.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Enable an in-memory cache backend.')
+    parser.set_defaults(iterations=10)
+    args = parser.parse_args()
+
+    cache = {'enabled': False}
+    if args.cache:
+        cache = {'enabled': True, 'backend': 'dogpile.cache.memory'}
+    # Only the assignment API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'}, cache=cache)
+    drivers = backends.load_backends()
+    assignment_api = drivers['assignment_api']
+    role_assignments.create_data(
+        drivers, args.users, args.projects, args.groups, 1,
+        args.assignments, 4)
+    count = len(assignment_api.list_role_assignments())
+
+    def list_with_names(i):
+        assignment_api.list_role_assignments(include_names=True)
+
+    base.timeit('include_names, %d assignments, %s' % (
+        count, 'cached' if args.cache else 'uncached'),
+        list_with_names, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure listing the effective role assignments of a user on a project.
+
+The users are members of several groups and have direct, group and inherited
+assignments on a tree of projects. Each operation lists the effective
+assignments of a random user on a random project, as issuing a token does,
+with and without `[assignment] in_memory_index`. The memoization of
+`get_roles_for_user_and_project` is left out, so that every operation computes
+the assignments.
+
+"""
+
+import random
+import uuid
+
+import base
+
+import keystone.conf
+from keystone.server import backends
+
+
+CONF = keystone.conf.CONF
+
+
+def create_data(drivers, users, projects, groups, groups_per_user,
+                assignments, depth, seed=0):
+    """Create users, groups, a project tree and assignments between them.
+
+    Every user and every group gets `assignments` assignments of a random
+    role on a random project or on the domain, a third of them inherited.
+
+    :returns: a tuple of the list of user IDs and the list of project IDs.
+
+    """
+    rand = random.Random(seed)
+    domain = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+    drivers['resource_api'].create_domain(domain['id'], domain)
+    role_ids = []
+    for i in range(10):
+        role = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex}
+        drivers['role_api'].create_role(role['id'], role)
+        role_ids.append(role['id'])
+
+    project_ids = []
+    depths = {domain['id']: 0}
+    for i in range(projects):
+        parent_id = rand.choice([domain['id']] + project_ids)
+        if depths[parent_id] >= depth:
+            parent_id = domain['id']
+        project = {'id': uuid.uuid4().hex, 'name': uuid.uuid4().hex,
+                   'domain_id': domain['id'], 'parent_id': parent_id,
+                   'is_domain': False, 'enabled': True}
+        drivers['resource_api'].create_project(project['id'], project)
+        project_ids.append(project['id'])
+        depths[project['id']] = depths[parent_id] + 1
+
+    assignment_driver = drivers['assignment_api'].driver
+
+    def grant(**actor):
+        for i in range(assignments):
+            inherited = rand.random() < 1.0 / 3
+            target = rand.choice(project_ids)
+            if inherited and rand.random() < 0.2:
+                target = {'domain_id': domain['id']}
+            else:
+                target = {'project_id': target}
+            target.update(actor)
+            assignment_driver.create_grant(
+                rand.choice(role_ids), inherited_to_projects=inherited,
+                **target)
+
+    group_ids = []
+    for i in range(groups):
+        group = drivers['identity_api'].create_group(
+            {'name': uuid.uuid4().hex, 'domain_id': domain['id']})
+        group_ids.append(group['id'])
+        grant(group_id=group['id'])
+
+    user_ids = []
+    for i in range(users):
+        user = drivers['identity_api'].create_user(
+            {'name': uuid.uuid4().hex, 'domain_id': domain['id'],
+             'enabled': True})
+        user_ids.append(user['id'])
+        grant(user_id=user['id'])
+        for group_id in rand.sample(group_ids, groups_per_user):
+            drivers['identity_api'].add_user_to_group(user['id'], group_id)
+    return user_ids, project_ids
+
+
+def main():
+    parser = base.parser(__doc__)
+    parser.add_argument('--users', type=int, default=1000,
+                        help='Number of users.')
+    parser.add_argument('--projects', type=int, default=200,
+                        help='Number of projects.')
+    parser.add_argument('--groups', type=int, default=50,
+                        help='Number of groups.')
+    parser.add_argument('--groups-per-user', type=int, default=3,
+                        help='Number of groups each user is a member of.')
+    parser.add_argument('--assignments', type=int, default=5,
+                        help='Number of assignments of each user and group.')
+    parser.add_argument('--depth', type=int, default=4,
+                        help='Maximum depth of the project tree.')
+    parser.set_defaults(iterations=2000)
+    args = parser.parse_args()
+
+    # Only the assignment API is exercised, so avoid needing Fernet keys.
+    base.setup(args.connection, token={'provider': 'uuid'},
+               cache={'enabled': True, 'backend': 'dogpile.cache.memory'})
+    drivers = backends.load_backends()
+    assignment_api = drivers['assignment_api']
+    user_ids, project_ids = create_data(
+        drivers, args.users, args.projects, args.groups,
+        args.groups_per_user, args.assignments, args.depth)
+
+    rand = random.Random(1)
+    pairs = [(rand.choice(user_ids), rand.choice(project_ids))
+             for i in range(args.iterations)]
+
+    def effective(i):
+        user_id, project_id = pairs[i]
+        assignment_api.list_role_assignments(
+            user_id=user_id, project_id=project_id, effective=True)
+
+    name = '%d users, %d projects' % (args.users, args.projects)
+    base.timeit('effective assignments, %s' % name, effective,
+                args.iterations)
+    CONF.set_override('in_memory_index', True, group='assignment')
+    base.timeit('indexed (cold), %s' % name, effective, args.iterations)
+    base.timeit('indexed (warm), %s' % name, effective, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Compare full and lightweight checks of a Fernet token.
+
+The full check is what `HEAD /v3/auth/tokens` does by default: it rebuilds
+the token's roles and catalog with `validate_token`. The lightweight check is
+what it does with `[token] lightweight_check` enabled. Caching is disabled,
+and each check runs in a new request context.
+
+"""
+
+import base
+
+import keystone.conf
+
+
+CONF = keystone.conf.CONF
+
+
+def main():
+    parser = base.parser(__doc__)
+    args = parser.parse_args()
+
+    with base.fernet_backends(args.connection) as drivers:
+        token_api = drivers['token_provider_api']
+        user_ids, project_ids = base.create_users(drivers, 1, 1)
+        token_id, token_data = token_api.issue_token(
+            user_ids[0], ['password'], project_id=project_ids[0])
+
+        def check(i):
+            token_api.check_token(token_id)
+
+        CONF.set_override('lightweight_check', False, group='token')
+        base.timeit('full check', check, args.iterations)
+        CONF.set_override('lightweight_check', True, group='token')
+        base.timeit('lightweight check', check, args.iterations)
+
+
+if __name__ == '__main__':
+    main()